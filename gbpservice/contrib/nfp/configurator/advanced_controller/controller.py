@@ -18,8 +18,11 @@ from oslo_log import log as logging
 import oslo_messaging
 import pecan
 import pika
+import threading
+import time
 
 from gbpservice.nfp.pecan import base_controller
+from gbpservice.nfp.pecan import constants
 
 LOG = logging.getLogger(__name__)
 n_rpc.init(cfg.CONF)
@@ -93,7 +96,7 @@ class Controller(base_controller.BaseController):
 
         try:
             if self.method_name == 'get_notifications':
-                notification_data = self.rmqconsumer.pull_notifications()
+                notification_data = self._get_notifications()
                 msg = ("NOTIFICATION_DATA sent to config_agent %s"
                        % notification_data)
                 LOG.info(msg)
@@ -107,6 +110,23 @@ class Controller(base_controller.BaseController):
             error_data = self._format_description(msg)
             return jsonutils.dumps(error_data)
 
+    def _get_notifications(self):
+        """Pull the pending notifications.
+
+        When the request carries the notification wait header, and no
+        notification is pending, the request is held till one arrives
+        or the wait expires, so that the config agent learns about it
+        right away instead of on its next poll.
+        """
+        wait = pecan.request.headers.get(constants.NOTIFICATION_WAIT_HEADER)
+        wait = min(float(wait or 0), constants.MAX_NOTIFICATION_WAIT)
+        deadline = time.time() + wait
+        notification_data = self.rmqconsumer.pull_notifications()
+        while not notification_data and time.time() < deadline:
+            time.sleep(constants.NOTIFICATION_POLL_INTERVAL)
+            notification_data = self.rmqconsumer.pull_notifications()
+        return notification_data
+
     @pecan.expose(method='POST', content_type='application/json')
     def post(self, **body):
         """Method of REST server to handle all the post requests.
@@ -280,6 +300,9 @@ class RMQConsumer(object):
     def __init__(self, rabbitmq_host, queue):
         self.rabbitmq_host = rabbitmq_host
         self.queue = queue
+        # Blocking connections are not thread safe, and get requests
+        # are served concurrently
+        self._lock = threading.RLock()
         self.create_connection()
 
     def create_connection(self):
@@ -301,6 +324,10 @@ class RMQConsumer(object):
         return notifications
 
     def pull_notifications(self):
+        with self._lock:
+            return self._pull_notifications()
+
+    def _pull_notifications(self):
         notifications = []
         msgs_acknowledged = False
         try:
@@ -334,6 +361,6 @@ class RMQConsumer(object):
             msg = ("Caught ChannelClosed exception.")
             LOG.error(msg)
             if msgs_acknowledged is False:
-                return self.pull_notifications()
+                return self._pull_notifications()
             else:
                 return self._fetch_data_from_wrapper_strct(notifications)
@@ -75,6 +75,24 @@ class ControllerTestCase(base.BaseTestCase, rest.RestController):
         mock_pn.assert_called_with()
         self.assertEqual(response.status_code, 200)
 
+    def test_get_notifications_wait(self):
+        """Tests get_notifications held till a notification arrives.
+
+        Returns: none
+
+        """
+        notification = [{'info': {'context': {}}}]
+        with mock.patch.object(
+                controller.RMQConsumer, 'pull_notifications') as mock_pn, (
+                mock.patch('time.sleep')) as mock_sleep:
+            mock_pn.side_effect = [[], [], notification]
+            response = self.app.get(
+                '/v1/nfp/get_notifications',
+                headers={constants.NOTIFICATION_WAIT_HEADER: '5'})
+        self.assertEqual(3, mock_pn.call_count)
+        self.assertEqual(2, mock_sleep.call_count)
+        self.assertEqual(response.status_code, 200)
+
     def test_post_create_network_function_device_config(self):
         """Tests HTTP post request create_network_function_device_config.
 
@@ -28,6 +28,7 @@ from gbpservice._i18n import _LE
 from gbpservice._i18n import _LW
 from gbpservice.neutron.extensions import group_policy as gp_ext
 from gbpservice.neutron.extensions import servicechain as sc_ext
+from gbpservice.neutron.services.grouppolicy.common import cache
 from gbpservice.neutron.services.grouppolicy.common import exceptions as exc
 
 LOG = logging.getLogger(__name__)
@@ -278,6 +279,7 @@ class LocalAPI(object):
         # REVISIT(rkukura): Check authorization?
         reservation = None
         if plugin in [self._group_policy_plugin, self._servicechain_plugin]:
+            cache.invalidate_request_cache(context)
             reservation = quota.QUOTAS.make_reservation(
                 context, context.tenant_id, {resource: 1}, plugin)
         action = 'create_' + resource
@@ -305,6 +307,15 @@ class LocalAPI(object):
             # method will be invoked in the API layer.
         return obj
 
+    def _create_resources_bulk(self, plugin, context, resource, attrs_list):
+        # REVISIT(rkukura): Do create.start notification?
+        # REVISIT(rkukura): Check authorization?
+        action = 'create_' + resource + '_bulk'
+        obj_creator = getattr(plugin, action)
+        return obj_creator(
+            context, {resource + 's': [{resource: attrs}
+                                       for attrs in attrs_list]})
+
     def _create_resource_qos(self, plugin, context, resource,
                              param, attrs):
         action = 'create_' + resource
@@ -317,6 +328,8 @@ class LocalAPI(object):
     def _update_resource(self, plugin, context, resource, resource_id, attrs,
                          do_notify=True):
         # REVISIT(rkukura): Check authorization?
+        if plugin in [self._group_policy_plugin, self._servicechain_plugin]:
+            cache.invalidate_request_cache(context)
         action = 'update_' + resource
         obj_updater = getattr(plugin, action)
         obj = obj_updater(context, resource_id, {resource: attrs})
@@ -325,6 +338,8 @@ class LocalAPI(object):
     def _delete_resource(self, plugin, context, resource, resource_id,
                          do_notify=True):
         # REVISIT(rkukura): Check authorization?
+        if plugin in [self._group_policy_plugin, self._servicechain_plugin]:
+            cache.invalidate_request_cache(context)
         action = 'delete_' + resource
         obj_deleter = getattr(plugin, action)
         obj_deleter(context, resource_id)
@@ -516,6 +531,26 @@ class LocalAPI(object):
             LOG.warning(_LW('Security Group already exists %s'), ex.message)
             return
 
+    def _create_sg_rules_bulk(self, plugin_context, attrs_list):
+        # Neutron's bulk create only accepts rules of a single SG. The
+        # caller is expected to have filtered out the existing rules. Each
+        # SG's rules commit on their own, so the agents are notified once
+        # the new rule set can be read.
+        rules_by_sg = {}
+        for attrs in attrs_list:
+            rules_by_sg.setdefault(attrs['security_group_id'], []).append(
+                attrs)
+        created = []
+        for rules in rules_by_sg.values():
+            created.extend(self._create_resources_bulk(
+                self._core_plugin, plugin_context, 'security_group_rule',
+                rules))
+        return created
+
+    def _delete_sg_rules(self, plugin_context, sg_rule_ids):
+        for sg_rule_id in sg_rule_ids:
+            self._delete_sg_rule(plugin_context, sg_rule_id)
+
     def _update_sg_rule(self, plugin_context, sg_rule_id, attrs):
         return self._update_resource(self._core_plugin, plugin_context,
                                      'security_group_rule', sg_rule_id,
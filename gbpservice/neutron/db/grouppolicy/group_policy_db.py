@@ -19,6 +19,7 @@ from neutron_lib import constants
 from neutron_lib.db import model_base
 from oslo_log import helpers as log
 from oslo_utils import uuidutils
+import six
 import sqlalchemy as sa
 from sqlalchemy import orm
 from sqlalchemy.orm import exc
@@ -378,6 +379,42 @@ class ExternalPolicy(model_base.BASEV2, BaseSharedGbpResource):
         cascade='all, delete-orphan')
 
 
+# Relationships walked by the dict of each resource, keyed by the
+# field they populate. Collection GETs subquery load the ones backing
+# the requested fields, so that serializing a page takes one query per
+# relationship instead of one per row and relationship. Relationships
+# declared with lazy="joined" are loaded with the resource already.
+EAGER_LOAD_PROFILES = {
+    PolicyTargetGroup: {
+        'policy_targets': 'policy_targets',
+        'provided_policy_rule_sets': 'provided_policy_rule_sets',
+        'consumed_policy_rule_sets': 'consumed_policy_rule_sets'},
+    ApplicationPolicyGroup: {
+        'policy_target_groups': 'policy_target_groups'},
+    L2Policy: {
+        'policy_target_groups': 'policy_target_groups'},
+    L3Policy: {
+        'l2_policies': 'l2_policies',
+        'external_segments': 'external_segments'},
+    NetworkServicePolicy: {
+        'policy_target_groups': 'policy_target_groups',
+        'network_service_params': 'network_service_params'},
+    PolicyClassifier: {
+        'policy_rules': 'policy_rules'},
+    PolicyAction: {
+        'policy_rules': 'policy_rules'},
+    ExternalSegment: {
+        'external_routes': 'external_routes',
+        'nat_pools': 'nat_pools',
+        'external_policies': 'external_policies',
+        'l3_policies': 'l3_policies'},
+    ExternalPolicy: {
+        'external_segments': 'external_segments',
+        'provided_policy_rule_sets': 'provided_policy_rule_sets',
+        'consumed_policy_rule_sets': 'consumed_policy_rule_sets'},
+}
+
+
 class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
                           common_db_mixin.CommonDbMixin):
     """GroupPolicy plugin interface implementation using SQLAlchemy models."""
@@ -390,6 +427,33 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
     def __init__(self, *args, **kwargs):
         super(GroupPolicyDbPlugin, self).__init__(*args, **kwargs)
 
+    @staticmethod
+    def _is_field_requested(fields, field):
+        return not fields or field in fields
+
+    def _apply_eager_load_profile(self, query, model, fields=None):
+        for cls in model.__mro__:
+            if cls in EAGER_LOAD_PROFILES:
+                for field, relationship in six.iteritems(
+                        EAGER_LOAD_PROFILES[cls]):
+                    if self._is_field_requested(fields, field):
+                        query = query.options(orm.subqueryload(relationship))
+                break
+        return query
+
+    def _get_collection(self, context, model, dict_func, filters=None,
+                        fields=None, sorts=None, limit=None, marker_obj=None,
+                        page_reverse=False):
+        query = self._get_collection_query(context, model, filters=filters,
+                                           sorts=sorts, limit=limit,
+                                           marker_obj=marker_obj,
+                                           page_reverse=page_reverse)
+        query = self._apply_eager_load_profile(query, model, fields)
+        items = [dict_func(c, fields) for c in query]
+        if limit and page_reverse:
+            items.reverse()
+        return items
+
     def _find_gbp_resource(self, context, type, id, on_fail=None):
         try:
             return self._get_by_id(context, type, id)
@@ -823,28 +887,33 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
             'application_policy_group_id', None)
         res['network_service_policy_id'] = ptg['network_service_policy_id']
         res['service_management'] = ptg.get('service_management', False)
-        res['policy_targets'] = [
-            pt['id'] for pt in ptg['policy_targets']]
-        res['provided_policy_rule_sets'] = (
-            [pprs['policy_rule_set_id'] for pprs in ptg[
-                'provided_policy_rule_sets']])
-        res['consumed_policy_rule_sets'] = (
-            [cprs['policy_rule_set_id'] for cprs in ptg[
-                'consumed_policy_rule_sets']])
+        if self._is_field_requested(fields, 'policy_targets'):
+            res['policy_targets'] = [
+                pt['id'] for pt in ptg['policy_targets']]
+        if self._is_field_requested(fields, 'provided_policy_rule_sets'):
+            res['provided_policy_rule_sets'] = (
+                [pprs['policy_rule_set_id'] for pprs in ptg[
+                    'provided_policy_rule_sets']])
+        if self._is_field_requested(fields, 'consumed_policy_rule_sets'):
+            res['consumed_policy_rule_sets'] = (
+                [cprs['policy_rule_set_id'] for cprs in ptg[
+                    'consumed_policy_rule_sets']])
         return self._fields(res, fields)
 
     def _make_application_policy_group_dict(self, apg, fields=None):
         res = self._populate_common_fields_in_dict(apg)
-        res['policy_target_groups'] = [
-            ptg['id'] for ptg in apg['policy_target_groups']]
+        if self._is_field_requested(fields, 'policy_target_groups'):
+            res['policy_target_groups'] = [
+                ptg['id'] for ptg in apg['policy_target_groups']]
         return self._fields(res, fields)
 
     def _make_l2_policy_dict(self, l2p, fields=None):
         res = self._populate_common_fields_in_dict(l2p)
         res['l3_policy_id'] = l2p['l3_policy_id']
         res['inject_default_route'] = l2p.get('inject_default_route', True)
-        res['policy_target_groups'] = [
-            ptg['id'] for ptg in l2p['policy_target_groups']]
+        if self._is_field_requested(fields, 'policy_target_groups'):
+            res['policy_target_groups'] = [
+                ptg['id'] for ptg in l2p['policy_target_groups']]
         return self._fields(res, fields)
 
     def _make_l3_policy_dict(self, l3p, fields=None):
@@ -852,28 +921,35 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
         res['ip_version'] = l3p['ip_version']
         res['ip_pool'] = l3p['ip_pool']
         res['subnet_prefix_length'] = l3p['subnet_prefix_length']
-        res['l2_policies'] = [l2p['id']
-                              for l2p in l3p['l2_policies']]
-        es_dict = {}
-        for es in l3p['external_segments']:
-            es_id = es['external_segment_id']
-            if es_id not in es_dict:
-                es_dict[es_id] = []
-            es_dict[es_id].append(es['allocated_address'])
-        res['external_segments'] = es_dict
+        if self._is_field_requested(fields, 'l2_policies'):
+            res['l2_policies'] = [l2p['id']
+                                  for l2p in l3p['l2_policies']]
+        if self._is_field_requested(fields, 'external_segments'):
+            es_dict = {}
+            for es in l3p['external_segments']:
+                es_id = es['external_segment_id']
+                if es_id not in es_dict:
+                    es_dict[es_id] = []
+                es_dict[es_id].append(es['allocated_address'])
+            res['external_segments'] = es_dict
         return self._fields(res, fields)
 
     def _make_network_service_policy_dict(self, nsp, fields=None):
         res = self._populate_common_fields_in_dict(nsp)
-        res['policy_target_groups'] = [
-            ptg['id'] for ptg in nsp['policy_target_groups']]
-        params = []
-        for param in nsp['network_service_params']:
-            params.append({
-                gp_constants.GP_NETWORK_SVC_PARAM_TYPE: param['param_type'],
-                gp_constants.GP_NETWORK_SVC_PARAM_NAME: param['param_name'],
-                gp_constants.GP_NETWORK_SVC_PARAM_VALUE: param['param_value']})
-        res['network_service_params'] = params
+        if self._is_field_requested(fields, 'policy_target_groups'):
+            res['policy_target_groups'] = [
+                ptg['id'] for ptg in nsp['policy_target_groups']]
+        if self._is_field_requested(fields, 'network_service_params'):
+            params = []
+            for param in nsp['network_service_params']:
+                params.append({
+                    gp_constants.GP_NETWORK_SVC_PARAM_TYPE:
+                    param['param_type'],
+                    gp_constants.GP_NETWORK_SVC_PARAM_NAME:
+                    param['param_name'],
+                    gp_constants.GP_NETWORK_SVC_PARAM_VALUE:
+                    param['param_value']})
+            res['network_service_params'] = params
         return self._fields(res, fields)
 
     def _make_policy_classifier_dict(self, pc, fields=None):
@@ -884,16 +960,18 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
         res['protocol'] = pc['protocol']
         res['port_range'] = port_range
         res['direction'] = pc['direction']
-        res['policy_rules'] = [pr['id']
-                               for pr in pc['policy_rules']]
+        if self._is_field_requested(fields, 'policy_rules'):
+            res['policy_rules'] = [pr['id']
+                                   for pr in pc['policy_rules']]
         return self._fields(res, fields)
 
     def _make_policy_action_dict(self, pa, fields=None):
         res = self._populate_common_fields_in_dict(pa)
         res['action_type'] = pa['action_type']
         res['action_value'] = pa['action_value']
-        res['policy_rules'] = [pr['policy_rule_id'] for
-                               pr in pa['policy_rules']]
+        if self._is_field_requested(fields, 'policy_rules'):
+            res['policy_rules'] = [pr['policy_rule_id'] for
+                                   pr in pa['policy_rules']]
         return self._fields(res, fields)
 
     def _make_policy_rule_dict(self, pr, fields=None):
@@ -906,25 +984,32 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
                                    pr['policy_rule_sets']]
         return self._fields(res, fields)
 
-    def _make_policy_rule_set_dict(self, prs, fields=None):
+    def _make_policy_rule_set_dict(self, prs, fields=None,
+                                   child_prs_ids=None):
         res = self._populate_common_fields_in_dict(prs)
-        if prs['parent']:
-            res['parent_id'] = prs['parent']['id']
-        else:
-            res['parent_id'] = None
-        ctx = context.get_admin_context()
-        if 'child_policy_rule_sets' in prs:
-            # They have been updated
-            res['child_policy_rule_sets'] = [
-                child_prs['id'] for child_prs in prs['child_policy_rule_sets']]
+        if child_prs_ids is not None:
+            # Preloaded along with the collection, see get_policy_rule_sets
+            res['parent_id'] = prs['parent_id']
+            res['child_policy_rule_sets'] = child_prs_ids
         else:
-            with ctx.session.begin(subtransactions=True):
-                filters = {'parent_id': [prs['id']]}
-                child_prs_in_db = self._get_collection_query(
-                    ctx, PolicyRuleSet, filters=filters)
-                res['child_policy_rule_sets'] = [child_prs['id']
-                                                 for child_prs
-                                                 in child_prs_in_db]
+            if prs['parent']:
+                res['parent_id'] = prs['parent']['id']
+            else:
+                res['parent_id'] = None
+            ctx = context.get_admin_context()
+            if 'child_policy_rule_sets' in prs:
+                # They have been updated
+                res['child_policy_rule_sets'] = [
+                    child_prs['id']
+                    for child_prs in prs['child_policy_rule_sets']]
+            else:
+                with ctx.session.begin(subtransactions=True):
+                    filters = {'parent_id': [prs['id']]}
+                    child_prs_in_db = self._get_collection_query(
+                        ctx, PolicyRuleSet, filters=filters)
+                    res['child_policy_rule_sets'] = [child_prs['id']
+                                                     for child_prs
+                                                     in child_prs_in_db]
 
         res['policy_rules'] = [pr['policy_rule_id']
                                for pr in prs['policy_rules']]
@@ -945,34 +1030,53 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
             for ptg in prs['consuming_external_policies']]
         return self._fields(res, fields)
 
+    def _get_child_policy_rule_set_ids(self, context, prs_ids):
+        """Returns {prs_id: [child prs_id, ...]} for a set of PRSs."""
+        child_prs_ids = dict((prs_id, []) for prs_id in prs_ids)
+        if not prs_ids:
+            return child_prs_ids
+        with context.session.begin(subtransactions=True):
+            query = context.session.query(
+                PolicyRuleSet.parent_id, PolicyRuleSet.id).filter(
+                    PolicyRuleSet.parent_id.in_(prs_ids))
+            for parent_id, child_id in query:
+                child_prs_ids[parent_id].append(child_id)
+        return child_prs_ids
+
     def _make_external_segment_dict(self, es, fields=None):
         res = self._populate_common_fields_in_dict(es)
         res['ip_version'] = es['ip_version']
         res['cidr'] = es['cidr']
         res['port_address_translation'] = es['port_address_translation']
-        res['external_routes'] = [{'destination': er['destination'],
-                                   'nexthop': er['nexthop']} for er in
-                                  es['external_routes']]
-        res['nat_pools'] = [np['id'] for np in es['nat_pools']]
-        res['external_policies'] = [
-            ep['external_policy_id']
-            for ep in es['external_policies']]
-
-        res['l3_policies'] = [
-            l3p['l3_policy_id'] for l3p in es['l3_policies']]
+        if self._is_field_requested(fields, 'external_routes'):
+            res['external_routes'] = [{'destination': er['destination'],
+                                       'nexthop': er['nexthop']} for er in
+                                      es['external_routes']]
+        if self._is_field_requested(fields, 'nat_pools'):
+            res['nat_pools'] = [np['id'] for np in es['nat_pools']]
+        if self._is_field_requested(fields, 'external_policies'):
+            res['external_policies'] = [
+                ep['external_policy_id']
+                for ep in es['external_policies']]
+        if self._is_field_requested(fields, 'l3_policies'):
+            res['l3_policies'] = [
+                l3p['l3_policy_id'] for l3p in es['l3_policies']]
         return self._fields(res, fields)
 
     def _make_external_policy_dict(self, ep, fields=None):
         res = self._populate_common_fields_in_dict(ep)
-        res['external_segments'] = [
-            es['external_segment_id']
-            for es in ep['external_segments']]
-        res['provided_policy_rule_sets'] = [
-            pprs['policy_rule_set_id'] for pprs in
-            ep['provided_policy_rule_sets']]
-        res['consumed_policy_rule_sets'] = [
-            cprs['policy_rule_set_id'] for cprs in
-            ep['consumed_policy_rule_sets']]
+        if self._is_field_requested(fields, 'external_segments'):
+            res['external_segments'] = [
+                es['external_segment_id']
+                for es in ep['external_segments']]
+        if self._is_field_requested(fields, 'provided_policy_rule_sets'):
+            res['provided_policy_rule_sets'] = [
+                pprs['policy_rule_set_id'] for pprs in
+                ep['provided_policy_rule_sets']]
+        if self._is_field_requested(fields, 'consumed_policy_rule_sets'):
+            res['consumed_policy_rule_sets'] = [
+                cprs['policy_rule_set_id'] for cprs in
+                ep['consumed_policy_rule_sets']]
         return self._fields(res, fields)
 
     def _make_nat_pool_dict(self, np, fields=None):
@@ -1739,12 +1843,22 @@ class GroupPolicyDbPlugin(gpolicy.GroupPolicyPluginBase,
                              page_reverse=False):
         marker_obj = self._get_marker_obj(context, 'policy_rule_set', limit,
                                           marker)
-        return self._get_collection(context, PolicyRuleSet,
-                                    self._make_policy_rule_set_dict,
-                                    filters=filters, fields=fields,
-                                    sorts=sorts, limit=limit,
-                                    marker_obj=marker_obj,
-                                    page_reverse=page_reverse)
+        query = self._get_collection_query(context, PolicyRuleSet,
+                                           filters=filters, sorts=sorts,
+                                           limit=limit,
+                                           marker_obj=marker_obj,
+                                           page_reverse=page_reverse)
+        prs_in_db = query.all()
+        # The rule and group associations are joined in the query, only
+        # the children need loading, in one query for the whole page
+        child_prs_ids = self._get_child_policy_rule_set_ids(
+            context, [prs['id'] for prs in prs_in_db])
+        items = [self._make_policy_rule_set_dict(
+            prs, fields, child_prs_ids=child_prs_ids[prs['id']])
+            for prs in prs_in_db]
+        if limit and page_reverse:
+            items.reverse()
+        return items
 
     @log.log_method_call
     def get_policy_rule_sets_count(self, context, filters=None):
@@ -10,8 +10,6 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import sys
-
 from neutron import context as n_context
 from neutron.db import models_v2
 from neutron_lib.db import model_base
@@ -27,22 +25,6 @@ from gbpservice.neutron.services.grouppolicy.common import exceptions
 from gbpservice.neutron.services.grouppolicy.common import utils
 
 
-def get_current_context():
-    i = 1
-    not_found = True
-    try:
-        while not_found:
-            for val in sys._getframe(i).f_locals.values():
-                if isinstance(val, n_context.Context):
-                    ctx = val
-                    not_found = False
-                    break
-            i = i + 1
-        return ctx
-    except Exception:
-        return
-
-
 class AddressScopeUpdateForL3PNotSupported(nexc.BadRequest):
     message = _("Address Scope update for L3 Policy is not supported.")
 
@@ -158,26 +140,39 @@ class GroupPolicyMappingDbPlugin(gpdb.GroupPolicyDbPlugin):
 
     def _make_policy_target_group_dict(self, ptg, fields=None):
         res = super(GroupPolicyMappingDbPlugin,
-                    self)._make_policy_target_group_dict(ptg)
+                    self)._make_policy_target_group_dict(ptg, fields)
         res['subnets'] = [subnet.subnet_id for subnet in ptg.subnets]
         return self._fields(res, fields)
 
-    def _get_subnetpools(self, id_list):
-        context = get_current_context().elevated()
+    def _get_subnetpool_prefixes(self, context, subnetpool_ids):
+        """Returns {subnetpool_id: [cidr, ...]} for a set of subnetpools.
+
+        The prefixes table is queried directly, so subnetpools of any
+        tenant are resolved without elevating the context.
+        """
+        prefixes = dict((sp_id, []) for sp_id in subnetpool_ids)
+        if not prefixes:
+            return prefixes
         with context.session.begin(subtransactions=True):
-            filters = {'id': id_list}
-            return self._get_collection_query(
-                context, models_v2.SubnetPool, filters=filters).all()
+            query = context.session.query(
+                models_v2.SubnetPoolPrefix.subnetpool_id,
+                models_v2.SubnetPoolPrefix.cidr).filter(
+                    models_v2.SubnetPoolPrefix.subnetpool_id.in_(
+                        list(prefixes)))
+            for sp_id, cidr in query:
+                prefixes[sp_id].append(cidr)
+        return prefixes
 
     def _make_l2_policy_dict(self, l2p, fields=None):
         res = super(GroupPolicyMappingDbPlugin,
-                    self)._make_l2_policy_dict(l2p)
+                    self)._make_l2_policy_dict(l2p, fields)
         res['network_id'] = l2p.network_id
         return self._fields(res, fields)
 
-    def _make_l3_policy_dict(self, l3p, fields=None, ip_pool=None):
+    def _make_l3_policy_dict(self, l3p, fields=None, ip_pool=None,
+                             context=None, subnetpool_prefixes=None):
         res = super(GroupPolicyMappingDbPlugin,
-                    self)._make_l3_policy_dict(l3p)
+                    self)._make_l3_policy_dict(l3p, fields)
         res['routers'] = [router.router_id for router in l3p.routers]
         res['address_scope_v4_id'] = l3p.address_scope_v4_id
         res['address_scope_v6_id'] = l3p.address_scope_v6_id
@@ -185,10 +180,12 @@ class GroupPolicyMappingDbPlugin(gpdb.GroupPolicyDbPlugin):
         res['subnetpools_v6'] = [sp.subnetpool_id for sp in l3p.subnetpools_v6]
         if ip_pool:
             res['ip_pool'] = ip_pool
-        subnetpools = self._get_subnetpools(res['subnetpools_v4'] +
-                                            res['subnetpools_v6'])
-        pool_list = [prefix['cidr'] for pool in subnetpools
-                     for prefix in pool['prefixes']]
+        subnetpool_ids = res['subnetpools_v4'] + res['subnetpools_v6']
+        if subnetpool_prefixes is None:
+            subnetpool_prefixes = self._get_subnetpool_prefixes(
+                context or n_context.get_admin_context(), subnetpool_ids)
+        pool_list = [cidr for sp_id in subnetpool_ids
+                     for cidr in subnetpool_prefixes.get(sp_id, [])]
         if pool_list:
             res['ip_pool'] = utils.convert_ip_pool_list_to_string(
                 pool_list)
@@ -196,7 +193,7 @@ class GroupPolicyMappingDbPlugin(gpdb.GroupPolicyDbPlugin):
 
     def _make_external_segment_dict(self, es, fields=None):
         res = super(GroupPolicyMappingDbPlugin,
-                    self)._make_external_segment_dict(es)
+                    self)._make_external_segment_dict(es, fields)
         res['subnet_id'] = es.subnet_id
         return self._fields(res, fields)
 
@@ -636,7 +633,8 @@ class GroupPolicyMappingDbPlugin(gpdb.GroupPolicyDbPlugin):
                 self._set_ess_for_l3p(context, l3p_db,
                                       l3p['external_segments'])
             context.session.add(l3p_db)
-        return self._make_l3_policy_dict(l3p_db, ip_pool=l3p['ip_pool'])
+        return self._make_l3_policy_dict(l3p_db, ip_pool=l3p['ip_pool'],
+                                         context=context)
 
     @log.log_method_call
     def update_l3_policy(self, context, l3_policy_id, l3_policy):
@@ -685,7 +683,37 @@ class GroupPolicyMappingDbPlugin(gpdb.GroupPolicyDbPlugin):
                                       l3p['external_segments'])
                 del l3p['external_segments']
             l3p_db.update(l3p)
-        return self._make_l3_policy_dict(l3p_db)
+        return self._make_l3_policy_dict(l3p_db, context=context)
+
+    @log.log_method_call
+    def get_l3_policy(self, context, l3_policy_id, fields=None):
+        l3p = self._get_l3_policy(context, l3_policy_id)
+        return self._make_l3_policy_dict(l3p, fields, context=context)
+
+    @log.log_method_call
+    def get_l3_policies(self, context, filters=None, fields=None,
+                        sorts=None, limit=None, marker=None,
+                        page_reverse=False):
+        marker_obj = self._get_marker_obj(context, 'l3_policy', limit,
+                                          marker)
+        query = self._get_collection_query(context, L3PolicyMapping,
+                                           filters=filters, sorts=sorts,
+                                           limit=limit,
+                                           marker_obj=marker_obj,
+                                           page_reverse=page_reverse)
+        query = self._apply_eager_load_profile(query, L3PolicyMapping,
+                                               fields)
+        l3ps = query.all()
+        # Prefixes of the subnetpools of the whole page, in one query
+        subnetpool_prefixes = self._get_subnetpool_prefixes(
+            context, [sp.subnetpool_id for l3p in l3ps
+                      for sp in l3p.subnetpools_v4 + l3p.subnetpools_v6])
+        items = [self._make_l3_policy_dict(
+            l3p, fields, context=context,
+            subnetpool_prefixes=subnetpool_prefixes) for l3p in l3ps]
+        if limit and page_reverse:
+            items.reverse()
+        return items
 
     @log.log_method_call
     def create_external_segment(self, context, external_segment):
@@ -0,0 +1,42 @@
+# Copyright 2017 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+"""apic_aim cache generations
+
+Revision ID: 4c0a1d9e6b27
+Revises: 9b2c5d7e1f3a
+Create Date: 2017-07-24 09:41:17.204518
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '4c0a1d9e6b27'
+down_revision = '9b2c5d7e1f3a'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    generations = op.create_table(
+        'apic_aim_cache_generations',
+        sa.Column('name', sa.String(64), nullable=False),
+        sa.Column('generation', sa.Integer, nullable=False),
+        sa.PrimaryKeyConstraint('name'))
+    op.bulk_insert(generations, [{'name': 'vrf_subnets', 'generation': 0}])
+
+
+def downgrade():
+    pass
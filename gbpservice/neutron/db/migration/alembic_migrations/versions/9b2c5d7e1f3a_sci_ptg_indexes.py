@@ -0,0 +1,42 @@
+# Copyright 2017 OpenStack Foundation
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+"""servicechain instance PTG indexes
+
+Revision ID: 9b2c5d7e1f3a
+Revises: 27b724002081
+Create Date: 2017-07-20 10:12:41.532187
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '9b2c5d7e1f3a'
+down_revision = '27b724002081'
+
+from alembic import op
+
+
+def upgrade():
+    op.create_index(op.f('ix_sc_instances_provider_ptg_id'),
+                    'sc_instances', ['provider_ptg_id'], unique=False)
+    op.create_index(op.f('ix_sc_instances_consumer_ptg_id'),
+                    'sc_instances', ['consumer_ptg_id'], unique=False)
+    op.create_index(op.f('ix_gpm_ptgs_servicechain_mapping_consumer_ptg_id'),
+                    'gpm_ptgs_servicechain_mapping', ['consumer_ptg_id'],
+                    unique=False)
+
+
+def downgrade():
+    pass
@@ -95,10 +95,10 @@ class ServiceChainInstance(model_base.BASEV2, BaseSCResource):
     provider_ptg_id = sa.Column(sa.String(36),
                              # FixMe(Magesh) Issue with cascade on Delete
                              # sa.ForeignKey('gp_policy_target_groups.id'),
-                             nullable=True)
+                             nullable=True, index=True)
     consumer_ptg_id = sa.Column(sa.String(36),
                              # sa.ForeignKey('gp_policy_target_groups.id'),
-                             nullable=True)
+                             nullable=True, index=True)
     management_ptg_id = sa.Column(sa.String(36),
                                   # sa.ForeignKey('gp_policy_target_groups.id'),
                                   nullable=True)
@@ -406,20 +406,17 @@ class ServiceChainDbPlugin(schain.ServiceChainPluginBase,
                 instance_db.specs.append(assoc)
 
     def _get_instances_from_policy_target(self, context, policy_target):
+        # A single query on the indexed PTG columns, which doesn't return
+        # duplicates and skips the status evaluation of the plugins
+        ptg_id = policy_target['policy_target_group_id']
         with context.session.begin(subtransactions=True):
-            ptg_id = policy_target['policy_target_group_id']
-            scis_p = self.get_servicechain_instances(
-                context, {'provider_ptg_id': [ptg_id]})
-            scis_c = self.get_servicechain_instances(
-                context, {'consumer_ptg_id': [ptg_id]})
-            # Don't return duplicates
-            result = []
-            seen = set()
-            for sci in scis_p + scis_c:
-                if sci['id'] not in seen:
-                    seen.add(sci['id'])
-                    result.append(sci)
-            return result
+            query = self._model_query(context, ServiceChainInstance)
+            query = query.filter(sa.or_(
+                ServiceChainInstance.provider_ptg_id == ptg_id,
+                ServiceChainInstance.consumer_ptg_id == ptg_id))
+            query = query.options(
+                orm.subqueryload(ServiceChainInstance.specs))
+            return [self._make_sc_instance_dict(c) for c in query]
 
     @log.log_method_call
     def create_servicechain_spec(self, context, servicechain_spec,
@@ -551,12 +548,16 @@ class ServiceChainDbPlugin(schain.ServiceChainPluginBase,
                                    page_reverse=False):
         marker_obj = self._get_marker_obj(context, 'servicechain_instance',
                                           limit, marker)
-        return self._get_collection(context, ServiceChainInstance,
-                                    self._make_sc_instance_dict,
-                                    filters=filters, fields=fields,
-                                    sorts=sorts, limit=limit,
-                                    marker_obj=marker_obj,
-                                    page_reverse=page_reverse)
+        query = self._get_collection_query(context, ServiceChainInstance,
+                                           filters=filters, sorts=sorts,
+                                           limit=limit, marker_obj=marker_obj,
+                                           page_reverse=page_reverse)
+        # Load the specs of the whole page at once
+        query = query.options(orm.subqueryload(ServiceChainInstance.specs))
+        items = [self._make_sc_instance_dict(c, fields) for c in query]
+        if limit and page_reverse:
+            items.reverse()
+        return items
 
     @log.log_method_call
     def get_servicechain_instances_count(self, context, filters=None):
@@ -342,6 +342,30 @@ class ServiceChainPluginBase(service_base.ServicePluginBase):
         """
         pass
 
+    def update_chains_pts_added(self, context, policy_targets,
+                                instance_ids):
+        """ Auto scaling function.
+
+        Override this method to react to creation of a set of policy targets
+        relevant to a set of chain instances at once.
+        """
+        for instance_id in instance_ids:
+            for policy_target in policy_targets:
+                self.update_chains_pt_added(context, policy_target,
+                                            instance_id)
+
+    def update_chains_pts_removed(self, context, policy_targets,
+                                  instance_ids):
+        """ Auto scaling function.
+
+        Override this method to react to deletion of a set of policy targets
+        relevant to a set of chain instances at once.
+        """
+        for instance_id in instance_ids:
+            for policy_target in policy_targets:
+                self.update_chains_pt_removed(context, policy_target,
+                                              instance_id)
+
     def update_chains_consumer_added(self, context, policy_target_group,
                                      instance_id):
         """ Auto scaling function.
@@ -13,17 +13,23 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
 from gbpclient.v2_0 import client as gbp_client
 from keystoneclient import auth as ksc_auth
 from keystoneclient import session as ksc_session
 from keystoneclient.v3 import client as ksc_client
 from oslo_config import cfg
 from oslo_log import log as logging
+from sqlalchemy import event
 
 from gbpservice._i18n import _LW
+from gbpservice.neutron.plugins.ml2plus.drivers.apic_aim import db
 
 LOG = logging.getLogger(__name__)
 
+VRF_SUBNETS_GENERATION = 'vrf_subnets'
+
 # REVISIT(rkukura): We use keystone to get the name of the keystone
 # project owning each neutron resource, which by default, requires
 # admin. If we keep this, we should probably move it to a separate
@@ -114,3 +120,93 @@ class ProjectNameCache(object):
         if self.gbp:
             LOG.debug("Calling gbp purge() API")
             self.gbp.purge(project_id)
+
+
+class VrfSubnetsCache(object):
+    """Cache of the subnet CIDRs of each VRF, keyed by VRF identity.
+
+    Invalidated as a whole by the mechanism driver on any subnet,
+    subnetpool, address scope or router interface change. API and RPC
+    workers each hold their own cache, so the invalidation also bumps a
+    generation stored in the DB within the transaction of the change.
+    Lookups read that generation first, and drop what was cached under
+    an older one. Entries also expire after ttl seconds. A ttl of 0
+    disables the cache.
+    """
+
+    def __init__(self, ttl=30):
+        self._ttl = ttl
+        # {(vrf_tenant_name, vrf_name): (cidrs, expiry)}
+        self._subnets = {}
+        # Bumped on each invalidation, so that a lookup racing with a
+        # change does not store what it loaded before the change.
+        self._generation = 0
+        # DB generation the cached subnets were loaded under
+        self._db_generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, session, vrf_tenant_name, vrf_name, loader):
+        if self._ttl <= 0:
+            self.misses += 1
+            return list(loader())
+        db_generation = self._get_db_generation(session)
+        if db_generation != self._db_generation:
+            # Changed by this or another process since they were cached
+            self._clear()
+            self._db_generation = db_generation
+        key = (vrf_tenant_name, vrf_name)
+        entry = self._subnets.get(key)
+        if entry and entry[1] >= time.time():
+            self.hits += 1
+            return list(entry[0])
+        self.misses += 1
+        generation = self._generation
+        cidrs = loader()
+        if generation == self._generation:
+            self._subnets[key] = (tuple(cidrs), time.time() + self._ttl)
+        return list(cidrs)
+
+    def invalidate(self, session=None):
+        """Drop all the cached VRF subnets.
+
+        :param session: DB session of the change, if any
+
+        When called inside a transaction, the DB generation is bumped
+        in it, and the cache is cleared once more after the commit,
+        since lookups made before it could have stored the old subnets
+        again.
+        """
+        LOG.debug("Invalidating VRF subnets cache, stats: %s", self.stats())
+        self._clear()
+        if session is not None and session.is_active:
+            self._bump_db_generation(session)
+            event.listen(session, 'after_commit', self._after_commit,
+                         once=True)
+
+    def _after_commit(self, session):
+        self._clear()
+
+    def _clear(self):
+        self._subnets.clear()
+        self._generation += 1
+
+    def _get_db_generation(self, session):
+        return (session.query(db.CacheGeneration.generation).
+                filter_by(name=VRF_SUBNETS_GENERATION).
+                scalar()) or 0
+
+    def _bump_db_generation(self, session):
+        with session.begin(subtransactions=True):
+            updated = (session.query(db.CacheGeneration).
+                       filter_by(name=VRF_SUBNETS_GENERATION).
+                       update({'generation':
+                               db.CacheGeneration.generation + 1},
+                              synchronize_session=False))
+            if not updated:
+                session.add(db.CacheGeneration(
+                    name=VRF_SUBNETS_GENERATION, generation=1))
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._subnets)}
@@ -41,6 +41,14 @@ apic_opts = [
                 help=("This will enable purging all the resources including "
                       "the tenant once a keystone project.deleted "
                       "notification is received.")),
+    cfg.IntOpt('vrf_subnets_cache_ttl',
+               default=30,
+               help=("Seconds the subnets of a VRF are cached for the "
+                     "endpoint details RPC. The cache is invalidated on "
+                     "subnet, subnetpool, address scope and router "
+                     "interface changes, in all the processes and servers "
+                     "through a generation stored in the DB. Set to 0 to "
+                     "disable the cache.")),
 ]
 
 
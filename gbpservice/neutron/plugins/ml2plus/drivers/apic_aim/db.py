@@ -61,6 +61,13 @@ class NetworkMapping(model_base.BASEV2):
     vrf_tenant_name = sa.Column(sa.String(64))
 
 
+class CacheGeneration(model_base.BASEV2):
+    __tablename__ = 'apic_aim_cache_generations'
+
+    name = sa.Column(sa.String(64), primary_key=True)
+    generation = sa.Column(sa.Integer, nullable=False, default=0)
+
+
 class DbMixin(object):
     def _add_address_scope_mapping(self, session, scope_id, vrf,
                                    vrf_owned=True):
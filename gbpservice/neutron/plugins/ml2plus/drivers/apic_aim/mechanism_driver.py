@@ -162,6 +162,8 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
     def initialize(self):
         LOG.info(_LI("APIC AIM MD initializing"))
         self.project_name_cache = cache.ProjectNameCache()
+        self.vrf_subnets_cache = cache.VrfSubnetsCache(
+            ttl=cfg.CONF.ml2_apic_aim.vrf_subnets_cache_ttl)
         self.name_mapper = apic_mapper.APICNameMapper()
         self.aim = aim_manager.AimManager()
         self._core_plugin = None
@@ -379,6 +381,7 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
         LOG.debug("APIC AIM MD creating subnet: %s", current)
 
         session = context._plugin_context.session
+        self.vrf_subnets_cache.invalidate(session)
         aim_ctx = aim_context.AimContext(session)
 
         network_id = current['network_id']
@@ -401,6 +404,7 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
         LOG.debug("APIC AIM MD updating subnet: %s", current)
 
         session = context._plugin_context.session
+        self.vrf_subnets_cache.invalidate(session)
         aim_ctx = aim_context.AimContext(session)
 
         network_id = current['network_id']
@@ -448,6 +452,7 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
         LOG.debug("APIC AIM MD deleting subnet: %s", current)
 
         session = context._plugin_context.session
+        self.vrf_subnets_cache.invalidate(session)
         aim_ctx = aim_context.AimContext(session)
 
         network_id = current['network_id']
@@ -500,10 +505,15 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
         result[cisco_apic.DIST_NAMES] = dist_names
         result[cisco_apic.SYNC_STATE] = sync_state
 
+    def create_subnetpool_precommit(self, context):
+        LOG.debug("APIC AIM MD creating subnetpool: %s", context.current)
+        self.vrf_subnets_cache.invalidate(context._plugin_context.session)
+
     def update_subnetpool_precommit(self, context):
         current = context.current
         original = context.original
         LOG.debug("APIC AIM MD updating subnetpool: %s", current)
+        self.vrf_subnets_cache.invalidate(context._plugin_context.session)
 
         if 'address_scope_id' not in current:
             # address_scope_id may not be returned with update,
@@ -544,6 +554,7 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
         LOG.debug("APIC AIM MD creating address scope: %s", current)
 
         session = context._plugin_context.session
+        self.vrf_subnets_cache.invalidate(session)
         aim_ctx = aim_context.AimContext(session)
         id = current['id']
 
@@ -564,12 +575,17 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
         current[cisco_apic.DIST_NAMES] = {cisco_apic.VRF: vrf.dn}
         current[cisco_apic.SYNC_STATE] = sync_state
 
+    def delete_subnetpool_precommit(self, context):
+        LOG.debug("APIC AIM MD deleting subnetpool: %s", context.current)
+        self.vrf_subnets_cache.invalidate(context._plugin_context.session)
+
     def update_address_scope_precommit(self, context):
         current = context.current
         original = context.original
         LOG.debug("APIC AIM MD updating address_scope: %s", current)
 
         session = context._plugin_context.session
+        self.vrf_subnets_cache.invalidate(session)
         aim_ctx = aim_context.AimContext(session)
         mapping = self._get_address_scope_mapping(session, current['id'])
 
@@ -583,6 +599,7 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
         LOG.debug("APIC AIM MD deleting address scope: %s", current)
 
         session = context._plugin_context.session
+        self.vrf_subnets_cache.invalidate(session)
         aim_ctx = aim_context.AimContext(session)
         mapping = self._get_address_scope_mapping(session, current['id'])
 
@@ -820,6 +837,7 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
                   {'subnets': subnets, 'router': router, 'port': port})
 
         session = context.session
+        self.vrf_subnets_cache.invalidate(session)
         aim_ctx = aim_context.AimContext(session)
 
         network_id = port['network_id']
@@ -1049,6 +1067,7 @@ class ApicMechanismDriver(api_plus.MechanismDriver,
                   {'subnets': subnets, 'router': router_id, 'port': port})
 
         session = context.session
+        self.vrf_subnets_cache.invalidate(session)
         aim_ctx = aim_context.AimContext(session)
 
         network_id = port['network_id']
@@ -0,0 +1,89 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+from oslo_log import log as logging
+
+
+LOG = logging.getLogger(__name__)
+CACHE_ATTR = '_gbp_request_cache'
+
+
+class RequestCache(object):
+    """Read-through cache of GBP resources for a single request.
+
+    The cache hangs off the plugin context, so it lives as long as the
+    API request that created the context. Resources are keyed by type,
+    id and admin-ness of the reader. Since GBP resources carry
+    attributes derived from other resources (e.g. the PTGs providing a
+    PRS), any write drops the whole cache rather than single entries.
+    Callers get copies and can't alter the cached resources.
+    """
+
+    def __init__(self):
+        self._resources = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, resource, resource_id, loader, is_admin=False):
+        key = (resource, resource_id, is_admin)
+        try:
+            result = self._resources[key]
+            self.hits += 1
+        except KeyError:
+            self.misses += 1
+            result = self._resources[key] = loader(resource_id)
+        return copy.deepcopy(result)
+
+    def get_many(self, resource, resource_ids, loader, is_admin=False):
+        """Return the resources for the ids, loading only missing ones.
+
+        The loader gets the list of ids not yet cached, and returns
+        the resources found for them. Unknown ids are skipped, as a
+        filtered GET does.
+        """
+        resource_ids = list(resource_ids)
+        missing = [x for x in resource_ids
+                   if (resource, x, is_admin) not in self._resources]
+        self.hits += len(resource_ids) - len(missing)
+        if missing:
+            self.misses += len(missing)
+            for result in loader(missing):
+                self._resources[(resource, result['id'], is_admin)] = result
+        return [copy.deepcopy(self._resources[(resource, x, is_admin)])
+                for x in resource_ids
+                if (resource, x, is_admin) in self._resources]
+
+    def invalidate(self):
+        self._resources.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._resources)}
+
+
+def get_request_cache(plugin_context):
+    """Return the cache of the plugin context, creating it if needed. """
+    cache = getattr(plugin_context, CACHE_ATTR, None)
+    if cache is None:
+        cache = RequestCache()
+        setattr(plugin_context, CACHE_ATTR, cache)
+    return cache
+
+
+def invalidate_request_cache(plugin_context):
+    cache = getattr(plugin_context, CACHE_ATTR, None)
+    if cache is not None:
+        LOG.debug("Invalidating GBP request cache, stats: %s",
+                  cache.stats())
+        cache.invalidate()
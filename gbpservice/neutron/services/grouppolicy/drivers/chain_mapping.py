@@ -67,7 +67,7 @@ class PtgServiceChainInstanceMapping(model_base.BASEV2, model_base.HasProject):
                                               ondelete='CASCADE'),
                                 nullable=False)
     # Consumer PTG could be an External Policy
-    consumer_ptg_id = sa.Column(sa.String(36), nullable=False)
+    consumer_ptg_id = sa.Column(sa.String(36), nullable=False, index=True)
     servicechain_instance_id = sa.Column(sa.String(36),
                                          sa.ForeignKey('sc_instances.id',
                                                        ondelete='CASCADE'),
@@ -147,16 +147,10 @@ class ChainMappingDriver(api.PolicyDriver, local_api.LocalAPI,
     def _create_policy_target_postcommit(self, context):
         if not context._plugin._is_service_target(context._plugin_context,
                                                   context.current['id']):
-            mappings = self._get_ptg_servicechain_mapping(
-                context._plugin_context.session,
-                provider_ptg_id=context.current['policy_target_group_id'])
-            for mapping in mappings:
-                chain_context = self._get_chain_admin_context(
-                    context._plugin_context,
-                    instance_id=mapping.servicechain_instance_id)
-                self._notify_sc_plugin_pt_added(
-                    chain_context, context.current,
-                    mapping.servicechain_instance_id)
+            for chain_context, instance_ids in self._get_pt_chain_instances(
+                    context):
+                self._notify_sc_plugin_pts_added(
+                    chain_context, [context.current], instance_ids)
 
     @log.log_method_call
     def create_policy_target_precommit(self, context):
@@ -171,16 +165,28 @@ class ChainMappingDriver(api.PolicyDriver, local_api.LocalAPI,
     @log.log_method_call
     def _delete_policy_target_postcommit(self, context):
         if not context._is_service_target:
-            mappings = self._get_ptg_servicechain_mapping(
-                context._plugin_context.session,
-                provider_ptg_id=context.current['policy_target_group_id'])
-            for mapping in mappings:
-                chain_context = self._get_chain_admin_context(
-                    context._plugin_context,
-                    instance_id=mapping.servicechain_instance_id)
-                self._notify_sc_plugin_pt_removed(
-                    chain_context, context.current,
-                    mapping.servicechain_instance_id)
+            for chain_context, instance_ids in self._get_pt_chain_instances(
+                    context):
+                self._notify_sc_plugin_pts_removed(
+                    chain_context, [context.current], instance_ids)
+
+    def _get_pt_chain_instances(self, context):
+        """Chain instances provided by the PTG of the PT, per chain context.
+
+        The instances are grouped by owner, so that the servicechain plugin
+        is notified once per chain admin context.
+        """
+        mappings = self._get_ptg_servicechain_mapping(
+            context._plugin_context.session,
+            provider_ptg_id=context.current['policy_target_group_id'])
+        instance_ids = {}
+        for mapping in mappings:
+            instance_ids.setdefault(mapping.tenant_id, []).append(
+                mapping.servicechain_instance_id)
+        # The mappings are known, don't look them up again per instance
+        return [(self._get_chain_admin_context(context._plugin_context,
+                                               tenant_id=tenant_id), ids)
+                for tenant_id, ids in instance_ids.items()]
 
     @log.log_method_call
     def delete_policy_target_precommit(self, context):
@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
 import hashlib
 import netaddr
 import re
@@ -119,6 +120,21 @@ opts = [
                 help=_('If True, advertise network MTU values if core plugin '
                        'calculates them. MTU is advertised to running '
                        'instances via DHCP and RA MTU options.')),
+    cfg.IntOpt('vm_name_cache_ttl',
+               default=300,
+               help=_("Seconds a VM name fetched from Nova is cached for "
+                      "the endpoint details RPC. Servers of a host are "
+                      "listed at most once in this interval.")),
+    cfg.IntOpt('vm_name_cache_size',
+               default=10000,
+               help=_("Maximum number of VM names cached, least recently "
+                      "used ones are evicted first.")),
+    cfg.FloatOpt('vm_name_lookup_timeout',
+                 default=0.5,
+                 help=_("Seconds the endpoint details RPC waits for Nova "
+                        "to resolve a VM name. On timeout the device_id "
+                        "is returned and the port is updated once the "
+                        "name is known.")),
 ]
 
 cfg.CONF.register_opts(opts, "aim_mapping")
@@ -1908,8 +1924,62 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
             session = context._plugin_context.session
         return aim_context.AimContext(session)
 
-    def _is_port_promiscuous(self, plugin_context, port):
-        pt = self._port_id_to_pt(plugin_context, port['id'])
+    @staticmethod
+    def _cached(details, key, item_key, loader):
+        # Memoize loader() in the RPC details cache, the cache can be
+        # shared by all the ports of a batch and prefilled by
+        # _prefetch_port_details.
+        if not details or '_cache' not in details:
+            return loader()
+        items = details['_cache'].setdefault(key, {})
+        if item_key not in items:
+            items[item_key] = loader()
+        return items[item_key]
+
+    def _prefetch_port_details(self, plugin_context, ports, host, cache):
+        port_ids = [port['id'] for port in ports]
+        network_ids = list(set(port['network_id'] for port in ports))
+        subnet_ids = list(set(ip['subnet_id'] for port in ports
+                              for ip in port['fixed_ips']))
+
+        pts = dict((port_id, None) for port_id in port_ids)
+        for pt in self._get_policy_targets(plugin_context,
+                                           filters={'port_id': port_ids}):
+            pts[pt['port_id']] = pt
+        cache['pts'] = pts
+        ptg_ids = list(set(pt['policy_target_group_id']
+                           for pt in pts.values() if pt))
+        cache['ptgs'] = dict(
+            (ptg['id'], ptg) for ptg in self._get_policy_target_groups(
+                plugin_context, filters={'id': ptg_ids}))
+
+        cache['networks'] = dict(
+            (net['id'], net) for net in self._get_networks(
+                plugin_context, filters={'id': network_ids}))
+        l2ps = dict((net_id, None) for net_id in network_ids)
+        for l2p in self._get_l2_policies(
+                plugin_context, filters={'network_id': network_ids}):
+            l2ps[l2p['network_id']] = l2p
+        cache['l2ps'] = l2ps
+
+        cache['subnets'] = dict(
+            (subnet['id'], subnet) for subnet in self._get_subnets(
+                plugin_context, filters={'id': subnet_ids}))
+        dhcp_ports = dict((net_id, []) for net_id in network_ids)
+        for dhcp_port in self._get_ports(
+                plugin_context,
+                filters={'network_id': network_ids,
+                         'device_owner': [n_constants.DEVICE_OWNER_DHCP]}):
+            dhcp_ports[dhcp_port['network_id']].append(dhcp_port)
+        cache['dhcp_ports'] = dhcp_ports
+
+    def _get_port_pt(self, plugin_context, port, details=None):
+        return self._cached(
+            details, 'pts', port['id'],
+            lambda: self._port_id_to_pt(plugin_context, port['id']))
+
+    def _is_port_promiscuous(self, plugin_context, port, details=None):
+        pt = self._get_port_pt(plugin_context, port, details)
         if (pt and pt.get('cluster_id') and
                 pt.get('cluster_id') != pt['id']):
             master = self._get_policy_target(plugin_context, pt['cluster_id'])
@@ -1934,15 +2004,25 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
             details['dhcp_lease_time'] = (
                 self.aim_mech_driver.apic_optimized_dhcp_lease_time)
 
-    def _get_port_epg(self, plugin_context, port):
-        ptg, pt = self._port_id_to_ptg(plugin_context, port['id'])
-        if ptg:
-            return self._get_aim_endpoint_group(plugin_context.session, ptg)
+    def _get_port_epg(self, plugin_context, port, details=None):
+        pt = self._get_port_pt(plugin_context, port, details)
+        if pt:
+            ptg_id = pt['policy_target_group_id']
+            ptg = self._cached(
+                details, 'ptgs', ptg_id,
+                lambda: self.gbp_plugin.get_policy_target_group(
+                    plugin_context, ptg_id))
+            return self._cached(
+                details, 'epgs', ptg_id,
+                lambda: self._get_aim_endpoint_group(plugin_context.session,
+                                                     ptg))
         else:
             # Return default EPG based on network
-            network = self._get_network(plugin_context, port['network_id'])
-            epg = self._get_aim_default_endpoint_group(plugin_context.session,
-                                                       network)
+            network = self._get_port_network(plugin_context, port, details)
+            epg = self._cached(
+                details, 'default_epgs', port['network_id'],
+                lambda: self._get_aim_default_endpoint_group(
+                    plugin_context.session, network))
             if not epg:
                 # Something is wrong, default EPG doesn't exist.
                 # TODO(ivar): should rise an exception
@@ -1950,25 +2030,45 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
                               "port %s"), port['id'])
             return epg
 
+    def _get_port_network(self, plugin_context, port, details=None):
+        return self._cached(
+            details, 'networks', port['network_id'],
+            lambda: self._get_network(plugin_context, port['network_id']))
+
     def _get_subnet_details(self, plugin_context, port, details):
         # L2P might not exist for a pure Neutron port
-        l2p = self._network_id_to_l2p(plugin_context, port['network_id'])
+        l2p = self._cached(
+            details, 'l2ps', port['network_id'],
+            lambda: self._network_id_to_l2p(plugin_context,
+                                            port['network_id']))
         # TODO(ivar): support shadow network
         # if not l2p and self._ptg_needs_shadow_network(context, ptg):
         #    l2p = self._get_l2_policy(context._plugin_context,
         #                              ptg['l2_policy_id'])
 
-        subnets = self._get_subnets(
-            plugin_context,
-            filters={'id': [ip['subnet_id'] for ip in port['fixed_ips']]})
+        subnet_ids = []
+        for ip in port['fixed_ips']:
+            if ip['subnet_id'] not in subnet_ids:
+                subnet_ids.append(ip['subnet_id'])
+        cached_subnets = (details or {}).get('_cache', {}).get('subnets', {})
+        if all(x in cached_subnets for x in subnet_ids):
+            # Subnets are modified below, don't alter the cached ones
+            subnets = [copy.deepcopy(cached_subnets[x]) for x in subnet_ids]
+        else:
+            subnets = self._get_subnets(plugin_context,
+                                        filters={'id': subnet_ids})
         for subnet in subnets:
             dhcp_ips = set()
-            for port in self._get_ports(
-                    plugin_context,
-                    filters={
-                        'network_id': [subnet['network_id']],
-                        'device_owner': [n_constants.DEVICE_OWNER_DHCP]}):
-                dhcp_ips |= set([x['ip_address'] for x in port['fixed_ips']
+            network_id = subnet['network_id']
+            for dhcp_port in self._cached(
+                    details, 'dhcp_ports', network_id,
+                    lambda: self._get_ports(
+                        plugin_context,
+                        filters={
+                            'network_id': [network_id],
+                            'device_owner': [n_constants.DEVICE_OWNER_DHCP]})):
+                dhcp_ips |= set([x['ip_address']
+                                 for x in dhcp_port['fixed_ips']
                                  if x['subnet_id'] == subnet['id']])
             dhcp_ips = list(dhcp_ips)
             if not subnet['dns_nameservers']:
@@ -2021,13 +2121,27 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
         return aaps
 
     def _get_port_vrf(self, plugin_context, port, details):
-        net_db = self._core_plugin._get_network(plugin_context,
-                                                port['network_id'])
-        return self.aim_mech_driver.get_vrf_for_network(
-            plugin_context.session, net_db)
+        def get_vrf():
+            net_db = self._core_plugin._get_network(plugin_context,
+                                                    port['network_id'])
+            return self.aim_mech_driver.get_vrf_for_network(
+                plugin_context.session, net_db)
+        return self._cached(details, 'vrfs', port['network_id'], get_vrf)
 
     def _get_vrf_subnets(self, plugin_context, vrf_tenant_name, vrf_name,
                          details):
+        # All the ports of a VRF get the same subnets, so they are
+        # cached across requests by the mechanism driver which
+        # invalidates them on subnet, subnetpool, address scope and
+        # router interface changes.
+        return list(self._cached(
+            details, 'vrf_subnets', (vrf_tenant_name, vrf_name),
+            lambda: self.aim_mech_driver.vrf_subnets_cache.get(
+                plugin_context.session, vrf_tenant_name, vrf_name,
+                lambda: self._query_vrf_subnets(
+                    plugin_context, vrf_tenant_name, vrf_name))))
+
+    def _query_vrf_subnets(self, plugin_context, vrf_tenant_name, vrf_name):
         session = plugin_context.session
         result = []
         # get all subnets of the specified VRF
@@ -2072,7 +2186,7 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
         return result
 
     def _get_segmentation_labels(self, plugin_context, port, details):
-        pt = self._port_id_to_pt(plugin_context, port['id'])
+        pt = self._get_port_pt(plugin_context, port, details)
         if self.apic_segmentation_label_driver and pt and (
                     'segmentation_labels' in pt):
             return pt['segmentation_labels']
@@ -2503,9 +2617,9 @@ class AIMMappingDriver(nrd.CommonNeutronBase, aim_rpc.AIMMappingRPCMixin):
                             gpdb.PolicyRule.id).filter(
                                 gpdb.PolicyRule.id.in_(pr_ids)).all())]
 
-    def _get_port_mtu(self, context, port):
+    def _get_port_mtu(self, context, port, details=None):
         if self.advertise_mtu:
-            network = self._get_network(context, port['network_id'])
+            network = self._get_port_network(context, port, details)
             return network.get('mtu')
         return None
 
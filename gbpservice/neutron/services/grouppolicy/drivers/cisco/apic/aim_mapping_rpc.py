@@ -12,11 +12,14 @@
 
 from apic_ml2.neutron.db import port_ha_ipaddress_binding as ha_ip_db
 
+import eventlet
 from neutron.common import rpc as n_rpc
 from neutron.common import topics
+from neutron import context as n_context
 from neutron.db import api as db_api
 from neutron.plugins.ml2 import rpc as ml2_rpc
 from opflexagent import rpc as o_rpc
+from oslo_config import cfg
 from oslo_log import log
 
 from gbpservice._i18n import _LE
@@ -27,6 +30,17 @@ from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
 LOG = log.getLogger(__name__)
 
 
+class AIMMappingRpcCallback(o_rpc.GBPServerRpcCallback):
+    """Opflex RPC callback of the AIM mapping.
+
+    The opflex callback answers a list of devices one device at a time,
+    hand the whole list to the driver so that it is loaded in batch.
+    """
+
+    def get_gbp_details_list(self, context, **kwargs):
+        return self.gbp_driver.get_gbp_details_list(context, **kwargs)
+
+
 class AIMMappingRPCMixin(ha_ip_db.HAIPOwnerDbMixin):
     """RPC mixin for AIM mapping.
 
@@ -42,7 +56,7 @@ class AIMMappingRPCMixin(ha_ip_db.HAIPOwnerDbMixin):
         self.notifier = o_rpc.AgentNotifierApi(topics.AGENT)
         LOG.debug("Set up Opflex RPC listeners.")
         self.opflex_endpoints = [
-            o_rpc.GBPServerRpcCallback(self, self.notifier)]
+            AIMMappingRpcCallback(self, self.notifier)]
         self.opflex_topic = o_rpc.TOPIC_OPFLEX
         self.opflex_conn = n_rpc.create_connection()
         self.opflex_conn.create_consumer(
@@ -86,6 +100,38 @@ class AIMMappingRPCMixin(ha_ip_db.HAIPOwnerDbMixin):
             LOG.exception(e)
             return {'device': device}
 
+    def get_gbp_details_list(self, context, **kwargs):
+        """Return the gbp details of a batch of devices of a host.
+
+        Data shared by the devices, like networks, subnets, EPGs and VRF
+        subnets, is loaded once for the whole batch.
+        """
+        LOG.debug("APIC AIM handling get_gbp_details_list for: %s", kwargs)
+        devices = kwargs.pop('devices', None) or []
+        if not devices:
+            return []
+        host = kwargs.get('host')
+        cache = {}
+        try:
+            self._prefetch_gbp_details(context, devices, host, cache)
+        except Exception as e:
+            LOG.error(_LE("An exception has occurred while prefetching "
+                          "gbp details for %s"), devices)
+            LOG.exception(e)
+            cache = {}
+        result = []
+        for device in devices:
+            request = dict(kwargs, device=device)
+            try:
+                result.append(self._get_gbp_details(context, request, host,
+                                                    cache=cache))
+            except Exception as e:
+                LOG.error(_LE("An exception has occurred while retrieving "
+                              "device gbp details for %s"), device)
+                LOG.exception(e)
+                result.append({'device': device})
+        return result
+
     def request_endpoint_details(self, context, **kwargs):
         LOG.debug("APIC AIM handling get_endpoint_details for: %s", kwargs)
         try:
@@ -115,18 +161,29 @@ class AIMMappingRPCMixin(ha_ip_db.HAIPOwnerDbMixin):
             LOG.debug("APIC ownership update for port %s", p)
             self._send_port_update_notification(context, p)
 
+    # Child class needs to support:
+    # - self._prefetch_port_details(context, ports, host, cache): fill the
+    # cache shared by a batch of ports with set based queries.
+    def _prefetch_gbp_details(self, context, devices, host, cache):
+        with context.session.begin(subtransactions=True):
+            core_plugin = self._core_plugin
+            port_ids = [core_plugin._device_to_port_id(context, device)
+                        for device in devices]
+            ports = core_plugin.get_ports(context, filters={'id': port_ids})
+            self._prefetch_port_details(context, ports, host, cache)
+
     # Things you need in order to run this Mixin:
     # - self._core_plugin: attribute that points to the Neutron core plugin;
-    # - self._is_port_promiscuous(context, port): define whether or not
-    # a port should be put in promiscuous mode;
-    # - self._get_port_epg(context, port): returns the AIM EPG for the specific
-    # port
+    # - self._is_port_promiscuous(context, port, details): define whether
+    # or not a port should be put in promiscuous mode;
+    # - self._get_port_epg(context, port, details): returns the AIM EPG for
+    # the specific port
     # for both Neutron and GBP.
     # - self._is_dhcp_optimized(context, port);
     # - self._is_metadata_optimized(context, port);
     # - self._set_dhcp_lease_time(details)
     @db_api.retry_db_errors
-    def _get_gbp_details(self, context, request, host):
+    def _get_gbp_details(self, context, request, host, cache=None):
         with context.session.begin(subtransactions=True):
             device = request.get('device')
 
@@ -145,45 +202,39 @@ class AIMMappingRPCMixin(ha_ip_db.HAIPOwnerDbMixin):
             # NOTE(ivar): removed the PROXY_PORT_PREFIX hack.
             # This was needed to support network services without hotplug.
 
-            epg = self._get_port_epg(context, port)
-
-            details = {'device': request.get('device'),
-                       'enable_dhcp_optimization': self._is_dhcp_optimized(
-                           context, port),
-                       'enable_metadata_optimization': (
-                           self._is_metadata_optimized(context, port)),
-                       'port_id': port_id,
-                       'mac_address': port['mac_address'],
-                       'app_profile_name': epg.app_profile_name,
-                       'tenant_id': port['tenant_id'],
-                       'host': host,
-                       # TODO(ivar): scope names, possibly through AIM or the
-                       # name mapper
-                       'ptg_tenant': epg.tenant_name,
-                       'endpoint_group_name': epg.name,
-                       'promiscuous_mode': self._is_port_promiscuous(context,
-                                                                     port),
-                       'extra_ips': [],
-                       'floating_ip': [],
-                       'ip_mapping': [],
-                       # Put per mac-address extra info
-                       'extra_details': {}}
-
-            # Set VM name if needed.
-            if port['device_owner'].startswith(
-                    'compute:') and port['device_id']:
-                vm = nclient.NovaClient().get_server(port['device_id'])
-                details['vm-name'] = vm.name if vm else port['device_id']
-            mtu = self._get_port_mtu(context, port)
+            # NOTE(ivar): having these methods cleanly separated actually makes
+            # things less efficient by requiring lots of calls duplication.
+            # The '_cache' in details stores commonly requested objects (like
+            # EPGs), it is shared by all the devices of a batch request.
+            details = {'_cache': {} if cache is None else cache}
+            epg = self._get_port_epg(context, port, details)
+
+            details.update({'device': request.get('device'),
+                            'enable_dhcp_optimization': (
+                                self._is_dhcp_optimized(context, port)),
+                            'enable_metadata_optimization': (
+                                self._is_metadata_optimized(context, port)),
+                            'port_id': port_id,
+                            'mac_address': port['mac_address'],
+                            'app_profile_name': epg.app_profile_name,
+                            'tenant_id': port['tenant_id'],
+                            'host': host,
+                            # TODO(ivar): scope names, possibly through AIM
+                            # or the name mapper
+                            'ptg_tenant': epg.tenant_name,
+                            'endpoint_group_name': epg.name,
+                            'promiscuous_mode': self._is_port_promiscuous(
+                                context, port, details),
+                            'extra_ips': [],
+                            'floating_ip': [],
+                            'ip_mapping': [],
+                            # Put per mac-address extra info
+                            'extra_details': {}})
+
+            mtu = self._get_port_mtu(context, port, details)
             if mtu:
                 details['interface_mtu'] = mtu
 
-            # NOTE(ivar): having these methods cleanly separated actually makes
-            # things less efficient by requiring lots of calls duplication.
-            # we could alleviate this by passing down a cache that stores
-            # commonly requested objects (like EPGs). 'details' itself could
-            # be used for such caching.
-            details['_cache'] = {}
             vrf = self._get_port_vrf(context, port, details)
             details['l3_policy_id'] = '%s %s' % (vrf.tenant_name, vrf.name)
             self._add_subnet_details(context, port, details)
@@ -195,9 +246,100 @@ class AIMMappingRPCMixin(ha_ip_db.HAIPOwnerDbMixin):
             self._set_dhcp_lease_time(details)
             details.pop('_cache', None)
 
+        # Set VM name if needed, Nova is never called with the
+        # transaction open.
+        if port['device_owner'].startswith('compute:') and port['device_id']:
+            details['vm-name'] = self._get_vm_name(port, host)
+
         LOG.debug("Details for port %s : %s", port['id'], details)
         return details
 
+    def _get_vm_name_cache(self):
+        if getattr(self, '_vm_name_cache', None) is None:
+            self._vm_name_cache = nclient.VMNameCache(
+                ttl=cfg.CONF.aim_mapping.vm_name_cache_ttl,
+                max_size=cfg.CONF.aim_mapping.vm_name_cache_size)
+            # {device_id: GreenThread} of the ongoing Nova lookups
+            self._vm_name_lookups = {}
+            # {host: GreenThread} of the ongoing host server listings
+            self._vm_name_prefetches = {}
+        return self._vm_name_cache
+
+    def _get_vm_name(self, port, host):
+        """Return the VM name of a compute port.
+
+        On a cache miss all the servers of the host are prefetched from
+        Nova in a green thread. If Nova doesn't answer within the lookup
+        timeout the device_id is returned, and the agent gets a port
+        update once the name is known.
+        """
+        device_id = port['device_id']
+        name = self._get_vm_name_cache().get(device_id)
+        if name:
+            return name
+        lookup = self._vm_name_lookups.get(device_id)
+        if not lookup:
+            lookup = eventlet.spawn(self._lookup_vm_name, device_id, host)
+            self._vm_name_lookups[device_id] = lookup
+        try:
+            with eventlet.Timeout(
+                    cfg.CONF.aim_mapping.vm_name_lookup_timeout):
+                name = lookup.wait()
+        except eventlet.Timeout:
+            LOG.debug("VM name lookup for %s still pending, using the "
+                      "device_id", device_id)
+            # The request context may be in use or closed by then
+            lookup.link(self._vm_name_resolved, port['id'])
+        return name or device_id
+
+    def _lookup_vm_name(self, device_id, host):
+        cache = self._get_vm_name_cache()
+        try:
+            # The lookups of a host share a single server listing
+            prefetch = self._vm_name_prefetches.get(host)
+            if not prefetch and host and cache.prefetch_needed(host):
+                prefetch = eventlet.spawn(self._prefetch_vm_names, host)
+                self._vm_name_prefetches[host] = prefetch
+            if prefetch:
+                prefetch.wait()
+                name = cache.get(device_id)
+                if name:
+                    return name
+            vm = nclient.NovaClient().get_server(device_id)
+            if vm:
+                cache.set(device_id, vm.name)
+                return vm.name
+        except Exception as e:
+            LOG.error(_LE("An exception has occurred while looking up the "
+                          "VM name for %s"), device_id)
+            LOG.exception(e)
+        finally:
+            self._vm_name_lookups.pop(device_id, None)
+
+    def _prefetch_vm_names(self, host):
+        cache = self._get_vm_name_cache()
+        try:
+            cache.prefetched(host, nclient.NovaClient().get_servers(host))
+        except Exception as e:
+            LOG.error(_LE("An exception has occurred while listing the "
+                          "VMs of host %s"), host)
+            LOG.exception(e)
+            # Don't list again till the TTL expires, lookups fall back
+            # to getting their own server
+            cache.prefetched(host, [])
+        finally:
+            self._vm_name_prefetches.pop(host, None)
+
+    def _vm_name_resolved(self, lookup, port_id):
+        try:
+            if lookup.wait():
+                self._send_port_update_notification(
+                    n_context.get_admin_context(), port_id)
+        except Exception as e:
+            LOG.error(_LE("An exception has occurred while notifying the "
+                          "VM name of port %s"), port_id)
+            LOG.exception(e)
+
     def _get_owned_addresses(self, plugin_context, port_id):
         return set(self.ha_ip_handler.get_ha_ipaddresses_for_port(port_id))
 
@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import time
+
 from neutron.notifiers import nova as n_nova
 from novaclient import exceptions as nova_exceptions
 from oslo_log import log as logging
@@ -43,3 +46,55 @@ class NovaClient(object):
                         server_id)
         except Exception as e:
             LOG.exception(e)
+
+    def get_servers(self, host):
+        try:
+            return self.client.servers.list(
+                search_opts={'all_tenants': 1, 'host': host})
+        except Exception as e:
+            LOG.exception(e)
+            return []
+
+
+class VMNameCache(object):
+    """TTL bound LRU cache of VM names, keyed by server id.
+
+    Also remembers the hosts whose servers were listed, so that a
+    host is prefetched at most once per TTL.
+    """
+
+    def __init__(self, ttl=300, max_size=10000):
+        self._ttl = ttl
+        self._max_size = max_size
+        # {server_id: (name, expiry)}
+        self._names = collections.OrderedDict()
+        # {host: expiry}
+        self._hosts = {}
+
+    def __len__(self):
+        return len(self._names)
+
+    def get(self, server_id):
+        try:
+            name, expiry = self._names.pop(server_id)
+        except KeyError:
+            return None
+        if expiry < time.time():
+            return None
+        # Most recently used goes last
+        self._names[server_id] = (name, expiry)
+        return name
+
+    def set(self, server_id, name):
+        self._names.pop(server_id, None)
+        self._names[server_id] = (name, time.time() + self._ttl)
+        while len(self._names) > self._max_size:
+            self._names.popitem(last=False)
+
+    def prefetch_needed(self, host):
+        return self._hosts.get(host, 0) < time.time()
+
+    def prefetched(self, host, servers):
+        self._hosts[host] = time.time() + self._ttl
+        for server in servers:
+            self.set(server.id, server.name)
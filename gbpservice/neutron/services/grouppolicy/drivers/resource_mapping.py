@@ -10,13 +10,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import netaddr
 import operator
 
 from keystoneclient import exceptions as k_exceptions
 from keystoneclient.v2_0 import client as k_client
 from neutron.api.v2 import attributes
-from neutron import context as n_context
 from neutron.db import models_v2
 from neutron.extensions import l3 as ext_l3
 from neutron.extensions import securitygroup as ext_sg
@@ -43,6 +43,7 @@ from gbpservice.neutron.extensions import driver_proxy_group as proxy_ext
 from gbpservice.neutron.extensions import group_policy as gp_ext
 from gbpservice.neutron.services.grouppolicy import (
     group_policy_driver_api as api)
+from gbpservice.neutron.services.grouppolicy.common import cache
 from gbpservice.neutron.services.grouppolicy.common import constants as gconst
 from gbpservice.neutron.services.grouppolicy.common import exceptions as exc
 from gbpservice.neutron.services.grouppolicy.common import utils as gbp_utils
@@ -52,6 +53,10 @@ from gbpservice.neutron.services.grouppolicy.drivers import nsp_manager
 LOG = logging.getLogger(__name__)
 DEFAULT_SG_PREFIX = 'gbp_%s'
 SCI_CONSUMER_NOT_AVAILABLE = 'N/A'
+# Attributes identifying a SG rule, the SG comes first
+SG_RULE_KEY_ATTRS = ('security_group_id', 'direction', 'ethertype',
+                     'protocol', 'port_range_min', 'port_range_max',
+                     'remote_ip_prefix', 'remote_group_id')
 
 opts = [
     cfg.ListOpt('dns_nameservers',
@@ -227,24 +232,79 @@ class OwnedResourcesOperations(object):
 class ImplicitResourceOperations(local_api.LocalAPI,
                                  nsp_manager.NetworkServicePolicyMappingMixin):
 
-    def _sg_rule(self, plugin_context, tenant_id, sg_id, direction,
-                 protocol=None, port_range=None, cidr=None,
-                 ethertype=n_const.IPv4, unset=False):
+    @staticmethod
+    def _sg_rule_attrs(tenant_id, sg_id, direction, protocol=None,
+                       port_range=None, cidr=None, ethertype=n_const.IPv4):
         if port_range:
             port_min, port_max = (gpdb.GroupPolicyDbPlugin.
                                   _get_min_max_ports_from_range(port_range))
         else:
             port_min, port_max = None, None
 
-        attrs = {'tenant_id': tenant_id,
-                 'security_group_id': sg_id,
-                 'direction': direction,
-                 'ethertype': ethertype,
-                 'protocol': protocol,
-                 'port_range_min': port_min,
-                 'port_range_max': port_max,
-                 'remote_ip_prefix': cidr,
-                 'remote_group_id': None}
+        return {'tenant_id': tenant_id,
+                'security_group_id': sg_id,
+                'direction': direction,
+                'ethertype': ethertype,
+                'protocol': protocol,
+                'port_range_min': port_min,
+                'port_range_max': port_max,
+                'remote_ip_prefix': cidr,
+                'remote_group_id': None}
+
+    @staticmethod
+    def _sg_rule_key(rule):
+        # Rules are matched the way Neutron detects duplicates: a
+        # protocol name and its number are the same, and so are no
+        # remote prefix and the any address one.
+        key = dict((attr, rule.get(attr)) for attr in SG_RULE_KEY_ATTRS)
+        if key['protocol'] is not None:
+            protocol = str(key['protocol']).lower()
+            key['protocol'] = str(n_const.IP_PROTOCOL_MAP.get(
+                protocol, protocol))
+        if key['remote_ip_prefix']:
+            cidr = str(netaddr.IPNetwork(key['remote_ip_prefix']).cidr)
+            key['remote_ip_prefix'] = (
+                None if cidr in ('0.0.0.0/0', '::/0') else cidr)
+        else:
+            key['remote_ip_prefix'] = None
+        return tuple(key[attr] for attr in SG_RULE_KEY_ATTRS)
+
+    def _sync_sg_rules(self, plugin_context, add_rules=None,
+                       remove_rules=None):
+        """Add and remove SG rules in bulk.
+
+        The requested rules are diffed against the rules already in the
+        affected SGs, so only the missing rules are created and only the
+        existing ones are deleted. A rule both added and removed is kept.
+        No transaction is held around the changes, so the agents are only
+        notified of committed rules.
+        """
+        add_rules = collections.OrderedDict(
+            (self._sg_rule_key(attrs), attrs) for attrs in add_rules or [])
+        remove_keys = set(self._sg_rule_key(attrs)
+                          for attrs in remove_rules or []) - set(add_rules)
+        sg_ids = set(key[0] for key in add_rules) | set(
+            key[0] for key in remove_keys)
+        if not sg_ids:
+            return
+        existing = {}
+        for rule in self._get_sg_rules(
+                plugin_context, {'security_group_id': list(sg_ids)}):
+            existing.setdefault(self._sg_rule_key(rule), rule['id'])
+        self._delete_sg_rules(
+            plugin_context,
+            [existing[key] for key in remove_keys if key in existing])
+        # Overlapping rules are not wanted, see _sg_rule.
+        self._create_sg_rules_bulk(
+            plugin_context,
+            [attrs for key, attrs in add_rules.items()
+             if key not in existing])
+
+    def _sg_rule(self, plugin_context, tenant_id, sg_id, direction,
+                 protocol=None, port_range=None, cidr=None,
+                 ethertype=n_const.IPv4, unset=False):
+        attrs = self._sg_rule_attrs(tenant_id, sg_id, direction, protocol,
+                                    port_range, cidr, ethertype)
         filters = {}
         for key in attrs:
             value = attrs[key]
@@ -1899,12 +1959,9 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
 
     @log.log_method_call
     def update_policy_classifier_postcommit(self, context):
-        policy_rules = (context._plugin.get_policy_classifier(
-                context._plugin_context,
-                context.current['id'])['policy_rules'])
-        policy_rules = context._plugin.get_policy_rules(
-            context._plugin_context,
-            filters={'id': policy_rules})
+        policy_rules = (self._get_cached_policy_classifier(
+            context, context.current['id'])['policy_rules'])
+        policy_rules = self._get_cached_policy_rules(context, policy_rules)
         policy_rulesets_to_update = []
         for policy_rule in policy_rules:
             pr_id = policy_rule['id']
@@ -2006,9 +2063,8 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
         self._set_policy_rule_set_sg_mapping(
             context._plugin_context.session, policy_rule_set_id,
             consumed_sg_id, provided_sg_id)
-        rules = context._plugin.get_policy_rules(
-            context._plugin_context,
-            {'id': context.current['policy_rules']})
+        rules = self._get_cached_policy_rules(
+            context, context.current['policy_rules'])
         self._apply_policy_rule_set_rules(context, context.current, rules)
         if context.current['child_policy_rule_sets']:
             self._recompute_policy_rule_sets(
@@ -2023,10 +2079,9 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
         # Update policy_rule_set rules
         old_rules = set(context.original['policy_rules'])
         new_rules = set(context.current['policy_rules'])
-        to_add = context._plugin.get_policy_rules(
-            context._plugin_context, {'id': new_rules - old_rules})
-        to_remove = context._plugin.get_policy_rules(
-            context._plugin_context, {'id': old_rules - new_rules})
+        to_add = self._get_cached_policy_rules(context, new_rules - old_rules)
+        to_remove = self._get_cached_policy_rules(
+            context, old_rules - new_rules)
         self._remove_policy_rule_set_rules(context, context.current, to_remove)
         self._apply_policy_rule_set_rules(context, context.current, to_add)
         # Update children contraint
@@ -2423,13 +2478,17 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                         policy_rule_set['id']))
                 cidr_mapping = self._get_cidrs_mapping(
                     context, policy_rule_set)
-                self._add_or_remove_policy_rule_set_rule(
+                # Rules common to the old and new classifier are kept
+                remove_rules = self._get_policy_rule_set_sg_rules(
                     context, policy_rule, policy_rule_set_sg_mappings,
-                    cidr_mapping, unset=True, unset_egress=True,
-                    classifier=old_classifier)
-                self._add_or_remove_policy_rule_set_rule(
+                    cidr_mapping, classifier=old_classifier,
+                    tenant_id=policy_rule_set['tenant_id'])
+                add_rules = self._get_policy_rule_set_sg_rules(
                     context, policy_rule, policy_rule_set_sg_mappings,
-                    cidr_mapping, classifier=new_classifier)
+                    cidr_mapping, classifier=new_classifier,
+                    tenant_id=policy_rule_set['tenant_id'])
+                self._sync_sg_rules(context._plugin_context, add_rules,
+                                    remove_rules)
 
     def _get_rule_ids_for_actions(self, context, action_id):
         policy_rule_qry = context.session.query(
@@ -2451,18 +2510,6 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
             return (session.query(PolicyRuleSetSGsMapping).
                     filter_by(policy_rule_set_id=policy_rule_set_id).one())
 
-    def _sg_ingress_rule(self, context, sg_id, protocol, port_range, cidr,
-                         tenant_id, unset=False):
-        return self._sg_rule(
-            context._plugin_context, tenant_id, sg_id,
-            'ingress', protocol, port_range, cidr, unset=unset)
-
-    def _sg_egress_rule(self, context, sg_id, protocol, port_range,
-                        cidr, tenant_id, unset=False):
-        return self._sg_rule(
-            context._plugin_context, tenant_id, sg_id,
-            'egress', protocol, port_range, cidr, unset=unset)
-
     def _assoc_sgs_to_pt(self, context, pt_id, sg_list):
         try:
             pt = context._plugin.get_policy_target(context._plugin_context,
@@ -2609,8 +2656,8 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
         for pos, policy_rule_sets in enumerate(
                 [provided_policy_rule_sets, consumed_policy_rule_sets]):
             for policy_rule_set_id in policy_rule_sets:
-                policy_rule_set = context._plugin.get_policy_rule_set(
-                    context._plugin_context, policy_rule_set_id)
+                policy_rule_set = self._get_cached_policy_rule_set(
+                    context, policy_rule_set_id)
                 policy_rule_set_sg_mappings = (
                     self._get_policy_rule_set_sg_mapping(
                         context._plugin_context.session, policy_rule_set_id))
@@ -2621,32 +2668,57 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                         context, policy_rule_set)
                 else:
                     # Not need to filter when removing rules
-                    policy_rules = context._plugin.get_policy_rules(
-                        context._plugin_context,
-                        {'id': policy_rule_set['policy_rules']})
+                    policy_rules = self._get_cached_policy_rules(
+                        context, policy_rule_set['policy_rules'])
+                add_rules, remove_rules = [], []
                 for policy_rule in policy_rules:
-                    self._add_or_remove_policy_rule_set_rule(
+                    add, remove = self._get_policy_rule_set_sg_rules_delta(
                         context, policy_rule, policy_rule_set_sg_mappings,
-                        cidr_mapping, unset=unset)
+                        cidr_mapping, unset=unset,
+                        tenant_id=policy_rule_set['tenant_id'])
+                    add_rules.extend(add)
+                    remove_rules.extend(remove)
+                self._sync_sg_rules(context._plugin_context, add_rules,
+                                    remove_rules)
 
     def _manage_policy_rule_set_rules(self, context, policy_rule_set,
                                       policy_rules, unset=False,
                                       unset_egress=False):
         policy_rule_set_sg_mappings = self._get_policy_rule_set_sg_mapping(
             context._plugin_context.session, policy_rule_set['id'])
-        policy_rule_set = context._plugin.get_policy_rule_set(
-            context._plugin_context, policy_rule_set['id'])
+        policy_rule_set = self._get_cached_policy_rule_set(
+            context, policy_rule_set['id'])
         cidr_mapping = self._get_cidrs_mapping(context, policy_rule_set)
+        add_rules, remove_rules = [], []
         for policy_rule in policy_rules:
-            self._add_or_remove_policy_rule_set_rule(
+            add, remove = self._get_policy_rule_set_sg_rules_delta(
                 context, policy_rule, policy_rule_set_sg_mappings,
-                cidr_mapping, unset=unset, unset_egress=unset_egress)
+                cidr_mapping, unset=unset, unset_egress=unset_egress,
+                tenant_id=policy_rule_set['tenant_id'])
+            add_rules.extend(add)
+            remove_rules.extend(remove)
+        self._sync_sg_rules(context._plugin_context, add_rules, remove_rules)
 
-    def _add_or_remove_policy_rule_set_rule(self, context, policy_rule,
+    def _get_policy_rule_set_sg_rules_delta(self, context, policy_rule,
                                             policy_rule_set_sg_mappings,
                                             cidr_mapping, unset=False,
                                             unset_egress=False,
-                                            classifier=None):
+                                            classifier=None, tenant_id=None):
+        """Returns the SG rules to add and to remove for a policy rule. """
+        add_rules, remove_rules = [], []
+        for attrs in self._get_policy_rule_set_sg_rules(
+                context, policy_rule, policy_rule_set_sg_mappings,
+                cidr_mapping, classifier=classifier, tenant_id=tenant_id):
+            if unset or (unset_egress and attrs['direction'] == 'egress'):
+                remove_rules.append(attrs)
+            else:
+                add_rules.append(attrs)
+        return add_rules, remove_rules
+
+    def _get_policy_rule_set_sg_rules(self, context, policy_rule,
+                                      policy_rule_set_sg_mappings,
+                                      cidr_mapping, classifier=None,
+                                      tenant_id=None):
         in_out = [gconst.GP_DIRECTION_IN, gconst.GP_DIRECTION_OUT]
         prov_cons = [policy_rule_set_sg_mappings['provided_sg_id'],
                      policy_rule_set_sg_mappings['consumed_sg_id']]
@@ -2655,27 +2727,31 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
 
         if not classifier:
             classifier_id = policy_rule['policy_classifier_id']
-            classifier = context._plugin.get_policy_classifier(
-                context._plugin_context, classifier_id)
+            classifier = self._get_cached_policy_classifier(
+                context, classifier_id)
 
         protocol = classifier['protocol']
         port_range = classifier['port_range']
-        admin_context = n_context.get_admin_context()
-        prs = context._plugin.get_policy_rule_set(
-            admin_context, policy_rule_set_sg_mappings.policy_rule_set_id)
-        tenant_id = prs['tenant_id']
+        if not tenant_id:
+            prs = self._get_cached_policy_rule_set(
+                context, policy_rule_set_sg_mappings.policy_rule_set_id,
+                plugin_context=context._plugin_context.elevated())
+            tenant_id = prs['tenant_id']
+        rules = []
         for pos, sg in enumerate(prov_cons):
             if classifier['direction'] in [gconst.GP_DIRECTION_BI,
                                            in_out[pos]]:
                 for cidr in cidr_prov_cons[pos - 1]:
-                    self._sg_ingress_rule(context, sg, protocol, port_range,
-                                          cidr, tenant_id, unset=unset)
+                    rules.append(self._sg_rule_attrs(
+                        tenant_id, sg, 'ingress', protocol, port_range,
+                        cidr))
             if classifier['direction'] in [gconst.GP_DIRECTION_BI,
                                            in_out[pos - 1]]:
                 for cidr in cidr_prov_cons[pos - 1]:
-                    self._sg_egress_rule(context, sg, protocol, port_range,
-                                         cidr, tenant_id,
-                                         unset=unset or unset_egress)
+                    rules.append(self._sg_rule_attrs(
+                        tenant_id, sg, 'egress', protocol, port_range,
+                        cidr))
+        return rules
 
     def _apply_policy_rule_set_rules(self, context, policy_rule_set,
                                      policy_rules):
@@ -2695,29 +2771,26 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
         # Rules in child but not in parent shall be removed
         # Child rules will be set after being filtered by the parent
         for child in children:
-            child = context._plugin.get_policy_rule_set(
-                context._plugin_context, child)
+            child = self._get_cached_policy_rule_set(context, child)
             child_rule_ids = set(child['policy_rules'])
             if child['parent_id']:
-                parent = context._plugin.get_policy_rule_set(
-                    context._plugin_context, child['parent_id'])
-                parent_policy_rules = context._plugin.get_policy_rules(
-                                        context._plugin_context,
-                                        filters={'id': parent['policy_rules']})
-                child_rules = context._plugin.get_policy_rules(
-                                        context._plugin_context,
-                                        filters={'id': child['policy_rules']})
+                parent = self._get_cached_policy_rule_set(
+                    context, child['parent_id'])
+                parent_policy_rules = self._get_cached_policy_rules(
+                    context, parent['policy_rules'])
+                child_rules = self._get_cached_policy_rules(
+                    context, child['policy_rules'])
                 parent_classifier_ids = [x['policy_classifier_id']
                                      for x in parent_policy_rules]
                 delta_rules = [x['id'] for x in child_rules
                                if x['policy_classifier_id']
                                not in set(parent_classifier_ids)]
-                delta_rules = context._plugin.get_policy_rules(
-                                context._plugin_context, {'id': delta_rules})
+                delta_rules = self._get_cached_policy_rules(
+                    context, delta_rules)
                 self._remove_policy_rule_set_rules(context, child, delta_rules)
             # Old parent may have filtered some rules, need to add them again
-            child_rules = context._plugin.get_policy_rules(
-                context._plugin_context, filters={'id': child_rule_ids})
+            child_rules = self._get_cached_policy_rules(
+                context, child_rule_ids)
             self._apply_policy_rule_set_rules(context, child, child_rules)
 
     def _update_default_security_group(self, plugin_context, ptg_id,
@@ -2949,28 +3022,45 @@ class ResourceMappingDriver(api.PolicyDriver, ImplicitResourceOperations,
                                                   l2p_id=l2p['id'],
                                                   ptg_id=context.current['id'])
 
+    def _get_cached_policy_rule_set(self, context, policy_rule_set_id,
+                                    plugin_context=None):
+        plugin_context = plugin_context or context._plugin_context
+        return cache.get_request_cache(plugin_context).get(
+            'policy_rule_set', policy_rule_set_id,
+            lambda x: context._plugin.get_policy_rule_set(plugin_context, x),
+            is_admin=plugin_context.is_admin)
+
+    def _get_cached_policy_classifier(self, context, policy_classifier_id):
+        plugin_context = context._plugin_context
+        return cache.get_request_cache(plugin_context).get(
+            'policy_classifier', policy_classifier_id,
+            lambda x: context._plugin.get_policy_classifier(plugin_context, x),
+            is_admin=plugin_context.is_admin)
+
+    def _get_cached_policy_rules(self, context, policy_rule_ids):
+        plugin_context = context._plugin_context
+        return cache.get_request_cache(plugin_context).get_many(
+            'policy_rule', policy_rule_ids,
+            lambda x: context._plugin.get_policy_rules(
+                plugin_context, {'id': x}),
+            is_admin=plugin_context.is_admin)
+
     def _get_enforced_prs_rules(self, context, prs, subset=None):
         subset = subset or prs['policy_rules']
         if prs['parent_id']:
-            parent = context._plugin.get_policy_rule_set(
-                context._plugin_context, prs['parent_id'])
-            parent_policy_rules = context._plugin.get_policy_rules(
-                context._plugin_context,
-                filters={'id': parent['policy_rules']})
-            subset_rules = context._plugin.get_policy_rules(
-                                        context._plugin_context,
-                                        filters={'id': subset})
+            parent = self._get_cached_policy_rule_set(
+                context, prs['parent_id'])
+            parent_policy_rules = self._get_cached_policy_rules(
+                context, parent['policy_rules'])
+            subset_rules = self._get_cached_policy_rules(context, subset)
             parent_classifier_ids = set(x['policy_classifier_id']
                                         for x in parent_policy_rules)
             policy_rules = [x['id'] for x in subset_rules
                             if x['policy_classifier_id']
                             in parent_classifier_ids]
-            return context._plugin.get_policy_rules(
-                context._plugin_context,
-                {'id': policy_rules})
+            return self._get_cached_policy_rules(context, policy_rules)
         else:
-            return context._plugin.get_policy_rules(
-                context._plugin_context, {'id': set(subset)})
+            return self._get_cached_policy_rules(context, set(subset))
 
     def _validate_pt_port_subnets(self, context, subnets=None):
         # Validate if explicit port's subnet
@@ -367,13 +367,24 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             resource['status_details'] = updated_status_details
         return resource
 
+    @staticmethod
+    def _get_db_fields(fields, filters=None):
+        # The DB layer only serializes and loads what is passed down.
+        # Drivers computing the status get the whole resource, while
+        # extension drivers and filters need the id and the filtered
+        # attributes.
+        if not fields or STATUS_SET.intersection(set(fields)):
+            return None
+        return list(set(fields) | set(filters or {}) |
+                    set(['id', 'tenant_id']))
+
     def _get_resource(self, context, resource_name, resource_id,
                       gbp_context_name, fields=None):
         session = context.session
         with session.begin(subtransactions=True):
             get_method = "".join(['get_', resource_name])
             result = getattr(super(GroupPolicyPlugin, self), get_method)(
-                context, resource_id, None)
+                context, resource_id, self._get_db_fields(fields))
             extend_resources_method = "".join(['extend_', resource_name,
                                                '_dict'])
             getattr(self.extension_manager, extend_resources_method)(
@@ -394,7 +405,8 @@ class GroupPolicyPlugin(group_policy_mapping_db.GroupPolicyMappingDbPlugin):
             get_resources_method = "".join(['get_', resource_plural])
             results = getattr(super(GroupPolicyPlugin, self),
                               get_resources_method)(
-                context, filters, None, sorts, limit, marker, page_reverse)
+                context, filters, self._get_db_fields(fields, filters), sorts,
+                limit, marker, page_reverse)
             filtered_results = []
             for result in results:
                 extend_resources_method = "".join(['extend_', resource_name,
@@ -20,6 +20,7 @@ import stevedore
 
 from gbpservice._i18n import _LE
 from gbpservice._i18n import _LI
+from gbpservice.neutron.services.grouppolicy.common import cache
 from gbpservice.neutron.services.grouppolicy.common import exceptions as gp_exc
 from gbpservice.neutron.services.grouppolicy import group_policy_driver_api
 
@@ -117,6 +118,10 @@ class PolicyDriverManager(stevedore.named.NamedExtensionManager):
         if any policy driver call fails.
         """
         error = False
+        if method_name.endswith('_precommit'):
+            # A GBP resource is being written, possibly on retry, so
+            # reads cached by the drivers so far may be stale.
+            cache.invalidate_request_cache(context._plugin_context)
         drivers = (self.ordered_policy_drivers if not
                    method_name.startswith('delete') else
                    self.reverse_ordered_policy_drivers)
@@ -24,6 +24,18 @@ class ServiceChainNotificationsMixin(object):
             self._servicechain_plugin.update_chains_pt_removed(
                 context, policy_target, instance_id)
 
+    def _notify_sc_plugin_pts_added(self, context, policy_targets,
+                                    instance_ids):
+        if self._servicechain_plugin:
+            self._servicechain_plugin.update_chains_pts_added(
+                context, policy_targets, instance_ids)
+
+    def _notify_sc_plugin_pts_removed(self, context, policy_targets,
+                                      instance_ids):
+        if self._servicechain_plugin:
+            self._servicechain_plugin.update_chains_pts_removed(
+                context, policy_targets, instance_ids)
+
     def _notify_sc_consumer_added(self, context, policy_target_group,
                                   instance_id):
         if self._servicechain_plugin:
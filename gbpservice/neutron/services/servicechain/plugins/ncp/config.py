@@ -25,7 +25,18 @@ service_chain_opts = [
                help=_("The plumber used by the Node Composition Plugin "
                       "for service plumbing. Entrypoint loaded from the "
                       "gbpservice.neutron.servicechain.ncp_plumbers "
-                      "namespace."))
+                      "namespace.")),
+    cfg.IntOpt('scheduling_cache_ttl',
+               default=30,
+               help=_("Seconds the owning driver and the plumbing info of "
+                      "a node are cached for. A server only drops its own "
+                      "entries when a node is updated or destroyed, the "
+                      "TTL bounds how long other servers can use stale "
+                      "ones. Set to 0 to disable the cache.")),
+    cfg.IntOpt('scheduling_cache_size',
+               default=10000,
+               help=_("Maximum number of nodes whose scheduling is cached, "
+                      "least recently used ones are evicted first.")),
 ]
 
 
@@ -171,6 +171,32 @@ class NodeDriverBase(object):
         """
         pass
 
+    def update_policy_targets_added(self, context, policy_targets):
+        """Update a deployed Service Chain Node on adding of a set of PTs.
+
+        By default update_policy_target_added is called for each PT, drivers
+        can override this method to process all the PTs at once.
+
+        :param context: NodeDriverContext instance describing the service chain
+        and the specific node to be processed by this driver.
+        :param policy_targets: List of dicts representing Policy Targets.
+        """
+        for policy_target in policy_targets:
+            self.update_policy_target_added(context, policy_target)
+
+    def update_policy_targets_removed(self, context, policy_targets):
+        """Update a deployed Service Chain Node on removal of a set of PTs.
+
+        By default update_policy_target_removed is called for each PT, drivers
+        can override this method to process all the PTs at once.
+
+        :param context: NodeDriverContext instance describing the service chain
+        and the specific node to be processed by this driver.
+        :param policy_targets: List of dicts representing Policy Targets.
+        """
+        for policy_target in policy_targets:
+            self.update_policy_target_removed(context, policy_target)
+
     @abc.abstractmethod
     def update_node_consumer_ptg_added(self, context, policy_target_group):
         """Update a deployed Service Chain Node on addition of a consumer PTG.
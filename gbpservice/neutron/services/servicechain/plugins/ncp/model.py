@@ -89,6 +89,14 @@ def get_node_owner(context):
         return query.all()
 
 
+def get_node_owners(session, instance_ids):
+    with session.begin(subtransactions=True):
+        query = session.query(NodeToDriverMapping)
+        query = query.filter(
+            NodeToDriverMapping.servicechain_instance_id.in_(instance_ids))
+        return query.all()
+
+
 def unset_node_owner(context):
     session = context.session
     with session.begin(subtransactions=True):
@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import time
+
 from neutron_lib import exceptions as n_exc
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -22,6 +25,57 @@ from gbpservice.neutron.services.servicechain.plugins.ncp import model
 LOG = logging.getLogger(__name__)
 
 
+class SchedulingCache(object):
+    """TTL bound LRU cache of node scheduling data.
+
+    Keys start with the instance and node ids. Entries are dropped by
+    the server changing the scheduling, the TTL bounds how long other
+    servers keep using them.
+    """
+
+    def __init__(self, ttl=None, max_size=None):
+        conf = cfg.CONF.node_composition_plugin
+        self._ttl = conf.scheduling_cache_ttl if ttl is None else ttl
+        self._max_size = (conf.scheduling_cache_size if max_size is None
+                          else max_size)
+        # {key: (value, expiry)}
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        try:
+            value, expiry = self._entries.pop(key)
+        except KeyError:
+            return default
+        if expiry < time.time():
+            return default
+        # Most recently used goes last
+        self._entries[key] = (value, expiry)
+        return value
+
+    def set(self, key, value):
+        if self._ttl <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (value, time.time() + self._ttl)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def pop(self, key):
+        self._entries.pop(key, None)
+
+    def forget(self, instance_id=None, node_id=None):
+        """Drop the entries of an instance and/or of a node. """
+        for key in list(self._entries):
+            if instance_id not in (None, key[0]):
+                continue
+            if node_id not in (None, key[1]):
+                continue
+            del self._entries[key]
+
+
 class NodeDriverManager(stevedore.named.NamedExtensionManager):
     """Route servicechain APIs to servicechain node drivers.
 
@@ -32,6 +86,8 @@ class NodeDriverManager(stevedore.named.NamedExtensionManager):
         self.drivers = {}
         # Ordered list of node drivers.
         self.ordered_drivers = []
+        # Owning driver names, keyed by (instance id, node id).
+        self._owners = SchedulingCache()
         names = cfg.CONF.node_composition_plugin.node_drivers
         LOG.info(_LI("Configured service chain node driver names: %s"), names)
         super(NodeDriverManager,
@@ -70,6 +126,7 @@ class NodeDriverManager(stevedore.named.NamedExtensionManager):
             try:
                 driver.obj.validate_create(context)
                 model.set_node_owner(context, driver.obj.name)
+                self._owners.set(self._owner_key(context), driver.obj.name)
                 return driver.obj
             except n_exc.NeutronException as e:
                 LOG.warning(e.message)
@@ -83,6 +140,7 @@ class NodeDriverManager(stevedore.named.NamedExtensionManager):
         driver = self.get_owning_driver(context)
         if driver:
             model.unset_node_owner(context)
+            self._owners.pop(self._owner_key(context))
         return driver
 
     def schedule_update(self, context):
@@ -100,10 +158,15 @@ class NodeDriverManager(stevedore.named.NamedExtensionManager):
         """Schedule Node Driver to get Node details.
 
         Given a NodeContext, this method returns the driver capable of
-        getting details the specific node.
+        getting details the specific node. The owner is looked up in the DB
+        only once per cache TTL, since it doesn't change while the node is
+        deployed.
         """
-        driver = self.get_owning_driver(context)
-        return driver
+        driver = self.drivers.get(
+            self._owners.get(self._owner_key(context)))
+        if driver:
+            return driver.obj
+        return self.get_owning_driver(context)
 
     def clear_node_owner(self, context):
         """Remove Node Driver ownership set for a Node
@@ -113,9 +176,25 @@ class NodeDriverManager(stevedore.named.NamedExtensionManager):
         by deleting and recreating the Node instances
         """
         model.unset_node_owner(context)
+        self._owners.pop(self._owner_key(context))
+
+    def forget_node_owners(self, instance_id=None, node_id=None):
+        """Drop the cached Node Driver ownership.
+
+        Ownership is dropped for all the Nodes of the given instance and/or
+        for the given Node in all the instances.
+        """
+        self._owners.forget(instance_id=instance_id, node_id=node_id)
 
     def get_owning_driver(self, context):
         owner = model.get_node_owner(context)
+        key = self._owner_key(context)
         if owner:
+            self._owners.set(key, owner[0].driver_name)
             driver = self.drivers.get(owner[0].driver_name)
             return driver.obj if driver else None
+        self._owners.pop(key)
+
+    @staticmethod
+    def _owner_key(context):
+        return context.instance['id'], context.current_node['id']
@@ -12,10 +12,12 @@
 # limitations under the License.
 
 import eventlet
+from eventlet import event as eventlet_event
 from eventlet import greenpool
 import six
 import sys
 import threading
+import time
 
 from keystoneclient import exceptions as k_exceptions
 from keystoneclient.v2_0 import client as keyclient
@@ -61,6 +63,11 @@ NFP_NODE_DRIVER_OPTS = [
                default=nfp_constants.SERVICE_DELETE_TIMEOUT,
                help=_("Seconds to wait for service deletion "
                       "to complete")),
+    cfg.IntOpt('service_status_poll_interval',
+               default=nfp_constants.SERVICE_STATUS_POLL_INTERVAL,
+               help=_("Seconds between network function status polls "
+                      "when no completion notification is received "
+                      "from the Service Orchestrator")),
 ]
 # REVISIT(ashu): Can we use is_service_admin_owned config from RMD
 cfg.CONF.register_opts(NFP_NODE_DRIVER_OPTS, "nfp_node_driver")
@@ -268,6 +275,55 @@ class NFPClientApi(object):
                           request_info=request_info)
 
 
+class NetworkFunctionStatusWaiters(object):
+    """Registry of green threads waiting on network function status.
+
+    Waiters are keyed by network function id and woken up by the
+    status change notifications cast by the Service Orchestrator.
+    """
+
+    def __init__(self):
+        self._events = {}
+
+    def register(self, network_function_id):
+        event = self._events.get(network_function_id)
+        if not event or event.ready():
+            event = eventlet_event.Event()
+            self._events[network_function_id] = event
+        return event
+
+    def unregister(self, network_function_id, event):
+        if self._events.get(network_function_id) is event:
+            del self._events[network_function_id]
+
+    def notify(self, network_function_id, network_function):
+        event = self._events.pop(network_function_id, None)
+        if event and not event.ready():
+            event.send(network_function)
+
+
+nf_status_waiters = NetworkFunctionStatusWaiters()
+
+
+class NFPNodeDriverCallbacks(object):
+    """RPC handler for Service Orchestrator notifications """
+
+    RPC_API_VERSION = '1.0'
+    target = oslo_messaging.Target(version=RPC_API_VERSION)
+
+    def network_function_status_changed(self, context, network_function_id,
+                                        status):
+        LOG.debug("Received status %(status)s for NF: %(nf_id)s",
+                  {'status': status, 'nf_id': network_function_id})
+        nf_status_waiters.notify(network_function_id,
+                                 {'id': network_function_id,
+                                  'status': status})
+
+    def network_function_deleted(self, context, network_function_id):
+        LOG.debug("Received delete for NF: %s", network_function_id)
+        nf_status_waiters.notify(network_function_id, None)
+
+
 class NFPContext(object):
 
     @staticmethod
@@ -344,6 +400,13 @@ class NFPNodeDriver(driver_base.NodeDriverBase):
 
     def _setup_rpc(self):
         self.nfp_notifier = NFPClientApi(nfp_rpc_topics.NFP_NSO_TOPIC)
+        # Every server waits on its own network functions, so status
+        # notifications are fanned out to all of them
+        self.callbacks_conn = n_rpc.create_connection()
+        self.callbacks_conn.create_consumer(
+            nfp_rpc_topics.NFP_NODE_DRIVER_CALLBACK_TOPIC,
+            [NFPNodeDriverCallbacks()], fanout=True)
+        self.callbacks_conn.consume_in_threads()
 
     def _parse_service_flavor_string(self, service_flavor_str):
         service_details = {}
@@ -585,6 +648,30 @@ class NFPNodeDriver(driver_base.NodeDriverBase):
                 context.plugin_session,
                 context.current_node['id'],
                 context.instance['id']))
+        return self._get_network_function_map_status(network_function_map)
+
+    def get_statuses(self, context, node_instances):
+        """Bulk get_status for (instance id, node id) pairs.
+
+        All the node instance maps are read in one query. Returns the
+        status dicts keyed by (instance id, node id), pairs without a map
+        are left out.
+        """
+        instance_ids = list(set(x[0] for x in node_instances))
+        network_function_maps = dict(
+            ((x.sc_instance_id, x.sc_node_id), x) for x in
+            self.nfp_db.get_instances_network_function_maps(
+                context.session, instance_ids))
+        statuses = {}
+        for node_instance in node_instances:
+            network_function_map = network_function_maps.get(node_instance)
+            if network_function_map:
+                statuses[node_instance] = (
+                    self._get_network_function_map_status(
+                        network_function_map))
+        return statuses
+
+    def _get_network_function_map_status(self, network_function_map):
         nf_status = network_function_map.status
         if nf_status not in nfp_constants.NFP_STATUS:
             nf_status = nfp_constants.BUILD
@@ -754,22 +841,48 @@ class NFPNodeDriver(driver_base.NodeDriverBase):
                                 {'provided_policy_rule_sets':
                                     dict((x, '') for x in prs)}})
 
+    def _wait_for_network_function(self, context, network_function_id,
+                                   timeout, is_complete):
+        """Wait for the network function to satisfy is_complete.
+
+        Completion is notified by the Service Orchestrator, the network
+        function is polled only on start and when no notification shows
+        up within service_status_poll_interval secs.
+        Returns the last network function seen, None if it is deleted.
+        """
+        poll_interval = cfg.CONF.nfp_node_driver.service_status_poll_interval
+        deadline = time.time() + timeout
+        network_function = None
+        poll = True
+        while True:
+            # Register before polling, so that a status change between
+            # the poll and the wait is not missed
+            event = nf_status_waiters.register(network_function_id)
+            try:
+                if poll:
+                    network_function = (
+                        self.nfp_notifier.get_network_function(
+                            context.plugin_context, network_function_id))
+                remaining = deadline - time.time()
+                if is_complete(network_function) or remaining <= 0:
+                    return network_function
+                poll = True
+                with eventlet.Timeout(min(poll_interval, remaining), False):
+                    network_function = event.wait()
+                    poll = False
+            finally:
+                nf_status_waiters.unregister(network_function_id, event)
+
     def _wait_for_network_function_delete_completion(self, context,
                                                      network_function_id):
         # [REVISIT: (akash) do we need to do error handling here]
         if not network_function_id:
             return
 
-        time_waited = 0
-        network_function = None
-        while time_waited < cfg.CONF.nfp_node_driver.service_delete_timeout:
-            network_function = self.nfp_notifier.get_network_function(
-                context.plugin_context, network_function_id)
-            if not network_function or (
-                    network_function['status'] == nfp_constants.ERROR):
-                break
-            eventlet.sleep(5)
-            time_waited = time_waited + 5
+        network_function = self._wait_for_network_function(
+            context, network_function_id,
+            cfg.CONF.nfp_node_driver.service_delete_timeout,
+            lambda nf: not nf or nf['status'] == nfp_constants.ERROR)
 
         if network_function:
             LOG.error(_LE("Delete network function %(network_function)s "
@@ -783,51 +896,29 @@ class NFPNodeDriver(driver_base.NodeDriverBase):
         if not network_function_id:
             raise NodeInstanceCreateFailed()
 
-        time_waited = 0
-        network_function = None
-        timeout = cfg.CONF.nfp_node_driver.service_create_timeout
-
-        while time_waited < timeout:
-            network_function = self.nfp_notifier.get_network_function(
-                context.plugin_context, network_function_id)
-            LOG.debug("Got %s nf result for NF: %s with status:%s,"
-                      "time waited: %s", (network_function_id, operation,
-                      time_waited, network_function['status']))
-            if not network_function:
-                LOG.error(_LE("Failed to retrieve network function"))
-                eventlet.sleep(5)
-                time_waited = time_waited + 5
-                continue
-            else:
-                if time_waited == 0:
-                    LOG.info(_LI("STARTED POLLING for %(operation)s network "
-                                 "function for NF:%(network_function_id)s "
-                                 "with initial result: %(result)s "),
-                             {'operation': operation,
-                              'network_function_id': network_function_id,
-                              'result': network_function})
-            if (network_function['status'] == nfp_constants.ACTIVE or
-                network_function['status'] == nfp_constants.ERROR):
-                LOG.info(_LI("COMPLETED POLLING for  %(operation)s network "
-                             "function for NF:%(network_function_id)s "),
-                         {'network_function_id': network_function_id,
-                          'operation': operation})
-                break
-            eventlet.sleep(5)
-            time_waited = time_waited + 5
+        LOG.info(_LI("STARTED WAITING for %(operation)s network "
+                     "function for NF:%(network_function_id)s"),
+                 {'operation': operation,
+                  'network_function_id': network_function_id})
+        network_function = self._wait_for_network_function(
+            context, network_function_id,
+            cfg.CONF.nfp_node_driver.service_create_timeout,
+            lambda nf: nf and nf['status'] in [nfp_constants.ACTIVE,
+                                               nfp_constants.ERROR])
+        status = network_function['status'] if network_function else None
 
         LOG.info(_LI("Got %(operation)s network function result for NF:"
                      "%(network_function_id)s with status:%(status)s"),
                  {'network_function_id': network_function_id,
                   'operation': operation,
-                  'status': network_function['status']})
+                  'status': status})
 
-        if network_function['status'] != nfp_constants.ACTIVE:
+        if status != nfp_constants.ACTIVE:
             LOG.error(_LE("%(operation)s network function:"
                           "%(network_function)s "
                           "failed. Status: %(status)s"),
                       {'network_function': network_function_id,
-                       'status': network_function['status'],
+                       'status': status,
                        'operation': operation})
             if operation.lower() == nfp_constants.CREATE:
                 raise NodeInstanceCreateFailed()
@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+
 from neutron.plugins.common import constants as pconst
 from neutron.quota import resource_registry
 from oslo_config import cfg
@@ -27,6 +29,8 @@ from gbpservice.neutron.services.servicechain.plugins.ncp import (
     context as ctx)
 from gbpservice.neutron.services.servicechain.plugins.ncp import (
     exceptions as exc)
+from gbpservice.neutron.services.servicechain.plugins.ncp import (
+    model as ncp_model)
 from gbpservice.neutron.services.servicechain.plugins.ncp import (
     node_driver_manager as manager)
 from gbpservice.neutron.services.servicechain.plugins import sharing
@@ -55,6 +59,8 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
         service_profile=servicechain_db.ServiceProfile)
     def __init__(self):
         self.driver_manager = manager.NodeDriverManager()
+        # Node plumbing info, keyed by (instance id, node id, profile id).
+        self._plumbing_info = manager.SchedulingCache()
         super(NodeCompositionPlugin, self).__init__()
         self.driver_manager.initialize()
         plumber_klass = cfg.CONF.node_composition_plugin.node_plumber
@@ -104,6 +110,22 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
         return self._get_resource(context, 'servicechain_instance',
                                   servicechain_instance_id, fields)
 
+    @log.log_method_call
+    def get_servicechain_instances(self, context, filters=None, fields=None,
+                                   sorts=None, limit=None, marker=None,
+                                   page_reverse=False):
+        """Instances retrieved.
+
+        The status of all the instances in the page is evaluated at once.
+        """
+        instances = super(NodeCompositionPlugin,
+                          self).get_servicechain_instances(
+            context, filters=filters, sorts=sorts, limit=limit,
+            marker=marker, page_reverse=page_reverse)
+        if instances and (not fields or STATUS_SET.intersection(set(fields))):
+            self._update_instances_status(context, instances)
+        return [self._fields(instance, fields) for instance in instances]
+
     @log.log_method_call
     def update_servicechain_instance(self, context, servicechain_instance_id,
                                      servicechain_instance):
@@ -162,6 +184,7 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
         with session.begin(subtransactions=True):
             super(NodeCompositionPlugin, self).delete_servicechain_instance(
                 context, servicechain_instance_id)
+        self._forget_scheduling(instance_id=servicechain_instance_id)
 
     @log.log_method_call
     def create_servicechain_node(self, context, servicechain_node):
@@ -193,6 +216,7 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
                                         servicechain_node)
             self._validate_shared_update(context, original_sc_node,
                                          updated_sc_node, 'servicechain_node')
+            self._forget_scheduling(node_id=servicechain_node_id)
             instances = self._get_node_instances(context, updated_sc_node)
             for instance in instances:
                 node_context = ctx.get_node_driver_context(
@@ -207,7 +231,7 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
                 updaters[instance['id']]['context'] = node_context
                 updaters[instance['id']]['driver'] = driver
                 updaters[instance['id']]['plumbing_info'] = (
-                    driver.get_plumbing_info(node_context))
+                    self._get_plumbing_info(driver, node_context))
         # Update the nodes
         for update in updaters.values():
             try:
@@ -252,6 +276,9 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
             if (original_sc_spec['nodes'] != updated_sc_spec['nodes'] and
                 original_sc_spec['instances']):
                 raise exc.InuseSpecNodeUpdateNotAllowed()
+            for node_id in set(original_sc_spec['nodes'] +
+                               updated_sc_spec['nodes']):
+                self._forget_scheduling(node_id=node_id)
 
         return updated_sc_spec
 
@@ -297,8 +324,8 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
         Notify the correct set of node drivers that a new policy target has
         been added to a relevant PTG.
         """
-        self._update_chains_pt_modified(context, policy_target, instance_id,
-                                        'added')
+        self._update_chains_pts_modified(context, [policy_target],
+                                         [instance_id], 'added')
 
     def update_chains_pt_removed(self, context, policy_target, instance_id):
         """ Auto scaling function.
@@ -306,8 +333,32 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
         Notify the correct set of node drivers that a new policy target has
         been removed from a relevant PTG.
         """
-        self._update_chains_pt_modified(context, policy_target, instance_id,
-                                        'removed')
+        self._update_chains_pts_modified(context, [policy_target],
+                                         [instance_id], 'removed')
+
+    def update_chains_pts_added(self, context, policy_targets,
+                                instance_ids):
+        """ Auto scaling function.
+
+        Notify the correct set of node drivers that new policy targets have
+        been added to a PTG relevant to the chain instances. The instances
+        are read at once, and their node drivers scheduled once for all the
+        policy targets.
+        """
+        self._update_chains_pts_modified(context, policy_targets,
+                                         instance_ids, 'added')
+
+    def update_chains_pts_removed(self, context, policy_targets,
+                                  instance_ids):
+        """ Auto scaling function.
+
+        Notify the correct set of node drivers that policy targets have
+        been removed from a PTG relevant to the chain instances. The
+        instances are read at once, and their node drivers scheduled once
+        for all the policy targets.
+        """
+        self._update_chains_pts_modified(context, policy_targets,
+                                         instance_ids, 'removed')
 
     def update_chains_consumer_added(self, context, policy_target_group,
                                      instance_id):
@@ -357,19 +408,25 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
                 LOG.error(_LE("Node Update on policy target group modification"
                               " failed, %s"), ex.message)
 
-    def _update_chains_pt_modified(self, context, policy_target, instance_id,
-                                   action):
-        updaters = self._get_scheduled_drivers(
-            context, self.get_servicechain_instance(context, instance_id),
-            'update')
-        for update in updaters.values():
-            try:
-                getattr(update['driver'],
-                        'update_policy_target_' + action)(
-                            update['context'], policy_target)
-            except exc.NodeDriverError as ex:
-                LOG.error(_LE("Node Update on policy target modification "
-                              "failed, %s"), ex.message)
+    def _update_chains_pts_modified(self, context, policy_targets,
+                                    instance_ids, action):
+        if not policy_targets or not instance_ids:
+            return
+        # The instance status is not needed here
+        instances = super(NodeCompositionPlugin,
+                          self).get_servicechain_instances(
+                              context, filters={'id': list(instance_ids)})
+        for instance in instances:
+            updaters = self._get_scheduled_drivers(context, instance,
+                                                   'update')
+            for update in updaters.values():
+                try:
+                    getattr(update['driver'],
+                            'update_policy_targets_' + action)(
+                                update['context'], policy_targets)
+                except exc.NodeDriverError as ex:
+                    LOG.error(_LE("Node Update on policy target modification "
+                                  "failed, %s"), ex.message)
 
     def _update_chains_consumer_modified(self, context, policy_target_group,
                                          instance_id, action):
@@ -420,7 +477,8 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
             context, {'id': node['servicechain_specs']})
         result = []
         for spec in specs:
-            result.extend(self.get_servicechain_instances(
+            result.extend(super(NodeCompositionPlugin,
+                                self).get_servicechain_instances(
                 context, {'id': spec['instances']}))
         return result
 
@@ -439,46 +497,150 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
             result[node['id']] = {}
             result[node['id']]['driver'] = driver
             result[node['id']]['context'] = node_context
-            result[node['id']]['plumbing_info'] = driver.get_plumbing_info(
-                node_context)
+            # Status reads don't need any plumbing
+            if action != 'get':
+                result[node['id']]['plumbing_info'] = (
+                    self._get_plumbing_info(driver, node_context,
+                                            refresh=(action == 'deploy')))
         return result
 
+    def _get_plumbing_info(self, driver, node_context, refresh=False):
+        """Node plumbing info, cached per instance, node and profile.
+
+        Drivers may have to reach out to a backend to compute it, so it is
+        asked again only on deploy, once the node or spec are updated or
+        when the cache entry expires.
+        """
+        key = (node_context.instance['id'], node_context.current_node['id'],
+               node_context.current_node['service_profile_id'])
+        missing = object()
+        plumbing_info = missing if refresh else self._plumbing_info.get(
+            key, missing)
+        if plumbing_info is missing:
+            plumbing_info = driver.get_plumbing_info(node_context)
+            self._plumbing_info.set(key, plumbing_info)
+        return copy.deepcopy(plumbing_info)
+
+    def _forget_scheduling(self, instance_id=None, node_id=None):
+        self._plumbing_info.forget(instance_id=instance_id, node_id=node_id)
+        self.driver_manager.forget_node_owners(instance_id=instance_id,
+                                               node_id=node_id)
+
+    def _update_instances_status(self, context, instances):
+        """Evaluate the status of a page of instances in bulk.
+
+        Owners of all the nodes are read in one query, and each owning
+        driver is asked once for the status of all its nodes through
+        get_statuses. Instances with any node owned by a driver not
+        implementing it keep the status stored in the DB.
+        """
+        spec_ids = set(spec_id for instance in instances
+                       for spec_id in instance['servicechain_specs'])
+        if not spec_ids:
+            return
+        spec_nodes = {}
+        query = context.session.query(servicechain_db.SpecNodeAssociation)
+        query = query.filter(
+            servicechain_db.SpecNodeAssociation.servicechain_spec_id.in_(
+                spec_ids))
+        for assoc in query.order_by(
+                servicechain_db.SpecNodeAssociation.position):
+            spec_nodes.setdefault(assoc.servicechain_spec_id, []).append(
+                assoc.node_id)
+        owners = dict(
+            ((owner.servicechain_instance_id, owner.servicechain_node_id),
+             owner.driver_name) for owner in ncp_model.get_node_owners(
+                context.session, [instance['id'] for instance in instances]))
+
+        instance_nodes = {}
+        driver_nodes = {}
+        for instance in instances:
+            if len(instance['servicechain_specs']) != 1:
+                continue
+            node_instances = [
+                (instance['id'], node_id) for node_id in
+                spec_nodes.get(instance['servicechain_specs'][0], [])]
+            drivers = [self.driver_manager.drivers.get(owners.get(x))
+                       for x in node_instances]
+            if not node_instances or not all(
+                    driver and hasattr(driver.obj, 'get_statuses')
+                    for driver in drivers):
+                continue
+            instance_nodes[instance['id']] = node_instances
+            for driver, node_instance in zip(drivers, node_instances):
+                driver_nodes.setdefault(driver.obj, []).append(node_instance)
+
+        statuses = {}
+        for driver, node_instances in driver_nodes.items():
+            try:
+                statuses.update(driver.get_statuses(context, node_instances))
+            except Exception as e:
+                LOG.error(_LE("Failed to get servicechain instances status "
+                              "from node driver, Error: %(exc)s"), {'exc': e})
+
+        for instance in instances:
+            node_instances = instance_nodes.get(instance['id'])
+            if node_instances and all(x in statuses for x in node_instances):
+                self._set_resource_status(
+                    context, 'servicechain_instance', instance,
+                    self._summarize_nodes_status(
+                        [statuses[x] for x in node_instances]))
+
     def _get_resource(self, context, resource_name, resource_id, fields=None):
         session = context.session
         deployers = {}
+        # Invoke drivers only if status attributes are requested
+        get_status = not fields or STATUS_SET.intersection(set(fields))
         with session.begin(subtransactions=True):
             resource = getattr(super(NodeCompositionPlugin,
                 self), 'get_' + resource_name)(context, resource_id)
             if resource_name == 'servicechain_instance':
                 if len(resource['servicechain_specs']) > 1:
                     raise exc.OneSpecPerInstanceAllowed()
-                try:
-                    deployers = self._get_scheduled_drivers(context, resource,
-                                                        'get')
-                except Exception:
-                    LOG.warning(_LW("Failed to get node driver"))
-
-        # Invoke drivers only if status attributes are requested
-        if not fields or STATUS_SET.intersection(set(fields)):
+                if get_status:
+                    try:
+                        deployers = self._get_scheduled_drivers(
+                            context, resource, 'get')
+                    except Exception:
+                        LOG.warning(_LW("Failed to get node driver"))
+
+        if get_status:
             _resource = self._get_resource_status(context, resource_name,
                                                   deployers)
             if _resource:
-                updated_status = _resource['status']
-                updated_status_details = _resource['status_details']
-                if resource['status'] != updated_status or (
-                    resource['status_details'] != updated_status_details):
-                    new_status = {resource_name:
-                              {'status': updated_status,
-                               'status_details': updated_status_details}}
-                    session = context.session
-                    with session.begin(subtransactions=True):
-                        getattr(super(NodeCompositionPlugin, self),
-                            'update_' + resource_name)(
-                             context, resource['id'], new_status)
-                    resource['status'] = updated_status
-                    resource['status_details'] = updated_status_details
+                self._set_resource_status(context, resource_name, resource,
+                                          _resource)
         return self._fields(resource, fields)
 
+    def _set_resource_status(self, context, resource_name, resource, status):
+        updated_status = status['status']
+        updated_status_details = status['status_details']
+        if resource['status'] != updated_status or (
+            resource['status_details'] != updated_status_details):
+            new_status = {resource_name:
+                      {'status': updated_status,
+                       'status_details': updated_status_details}}
+            session = context.session
+            with session.begin(subtransactions=True):
+                getattr(super(NodeCompositionPlugin, self),
+                    'update_' + resource_name)(
+                     context, resource['id'], new_status)
+            resource['status'] = updated_status
+            resource['status_details'] = updated_status_details
+
+    @staticmethod
+    def _summarize_nodes_status(nodes_status):
+        result = {'status': 'BUILD',
+                  'status_details': 'node deployment in progress'}
+        node_status = [node['status'] for node in nodes_status]
+        if 'ERROR' in node_status:
+            result['status'] = 'ERROR'
+            result['status_details'] = 'node deployment failed'
+        elif node_status.count('ACTIVE') == len(node_status):
+            result['status'] = 'ACTIVE'
+            result['status_details'] = 'node deployment completed'
+        return result
+
     def _get_resource_status(self, context, resource_name, deployers=None):
         """
         Invoke node drivers only for servicechain_instance.
@@ -487,22 +649,13 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
         """
         if resource_name == 'servicechain_instance':
             nodes_status = []
-            result = {'status': 'BUILD',
-                      'status_details': 'node deployment in progress'}
             if deployers:
                 try:
                     for deploy in deployers.values():
                         driver = deploy['driver']
                         nodes_status.append(driver.get_status(
                             deploy['context']))
-                    node_status = [node['status'] for node in nodes_status]
-                    if 'ERROR' in node_status:
-                        result['status'] = 'ERROR'
-                        result['status_details'] = 'node deployment failed'
-                    elif node_status.count('ACTIVE') == len(
-                            deployers.values()):
-                        result['status'] = 'ACTIVE'
-                        result['status_details'] = 'node deployment completed'
+                    result = self._summarize_nodes_status(nodes_status)
                 except Exception as exc:
                     LOG.error(_LE("Failed to get servicechain instance status "
                         "from node driver, Error: %(exc)s"), {'exc': exc})
@@ -536,6 +689,9 @@ class NodeCompositionPlugin(servicechain_db.ServiceChainDbPlugin,
                     LOG.exception(e)
                 finally:
                     self.driver_manager.clear_node_owner(destroy['context'])
+                    self._forget_scheduling(
+                        instance_id=destroy['context'].instance['id'],
+                        node_id=destroy['context'].current_node['id'])
         finally:
             self.plumber.unplug_services(context, destroyers.values())
 
@@ -12,6 +12,7 @@
 # limitations under the License.
 
 import copy
+import functools
 import os
 import six
 import webob.exc
@@ -30,6 +31,7 @@ from neutron_lib.db import model_base
 from neutron_lib.plugins import directory
 from oslo_utils import importutils
 from oslo_utils import uuidutils
+from sqlalchemy import event as sa_event
 
 from gbpservice.neutron.db.grouppolicy import group_policy_db as gpdb
 from gbpservice.neutron.db import servicechain_db as svcchain_db
@@ -389,6 +391,20 @@ class GroupPolicyDbTestCase(GroupPolicyDBTestBase,
         registry.clear()
         super(GroupPolicyDbTestCase, self).tearDown()
 
+    def _count_queries(self, method, *args, **kwargs):
+        engine = db_api.context_manager.writer.get_engine()
+        statements = []
+
+        def _count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa_event.listen(engine, 'before_cursor_execute', _count)
+        try:
+            result = method(*args, **kwargs)
+        finally:
+            sa_event.remove(engine, 'before_cursor_execute', _count)
+        return result, len(statements)
+
 
 class TestGroupResources(GroupPolicyDbTestCase):
 
@@ -402,6 +418,12 @@ class TestGroupResources(GroupPolicyDbTestCase):
         for k, v in six.iteritems(attrs):
             self.assertEqual(res[resource][k], v)
 
+    def _get_db_collection(self, resource_plural):
+        # Count the DB layer only, plugins may extend each resource
+        return functools.partial(
+            getattr(gpdb.GroupPolicyDbPlugin, 'get_' + resource_plural),
+            self.plugin)
+
     def test_create_and_show_policy_target(self):
         ptg_id = self.create_policy_target_group()['policy_target_group']['id']
         attrs = cm.get_create_policy_target_default_attrs(
@@ -625,6 +647,42 @@ class TestGroupResources(GroupPolicyDbTestCase):
         self._test_list_resources('policy_target_group', ptgs,
                                   query_params='description=ptg')
 
+    def test_list_policy_target_groups_query_count(self):
+        ctx = context.get_admin_context()
+        get_policy_target_groups = self._get_db_collection(
+            'policy_target_groups')
+
+        def _create_ptg():
+            prs_id = self.create_policy_rule_set()['policy_rule_set']['id']
+            ptg_id = self.create_policy_target_group(
+                provided_policy_rule_sets={prs_id: None},
+                consumed_policy_rule_sets={prs_id: None})[
+                    'policy_target_group']['id']
+            for i in range(0, 2):
+                self.create_policy_target(policy_target_group_id=ptg_id)
+
+        _create_ptg()
+        ptgs, queries = self._count_queries(get_policy_target_groups, ctx)
+        self.assertEqual(1, len(ptgs))
+        for i in range(0, 10):
+            _create_ptg()
+        ptgs, more_queries = self._count_queries(get_policy_target_groups,
+                                                 ctx)
+        self.assertEqual(11, len(ptgs))
+        # The query count does not grow with the number of groups
+        self.assertEqual(queries, more_queries)
+        for ptg in ptgs:
+            self.assertEqual(2, len(ptg['policy_targets']))
+            self.assertEqual(1, len(ptg['provided_policy_rule_sets']))
+            self.assertEqual(1, len(ptg['consumed_policy_rule_sets']))
+
+        # Relationships backing fields not requested are not loaded
+        ptgs, fields_queries = self._count_queries(
+            get_policy_target_groups, ctx, fields=['id', 'name'])
+        self.assertLess(fields_queries, queries)
+        for ptg in ptgs:
+            self.assertEqual(set(['id', 'name']), set(ptg))
+
     def test_update_policy_target_group(self):
         name = "new_policy_target_group1"
         description = 'new desc'
@@ -1383,6 +1441,36 @@ class TestGroupResources(GroupPolicyDbTestCase):
         self._test_list_resources('policy_rule_set', policy_rule_sets,
                                   query_params='description=ct')
 
+    def test_list_policy_rule_sets_query_count(self):
+        ctx = context.get_admin_context()
+        parents = {}
+
+        def _create_prs_with_children():
+            children = [self.create_policy_rule_set()['policy_rule_set']['id']
+                        for i in range(0, 2)]
+            prs = self.create_policy_rule_set(child_policy_rule_sets=children)
+            parents[prs['policy_rule_set']['id']] = sorted(children)
+
+        _create_prs_with_children()
+        get_policy_rule_sets = self._get_db_collection('policy_rule_sets')
+        prs_list, queries = self._count_queries(get_policy_rule_sets, ctx)
+        self.assertEqual(3, len(prs_list))
+        for i in range(0, 10):
+            _create_prs_with_children()
+        prs_list, more_queries = self._count_queries(get_policy_rule_sets,
+                                                     ctx)
+        self.assertEqual(33, len(prs_list))
+        # The query count does not grow with the number of rule sets
+        self.assertEqual(queries, more_queries)
+        for prs in prs_list:
+            if prs['id'] in parents:
+                self.assertIsNone(prs['parent_id'])
+                self.assertEqual(parents[prs['id']],
+                                 sorted(prs['child_policy_rule_sets']))
+            else:
+                self.assertIn(prs['id'], parents[prs['parent_id']])
+                self.assertEqual([], prs['child_policy_rule_sets'])
+
     def test_update_policy_rule_set(self):
         name = "new_policy_rule_set"
         description = 'new desc'
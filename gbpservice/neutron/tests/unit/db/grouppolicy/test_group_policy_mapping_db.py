@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+
 import webob.exc
 
 from neutron import context as nctx
@@ -20,6 +22,7 @@ from neutron_lib.db import model_base
 
 from gbpservice.neutron.db.grouppolicy import group_policy_mapping_db as gpmdb
 from gbpservice.neutron.services.grouppolicy.common import exceptions as gpexc
+from gbpservice.neutron.services.grouppolicy.common import utils as gp_utils
 from gbpservice.neutron.tests.unit.db.grouppolicy import (
     test_group_policy_db as tgpdb)
 
@@ -260,6 +263,33 @@ class TestMappedGroupResourceAttrs(GroupPolicyMappingDbTestCase):
                     'external_segment', [external_segments[0]],
                     query_params='subnet_id=' + subnets[0])
 
+    def test_list_l3_policies_with_subnetpools(self):
+        ctx = nctx.get_admin_context()
+        get_l3_policies = functools.partial(
+            gpmdb.GroupPolicyMappingDbPlugin.get_l3_policies,
+            self._gbp_plugin)
+        prefixes = {}
+
+        def _create_l3p(i):
+            sp = self._make_subnetpool(
+                self.fmt, ['10.%d.0.0/16' % i, '20.%d.0.0/16' % i],
+                name='sp%d' % i, tenant_id=self._tenant_id)['subnetpool']
+            l3p = self.create_l3_policy(
+                subnetpools_v4=[sp['id']])['l3_policy']
+            prefixes[l3p['id']] = sorted(sp['prefixes'])
+
+        _create_l3p(0)
+        l3ps, queries = self._count_queries(get_l3_policies, ctx)
+        for i in range(1, 6):
+            _create_l3p(i)
+        l3ps, more_queries = self._count_queries(get_l3_policies, ctx)
+        self.assertEqual(6, len(l3ps))
+        # Subnetpool prefixes are resolved for the whole page at once
+        self.assertEqual(queries, more_queries)
+        for l3p in l3ps:
+            self.assertEqual(prefixes[l3p['id']], sorted(
+                gp_utils.convert_ip_pool_string_to_list(l3p['ip_pool'])))
+
     def test_pt_port_extra_attributes_fail(self):
         ptg = self.create_policy_target_group()['policy_target_group']
         ctx = nctx.get_admin_context()
@@ -388,6 +388,26 @@ class TestServiceChainResources(ServiceChainDbTestCase):
                                   servicechain_instances,
                                   query_params='description=sci')
 
+    def test_get_instances_from_policy_target(self):
+        ptg1, ptg2 = [uuidutils.generate_uuid() for i in range(0, 2)]
+        sci1 = self.create_servicechain_instance(
+            provider_ptg_id=ptg1,
+            consumer_ptg_id=ptg2)['servicechain_instance']
+        sci2 = self.create_servicechain_instance(
+            provider_ptg_id=ptg2,
+            consumer_ptg_id=ptg2)['servicechain_instance']
+        self.create_servicechain_instance(provider_ptg_id=ptg1,
+                                          consumer_ptg_id=ptg1)
+        ctx = context.get_admin_context()
+
+        scis, queries = self._count_queries(
+            self.plugin._get_instances_from_policy_target, ctx,
+            {'policy_target_group_id': ptg2})
+        self.assertEqual(sorted([sci1['id'], sci2['id']]),
+                         sorted(sci['id'] for sci in scis))
+        # Instances and their specs
+        self.assertEqual(2, queries)
+
     def test_spec_ordering_list_servicechain_instances(self):
         scs1_id = self.create_servicechain_spec()['servicechain_spec']['id']
         scs2_id = self.create_servicechain_spec()['servicechain_spec']['id']
@@ -0,0 +1,138 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import ast
+import datetime
+import time
+import uuid
+import zlib
+
+from oslo_log import log as oslo_logging
+import unittest2
+
+from gbpservice.nfp.core import codec as nfp_codec
+from gbpservice.nfp.orchestrator import context as orchestrator_context
+
+LOG = oslo_logging.getLogger(__name__)
+
+ITERATIONS = 500
+
+
+def _id():
+    return str(uuid.uuid4())
+
+
+def _orchestrator_payload():
+    """Event context as built by the orchestrator for a LB service. """
+    provider_ptg = {'id': _id(), 'name': 'provider', 'tenant_id': _id(),
+                    'provided_policy_rule_sets': [_id()],
+                    'policy_targets': [_id() for i in range(0, 20)],
+                    'subnets': [_id()], 'l2_policy_id': _id()}
+    subnet = {'id': _id(), 'cidr': '11.0.0.0/24',
+              'gateway_ip': '11.0.0.1', 'name': 'ptg_subnet'}
+    port = {'id': _id(), 'ip_address': '11.0.0.5',
+            'mac_address': 'fa:16:3e:00:00:01', 'name': 'pt_port',
+            'fixed_ips': [{'subnet_id': subnet['id'],
+                           'ip_address': '11.0.0.5'}],
+            'gateway_ip': '11.0.0.1', 'cidr': '11.0.0.0/24'}
+    data = {
+        'id': 'CREATE_NETWORK_FUNCTION_INSTANCE', 'key': _id(),
+        'tenant_id': _id(), 'admin_tenant_id': _id(),
+        'admin_token': 'a' * 180,
+        'event_desc': {'path_type': 'CREATE', 'path_key': _id()},
+        'network_function': {'id': _id(), 'name': 'nf', 'status': 'PENDING',
+                             'service_id': _id(),
+                             'service_config': 'x' * 2000,
+                             'network_function_instances': [_id()]},
+        'provider': {'ptg': provider_ptg, 'port': port,
+                     'subnet': subnet, 'pt': {'id': _id()}},
+        'consumer': {'ptg': dict(provider_ptg, name='consumer'),
+                     'port': port, 'subnet': subnet, 'pt': {'id': _id()}},
+        'service_details': {'service_vendor': 'haproxy',
+                            'service_type': 'LOADBALANCERV2',
+                            'network_mode': 'GBP', 'image_name': 'haproxy',
+                            'device_type': 'nova'},
+        'service_chain_instance': {'id': _id(), 'name': 'sci',
+                                   'provider_ptg_id': provider_ptg['id'],
+                                   'config_param_values': '{}'},
+        'log_context': {'meta_id': _id(), 'nfi_id': _id(),
+                        'nfd_id': _id(), 'path': 'CREATE',
+                        'auth_token': 'a' * 180, 'namespace': 'orchestrator'}
+    }
+    return {'context': orchestrator_context.NfpContext(data).purge(),
+            'data': {'network_function_id': _id()}}
+
+
+class TestEventCodec(unittest2.TestCase):
+
+    def _codecs(self):
+        codecs = [nfp_codec.get_codec('pickle')]
+        if nfp_codec.msgpackutils:
+            codecs.append(nfp_codec.get_codec('msgpack'))
+        return codecs
+
+    def test_roundtrip(self):
+        payload = _orchestrator_payload()
+        for codec in self._codecs():
+            self.assertEqual(payload, codec.decode(codec.encode(payload)))
+
+    def test_roundtrip_non_literal_values(self):
+        payload = {'context': {'created_at': datetime.datetime(2016, 1, 1),
+                               'id': uuid.uuid4()},
+                   'data': {'ids': set([1, 2])}}
+        for codec in self._codecs():
+            self.assertEqual(payload, codec.decode(codec.encode(payload)))
+
+    def test_compress_only_above_threshold(self):
+        codec = nfp_codec.get_codec('pickle', compress_threshold=1024)
+        small = codec.encode({'data': 'x'})
+        self.assertEqual(nfp_codec.RAW, small[:1])
+        large = codec.encode({'data': 'x' * 4096})
+        self.assertEqual(nfp_codec.ZLIB, large[:1])
+        self.assertEqual({'data': 'x' * 4096}, codec.decode(large))
+
+    def test_compress_disabled(self):
+        codec = nfp_codec.get_codec('pickle', compress_threshold=-1)
+        self.assertEqual(nfp_codec.RAW, codec.encode({'data': 'x' * 4096})[:1])
+
+    def test_unknown_codec_falls_back_to_pickle(self):
+        codec = nfp_codec.get_codec('unknown')
+        self.assertEqual('pickle', codec.name)
+
+    def test_decode_bad_header(self):
+        codec = nfp_codec.get_codec('pickle')
+        self.assertRaises(ValueError, codec.decode, b'\x09abc')
+
+    def test_benchmark_codecs(self):
+        """Compare codecs against the old str + zlib + literal_eval. """
+        payloads = [_orchestrator_payload() for i in range(0, 10)]
+
+        start = time.time()
+        for i in range(0, ITERATIONS):
+            payload = payloads[i % len(payloads)]
+            ast.literal_eval(zlib.decompress(zlib.compress(str(payload))))
+        rates = {'literal_eval': ITERATIONS / (time.time() - start)}
+
+        for codec in self._codecs():
+            start = time.time()
+            for i in range(0, ITERATIONS):
+                payload = payloads[i % len(payloads)]
+                codec.decode(codec.encode(payload))
+            rates[codec.name] = ITERATIONS / (time.time() - start)
+
+        LOG.info("Event codec roundtrips/s - %s", rates)
+        for name, rate in rates.items():
+            self.assertTrue(rate > 0)
+
+
+if __name__ == '__main__':
+    unittest2.main()
@@ -0,0 +1,85 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import common as nfp_common
+from gbpservice.nfp.core import manager as nfp_manager
+import mock
+import multiprocessing as multiprocessing
+import time
+import unittest2
+
+
+class TestManagerLoop(unittest2.TestCase):
+
+    def setUp(self):
+        controller = mock.Mock()
+        controller.get_childrens.return_value = {}
+        self.manager = nfp_manager.NfpResourceManager({}, controller)
+        self.pipes = {}
+        for pid in [1, 2]:
+            parent_pipe, child_pipe = multiprocessing.Pipe(duplex=True)
+            self.pipes[pid] = child_pipe
+            self.manager.new_child(pid, parent_pipe)
+
+    def test_wait_for_events_returns_ready_workers(self):
+        self.pipes[2].send(['event'])
+        self.assertEqual([2], self.manager.wait_for_events(timeout=1))
+
+    def test_wait_for_events_times_out(self):
+        start = time.time()
+        self.assertEqual([], self.manager.wait_for_events(timeout=0.05))
+        self.assertTrue(time.time() - start >= 0.05)
+
+    def test_wakeup_interrupts_wait(self):
+        self.manager.wakeup()
+        # Repeated wakeups before the manager runs are coalesced
+        self.manager.wakeup()
+        start = time.time()
+        self.assertEqual([], self.manager.wait_for_events(timeout=5))
+        self.assertTrue(time.time() - start < 5)
+        self.manager.manager_run(ready=[])
+        stats = self.manager.get_latency_stats()
+        self.assertEqual(1, stats['wakeup']['count'])
+        # Wakeup pipe was drained
+        self.assertEqual([], self.manager.wait_for_events(timeout=0))
+
+    def test_manager_run_reads_only_ready_workers(self):
+        with mock.patch.object(nfp_manager.NfpEventManager,
+                               'event_watcher') as watcher:
+            watcher.return_value = []
+            self.manager.manager_run(ready=[1])
+            watcher.assert_called_once_with(timeout=0)
+
+
+class TestLatencyHistogram(unittest2.TestCase):
+
+    def test_record(self):
+        histogram = nfp_common.LatencyHistogram()
+        histogram.record(0.0005)
+        histogram.record(0.015)
+        histogram.record(10)
+        stats = histogram.to_dict()
+        self.assertEqual(3, stats['count'])
+        self.assertEqual(1, stats['buckets']['<=1ms'])
+        self.assertEqual(1, stats['buckets']['<=20ms'])
+        self.assertEqual(1, stats['buckets']['>5000ms'])
+        self.assertEqual(10000.0, stats['max_ms'])
+
+    def test_reset(self):
+        histogram = nfp_common.LatencyHistogram()
+        histogram.record(1)
+        histogram.reset()
+        self.assertEqual(0, histogram.to_dict()['count'])
+
+
+if __name__ == '__main__':
+    unittest2.main()
@@ -0,0 +1,161 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+import eventlet
+from gbpservice.nfp.core import context as nfp_context
+from gbpservice.nfp.core import controller as nfp_controller
+from gbpservice.nfp.core import event as nfp_event
+import multiprocessing as multiprocessing
+from oslo_config import cfg as oslo_config
+from oslo_log import log as oslo_logging
+import time
+import unittest2
+
+LOG = oslo_logging.getLogger(__name__)
+
+# Events posted in one burst, kept small enough for a burst
+# to fit in the socket buffer of a single process test.
+BURST = 64
+BURSTS = 20
+
+
+class TestPipeBatching(unittest2.TestCase):
+
+    def setUp(self):
+        nfp_context.init()
+        conf = oslo_config.CONF
+        conf.nfp_modules_path = []
+        self.controller = nfp_controller.NfpController(
+            conf, singleton=False)
+        self.parent_pipe, self.child_pipe = multiprocessing.Pipe(
+            duplex=True)
+
+    def tearDown(self):
+        self.parent_pipe.close()
+        self.child_pipe.close()
+
+    def _new_event(self, index):
+        event = self.controller.create_event(
+            id='EVENT_%d' % (index), data={'index': index})
+        event.context = {'log_context': {}, 'event_desc': {}}
+        return event
+
+    def test_pipe_send_without_batch_sends_frame_of_one(self):
+        event = self._new_event(1)
+        self.assertTrue(self.controller.pipe_send(self.parent_pipe, event))
+        frame = self.child_pipe.recv()
+        self.assertEqual(1, len(frame))
+        self.assertEqual('EVENT_1', frame[0].id)
+
+    def test_pipe_batch_coalesces_events_in_one_frame(self):
+        with self.controller.pipe_batch():
+            for i in range(0, 10):
+                self.controller.pipe_send(
+                    self.parent_pipe, self._new_event(i))
+            # Nothing is written till the block exits
+            self.assertFalse(self.child_pipe.poll())
+        frame = self.child_pipe.recv()
+        self.assertEqual(10, len(frame))
+        self.assertEqual(['EVENT_%d' % (i) for i in range(0, 10)],
+                         [event.id for event in frame])
+        self.assertFalse(self.child_pipe.poll())
+
+    def test_pipe_batch_scoped_to_greenthread(self):
+        with self.controller.pipe_batch():
+            self.controller.pipe_send(self.parent_pipe, self._new_event(0))
+            # Completions sent by handler threads are not held back
+            # by the batching receive loop
+            eventlet.spawn(self.controller.pipe_send, self.parent_pipe,
+                           self._new_event(1)).wait()
+            frame = self.child_pipe.recv()
+            self.assertEqual(['EVENT_0', 'EVENT_1'],
+                             [event.id for event in frame])
+            self.controller.pipe_send(self.parent_pipe, self._new_event(2))
+            self.assertFalse(self.child_pipe.poll())
+        self.assertEqual(['EVENT_2'],
+                         [event.id for event in self.child_pipe.recv()])
+        self.assertEqual({}, self.controller._batching)
+
+    def test_pipe_recv_all_drains_ready_frames(self):
+        for i in range(0, 5):
+            self.controller.pipe_send(self.parent_pipe, self._new_event(i))
+        events = self.controller.pipe_recv_all(self.child_pipe)
+        self.assertEqual(5, len(events))
+        for i, event in enumerate(events):
+            self.assertFalse(event.zipped)
+            self.assertEqual({'index': i}, event.data)
+
+    def test_pipe_recv_accepts_bare_event(self):
+        event = self._new_event(1)
+        self.controller.compress(event)
+        self.parent_pipe.send(event)
+        events = self.controller.pipe_recv(self.child_pipe)
+        self.assertEqual(1, len(events))
+        self.assertEqual({'index': 1}, events[0].data)
+
+    def test_event_manager_drains_all_in_one_watch(self):
+        em = nfp_event.NfpEventManager(
+            oslo_config.CONF, self.controller, None,
+            pipe=self.child_pipe, pid=1)
+        with self.controller.pipe_batch():
+            for i in range(0, BURST):
+                self.controller.pipe_send(
+                    self.parent_pipe, self._new_event(i))
+        self.assertEqual(BURST, len(em.event_watcher(timeout=0.01)))
+
+    def test_benchmark_events_per_worker(self):
+        """Compare per event frames against batched frames.
+
+            Each manager tick pulls from the worker pipe, the
+            number of ticks needed to drain a burst bounds the
+            events/s of a worker.
+        """
+        total = BURST * BURSTS
+
+        # Before: one event per pipe.send(), one per tick
+        ticks = 0
+        start = time.time()
+        for i in range(0, BURSTS):
+            for j in range(0, BURST):
+                event = self._new_event(j)
+                self.controller.compress(event)
+                self.parent_pipe.send(event)
+                if self.child_pipe.poll(0.01):
+                    self.controller.pipe_recv(self.child_pipe)
+                    ticks += 1
+        before = total / (time.time() - start)
+        before_ticks = ticks
+
+        # After: burst coalesced, drained in one tick
+        ticks = 0
+        received = 0
+        start = time.time()
+        for i in range(0, BURSTS):
+            with self.controller.pipe_batch():
+                for j in range(0, BURST):
+                    self.controller.pipe_send(
+                        self.parent_pipe, self._new_event(j))
+            received += len(self.controller.pipe_recv_all(self.child_pipe))
+            ticks += 1
+        after = total / (time.time() - start)
+        after_ticks = ticks
+
+        LOG.info("Pipe events/s per worker, before: %d (%d ticks), "
+                 "after: %d (%d ticks)",
+                 before, before_ticks, after, after_ticks)
+        self.assertEqual(total, received)
+        self.assertEqual(total, before_ticks)
+        self.assertEqual(BURSTS, after_ticks)
+
+
+if __name__ == '__main__':
+    unittest2.main()
@@ -47,8 +47,9 @@ class MockedPipe(object):
     def poll(self, *args, **kwargs):
         return False
 
-    def send(self, event):
-        self.other_end_event_proc_func(event)
+    def send(self, frame):
+        for event in frame:
+            self.other_end_event_proc_func(event)
 
 
 class MockedProcess(object):
@@ -0,0 +1,84 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import event as nfp_event
+from gbpservice.nfp.core import sequencer as nfp_sequencer
+import mock
+import unittest2
+
+
+class TestEventSequencer(unittest2.TestCase):
+
+    def setUp(self):
+        self.sequencer = nfp_sequencer.EventSequencer()
+
+    def _event(self, id, key):
+        return nfp_event.Event(id=id, serialize=True, binding_key=key)
+
+    def test_events_with_same_key_run_in_order(self):
+        event_1 = self._event('EVENT_1', 'KEY')
+        event_2 = self._event('EVENT_2', 'KEY')
+        self.sequencer.sequence('KEY', event_1)
+        self.sequencer.sequence('KEY', event_2)
+        self.assertEqual([event_1], self.sequencer.run())
+        self.assertFalse(event_1.sequence)
+        # Busy till event_1 is released
+        self.assertEqual([], self.sequencer.run())
+        self.sequencer.release('KEY', event_1)
+        self.assertEqual([event_2], self.sequencer.run())
+        self.sequencer.release('KEY', event_2)
+        self.assertEqual({}, self.sequencer._sequencer)
+
+    def test_events_with_diff_keys_run_together(self):
+        event_1 = self._event('EVENT_1', 'KEY_1')
+        event_2 = self._event('EVENT_2', 'KEY_2')
+        self.sequencer.sequence('KEY_1', event_1)
+        self.sequencer.sequence('KEY_2', event_2)
+        self.assertEqual([event_1, event_2], self.sequencer.run())
+
+    def test_release_of_other_event_ignored(self):
+        event_1 = self._event('EVENT_1', 'KEY')
+        event_2 = self._event('EVENT_2', 'KEY')
+        self.sequencer.sequence('KEY', event_1)
+        self.sequencer.sequence('KEY', event_2)
+        self.sequencer.run()
+        self.sequencer.release('KEY', event_2)
+        self.assertEqual([], self.sequencer.run())
+        self.sequencer.release('UNKNOWN', event_1)
+
+    def test_pop(self):
+        event_1 = self._event('EVENT_1', 'KEY')
+        event_2 = self._event('EVENT_2', 'KEY')
+        self.sequencer.sequence('KEY', event_1)
+        self.sequencer.sequence('KEY', event_2)
+        self.sequencer.run()
+        self.assertEqual([event_2], self.sequencer.pop())
+        self.assertEqual([], self.sequencer.run())
+
+    def test_run_visits_only_ready_keys(self):
+        for i in range(0, 1000):
+            key = 'KEY_%d' % (i)
+            self.sequencer.sequence(key, self._event('EVENT_1', key))
+            self.sequencer.sequence(key, self._event('EVENT_2', key))
+        self.assertEqual(1000, len(self.sequencer.run()))
+
+        event = self._event('EVENT_3', 'KEY_NEW')
+        self.sequencer.sequence('KEY_NEW', event)
+        with mock.patch.object(nfp_sequencer.EventSequencer.Sequencer,
+                               'run', autospec=True,
+                               return_value=event) as run:
+            self.assertEqual([event], self.sequencer.run())
+            self.assertEqual(1, run.call_count)
+
+
+if __name__ == '__main__':
+    unittest2.main()
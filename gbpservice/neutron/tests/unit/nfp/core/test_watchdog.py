@@ -0,0 +1,191 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import watchdog as nfp_watchdog
+import heapq
+import mock
+from oslo_log import log as oslo_logging
+import time
+import unittest2
+
+LOG = oslo_logging.getLogger(__name__)
+
+TIMERS = 100000
+
+
+class TestTimerWheel(unittest2.TestCase):
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(nfp_watchdog, 'time',
+                                    side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.wheel = nfp_watchdog.TimerWheel()
+
+    def _timer(self, sec):
+        return nfp_watchdog.Timer(self.now + sec, None, (), {})
+
+    def test_expire_in_order(self):
+        timers = [self._timer(sec) for sec in [3, 1, 2]]
+        for timer in timers:
+            self.wheel.add(timer)
+        self.assertEqual(3, len(self.wheel))
+        self.assertEqual([], self.wheel.expire(self.now + 0.5))
+        self.assertEqual([timers[1]], self.wheel.expire(self.now + 1))
+        self.assertEqual([timers[2], timers[0]],
+                         self.wheel.expire(self.now + 10))
+        self.assertEqual(0, len(self.wheel))
+
+    def test_cancelled_timer_not_expired(self):
+        timer = self._timer(1)
+        self.wheel.add(timer)
+        self.wheel.cancel(timer)
+        self.assertEqual(0, len(self.wheel))
+        self.assertEqual([], self.wheel.expire(self.now + 2))
+        self.assertRaises(ValueError, self.wheel.cancel, timer)
+
+    def test_expired_timer_cancel_raises(self):
+        timer = self._timer(1)
+        self.wheel.add(timer)
+        self.wheel.expire(self.now + 1)
+        self.assertRaises(ValueError, self.wheel.cancel, timer)
+
+    def test_expire_after_long_gap(self):
+        timer = self._timer(5)
+        self.wheel.add(timer)
+        self.assertEqual([timer], self.wheel.expire(self.now + 86400))
+
+    def test_next_expiry_skips_cancelled_slots(self):
+        timers = [self._timer(sec) for sec in [5, 2, 600]]
+        for timer in timers:
+            self.wheel.add(timer)
+        self.assertEqual(self.now + 2, self.wheel.next_expiry())
+        self.wheel.cancel(timers[1])
+        self.assertEqual(self.now + 5, self.wheel.next_expiry())
+        self.wheel.expire(self.now + 5)
+        self.assertEqual(self.now + 600, self.wheel.next_expiry())
+        self.wheel.cancel(timers[2])
+        self.assertIsNone(self.wheel.next_expiry())
+
+    def test_alarm_armed_for_next_expiry(self):
+        wheel = nfp_watchdog.TimerWheel()
+        with mock.patch.object(nfp_watchdog, 'wheel', wheel), \
+                mock.patch.object(nfp_watchdog.signal, 'setitimer') as itimer:
+            late = nfp_watchdog.alarm(600, mock.Mock())
+            itimer.assert_called_with(mock.ANY, 600)
+            early = nfp_watchdog.alarm(30, mock.Mock())
+            itimer.assert_called_with(mock.ANY, 30)
+            nfp_watchdog.alarm(60, mock.Mock())
+            itimer.assert_called_with(mock.ANY, 30)
+            nfp_watchdog.cancel(early)
+            itimer.assert_called_with(mock.ANY, 60)
+            nfp_watchdog.cancel(late)
+            itimer.assert_called_with(mock.ANY, 60)
+            # Not raised every second while timers are pending
+            self.now += 60
+            getattr(nfp_watchdog, '__alarm_handler')()
+            itimer.assert_called_with(mock.ANY, 0)
+        self.assertIsNone(wheel.armed)
+
+    def test_alarm_not_raised_while_wheel_changed(self):
+        wheel = nfp_watchdog.TimerWheel()
+        handler = getattr(nfp_watchdog, '__alarm_handler')
+        itimer = {'deadline': None}
+        changing = []
+
+        def setitimer(which, delay):
+            itimer['deadline'] = self.now + delay if delay else None
+
+        def deliver():
+            # Raise SIGALRM if the armed itimer is due
+            if (itimer['deadline'] is not None and
+                    itimer['deadline'] <= self.now):
+                itimer['deadline'] = None
+                handler()
+
+        def interrupted(method):
+            def change(*args):
+                changing.append(method)
+                try:
+                    # The alarm fires halfway through the change
+                    deliver()
+                    return method(*args)
+                finally:
+                    changing.pop()
+            return change
+
+        fired = mock.Mock(side_effect=lambda: self.assertEqual([], changing))
+        wheel.add = interrupted(wheel.add)
+        wheel.cancel = interrupted(wheel.cancel)
+        with mock.patch.object(nfp_watchdog, 'wheel', wheel), \
+                mock.patch.object(nfp_watchdog.signal, 'setitimer',
+                                  side_effect=setitimer):
+            nfp_watchdog.alarm(1, fired)
+            self.now += 1
+            other = nfp_watchdog.alarm(10, mock.Mock())
+            self.assertFalse(fired.called)
+            # Re-armed once the change is done
+            self.now += 0.01
+            deliver()
+            self.assertEqual(1, fired.call_count)
+            nfp_watchdog.alarm(1, fired)
+            self.now += 2
+            nfp_watchdog.cancel(other)
+            self.assertEqual(1, fired.call_count)
+            self.now += 0.01
+            deliver()
+            self.assertEqual(2, fired.call_count)
+        self.assertEqual(0, len(wheel))
+        self.assertIsNone(itimer['deadline'])
+
+    def test_watchdog_cancel(self):
+        callback = mock.Mock()
+        with mock.patch.object(nfp_watchdog.signal, 'setitimer'):
+            wd = nfp_watchdog.Watchdog(callback, seconds=1, event='e')
+            wd.cancel()
+            # Cancelling twice is ignored
+            wd.cancel()
+        self.assertEqual(0, len(nfp_watchdog.wheel))
+        callback.assert_not_called()
+
+    def test_benchmark_arm_cancel(self):
+        """Compare heap with remove & heapify against the wheel. """
+        heap = []
+        start = time.time()
+        entries = []
+        for i in range(0, TIMERS):
+            entry = (self.now + (i % 600), i)
+            heapq.heappush(heap, entry)
+            entries.append(entry)
+        # Cancel is O(n) per timer, run only a fraction
+        for entry in entries[:TIMERS // 100]:
+            heap.remove(entry)
+            heapq.heapify(heap)
+        before = (TIMERS // 100) / (time.time() - start)
+
+        start = time.time()
+        timers = [self._timer(i % 600) for i in range(0, TIMERS)]
+        for timer in timers:
+            self.wheel.add(timer)
+        for timer in timers:
+            self.wheel.cancel(timer)
+        after = TIMERS / (time.time() - start)
+
+        LOG.info("Timers armed & cancelled/s, heap: %d, wheel: %d",
+                 before, after)
+        self.assertEqual(0, len(self.wheel))
+        self.assertEqual([], self.wheel.expire(self.now + 600))
+
+
+if __name__ == '__main__':
+    unittest2.main()
@@ -0,0 +1,110 @@
+#  Licensed under the Apache License, Version 2.0 (the "License"); you may
+#  not use this file except in compliance with the License. You may obtain
+#  a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#  WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#  License for the specific language governing permissions and limitations
+#  under the License.
+
+from gbpservice.nfp.core import event as nfp_event
+from gbpservice.nfp.core import manager as nfp_manager
+import mock
+from oslo_log import log as oslo_logging
+import random
+import time
+import unittest2
+
+LOG = oslo_logging.getLogger(__name__)
+
+WORKERS = 32
+IN_FLIGHT = 20000
+
+
+class TestWorkerScheduler(unittest2.TestCase):
+
+    def _scheduler(self, loads):
+        scheduler = nfp_manager.WorkerScheduler()
+        for pid, load in enumerate(loads):
+            scheduler.add(pid, load=load)
+        return scheduler
+
+    def test_pick_least_loaded(self):
+        scheduler = self._scheduler([6, 4, 2])
+        self.assertEqual(2, scheduler.pick())
+        scheduler.update(2, 5)
+        self.assertEqual(1, scheduler.pick())
+
+    def test_pick_ties_in_add_order(self):
+        scheduler = self._scheduler([3, 1, 1])
+        self.assertEqual(1, scheduler.pick())
+        scheduler.update(1, 3)
+        scheduler.update(2, 3)
+        self.assertEqual(0, scheduler.pick())
+
+    def test_removed_worker_not_picked(self):
+        scheduler = self._scheduler([5, 0])
+        scheduler.remove(1)
+        self.assertEqual(0, scheduler.pick())
+        scheduler.remove(0)
+        self.assertIsNone(scheduler.pick())
+        # Updates of removed workers are ignored
+        scheduler.update(0, 0)
+        self.assertIsNone(scheduler.pick())
+
+    def test_heap_compacted(self):
+        scheduler = self._scheduler([0, 0])
+        for i in range(0, 1000):
+            scheduler.update(i % 2, i)
+        self.assertTrue(len(scheduler._heap) <= 2 * 2 + 33)
+        self.assertEqual(0, scheduler.pick())
+
+    def test_event_manager_load_drives_scheduler(self):
+        scheduler = nfp_manager.WorkerScheduler()
+        ems = []
+        for pid in range(0, 3):
+            scheduler.add(pid)
+            ems.append(nfp_event.NfpEventManager(
+                {}, mock.Mock(), None, pipe=mock.Mock(), pid=pid,
+                scheduler=scheduler))
+        events = []
+        for i in range(0, 3):
+            event = nfp_event.Event(id='EVENT_%d' % (i))
+            ems[scheduler.pick()].dispatch_event(event)
+            events.append(event)
+        self.assertEqual([1, 1, 1], [em.get_load() for em in ems])
+        ems[1].pop_event(events[1])
+        self.assertEqual(1, scheduler.pick())
+        self.assertEqual([], ems[1].get_pending_events())
+
+    def test_benchmark_dispatch(self):
+        """Compare min() over all workers against the scheduler. """
+        loads = [random.randint(0, IN_FLIGHT // WORKERS)
+                 for i in range(0, WORKERS)]
+
+        load_info = [[pid, load] for pid, load in enumerate(loads)]
+        start = time.time()
+        for i in range(0, IN_FLIGHT):
+            minloaded = min(load_info, key=lambda x: x[1])
+            minloaded[1] += 1
+        before = IN_FLIGHT / (time.time() - start)
+
+        scheduler = self._scheduler(loads)
+        current = list(loads)
+        start = time.time()
+        for i in range(0, IN_FLIGHT):
+            pid = scheduler.pick()
+            current[pid] += 1
+            scheduler.update(pid, current[pid])
+        after = IN_FLIGHT / (time.time() - start)
+
+        LOG.info("Dispatch decisions/s with %d workers, before: %d, "
+                 "after: %d", WORKERS, before, after)
+        self.assertEqual(sorted(x[1] for x in load_info), sorted(current))
+
+
+if __name__ == '__main__':
+    unittest2.main()
@@ -0,0 +1,123 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import threading
+import time
+
+from gbpservice.nfp.lib import nfp_context_manager as nfp_ctx_mgr
+import mock
+from oslo_log import log as oslo_logging
+import unittest2
+
+LOG = oslo_logging.getLogger(__name__)
+
+CHAINS = 8
+UPDATES = 5
+UPDATE_TIME = 0.01
+
+
+class FakeSession(object):
+
+    def __init__(self, dialect='sqlite'):
+        self.bind = mock.Mock()
+        self.bind.dialect.name = dialect
+        self.execute = mock.Mock()
+
+    @contextlib.contextmanager
+    def begin(self, subtransactions=False):
+        yield
+
+
+class TestDbLock(unittest2.TestCase):
+
+    def setUp(self):
+        super(TestDbLock, self).setUp()
+        self.dcm = nfp_ctx_mgr.NfpDbContextManager()
+        self.dcm.lock_manager = nfp_ctx_mgr.DbLockManager()
+        self.session = FakeSession()
+
+    def _update(self, session, nf_id, updates):
+        time.sleep(UPDATE_TIME)
+        return updates
+
+    def _run_chains(self, keys):
+        def _chain(key):
+            for i in range(0, UPDATES):
+                self.dcm.lock(self.session, self._update, key, {})
+
+        threads = [threading.Thread(target=_chain, args=(key,))
+                   for key in keys]
+        start = time.time()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.time() - start
+
+    def test_lock_keyed_on_resource_id(self):
+        method = mock.Mock(return_value='nf')
+        with mock.patch.object(self.dcm.lock_manager, 'lock',
+                               wraps=self.dcm.lock_manager.lock) as lock:
+            self.assertEqual('nf', self.dcm.lock(
+                self.session, method, 'nf-id', {'status': 'ACTIVE'}))
+            lock.assert_called_once_with(self.session, 'nf-id')
+            self.dcm.lock(self.session, method, 'nf-id', {},
+                          lock_key='nfi-id')
+            lock.assert_called_with(self.session, 'nfi-id')
+            self.dcm.lock(self.session, method)
+            lock.assert_called_with(self.session,
+                                    nfp_ctx_mgr.GLOBAL_LOCK_KEY)
+        method.assert_called_with(self.session)
+        self.assertEqual(0, len(self.dcm.lock_manager._table))
+
+    def test_mysql_named_lock_per_key(self):
+        session = FakeSession(dialect='mysql')
+        method = mock.Mock(side_effect=ValueError)
+        self.assertRaises(ValueError, self.dcm.lock, session, method,
+                          'nf-id', {})
+        session.execute.assert_has_calls([
+            mock.call("SELECT GET_LOCK(:name, -1)", {'name': 'nfp_nf-id'}),
+            mock.call("SELECT RELEASE_LOCK(:name)", {'name': 'nfp_nf-id'})])
+        self.assertEqual(
+            nfp_ctx_mgr.MAX_LOCK_NAME_LEN,
+            len(nfp_ctx_mgr.DbLockManager.lock_name('x' * 100)))
+
+    def test_same_key_serialized(self):
+        holders = []
+        overlaps = []
+
+        def _update(session, nf_id, updates):
+            holders.append(nf_id)
+            if len(holders) > 1:
+                overlaps.append(nf_id)
+            time.sleep(UPDATE_TIME)
+            holders.remove(nf_id)
+
+        threads = [threading.Thread(
+            target=self.dcm.lock, args=(self.session, _update, 'nf-id', {}))
+            for i in range(0, 4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], overlaps)
+
+    def test_contention_independent_chains(self):
+        serial = self._run_chains(['nf-id'] * CHAINS)
+        parallel = self._run_chains(['nf-%d' % i for i in range(CHAINS)])
+        LOG.info("%(chains)d chains x %(updates)d updates, one key: "
+                 "%(serial).3fs, key per chain: %(parallel).3fs",
+                 {'chains': CHAINS, 'updates': UPDATES,
+                  'serial': serial, 'parallel': parallel})
+        self.assertGreaterEqual(serial, CHAINS * UPDATES * UPDATE_TIME)
+        self.assertLess(parallel, serial / 2)
@@ -11,6 +11,7 @@
 #    under the License.
 
 from gbpservice.nfp.lib import transport
+from gbpservice.nfp.pecan import constants as pecan_constants
 import mock
 from neutron.common import rpc as n_rpc
 from neutron import context as ctx
@@ -176,5 +177,28 @@ class CommonLibraryTest(unittest2.TestCase):
 
             transport.get_response_from_configurator(conf)
 
+    def test_get_response_from_configurator_wait(self):
+        headers = {pecan_constants.NOTIFICATION_WAIT_HEADER: '5'}
+        with mock.patch.object(transport.RestApi, 'get') as (
+            mock_get), mock.patch.object(jsonutils, 'loads') as (
+            mock_loads):
+            mock_loads.return_value = []
+            conf = Map(backend='tcp_rest', RPC=Map(topic='topic'),
+                       REST=Map(rest_server_ip='0.0.0.0',
+                                rest_server_port=5672))
+            transport.get_response_from_configurator(conf, wait=5)
+            mock_get.assert_called_once_with('get_notifications',
+                                             headers=headers)
+
+        with mock.patch(self.imprt_rc + '.get') as (
+            mock_get), mock.patch.object(jsonutils, 'loads') as (
+            mock_loads):
+            mock_get.return_value = (200, "")
+            mock_loads.return_value = []
+            conf = Map(backend='unix_rest')
+            transport.get_response_from_configurator(conf, wait=5)
+            mock_get.assert_called_once_with('get_notifications',
+                                             headers=headers)
+
 if __name__ == '__main__':
     unittest2.main()
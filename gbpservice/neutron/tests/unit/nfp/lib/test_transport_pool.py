@@ -0,0 +1,125 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+
+from gbpservice.nfp.lib import rest_client_over_unix as unix_rc
+from gbpservice.nfp.lib import transport
+import mock
+from oslo_log import log as oslo_logging
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
+import unittest2
+
+LOG = oslo_logging.getLogger(__name__)
+
+REQUESTS = 200
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    body = b'[]'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixStubHandler(StubHandler):
+
+    body = zlib.compress(b'[]')
+
+    def address_string(self):
+        return 'unix'
+
+
+class UnixStubServer(socketserver.ThreadingMixIn,
+                     socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+
+class TCPStubServer(socketserver.ThreadingMixIn,
+                   BaseHTTPServer.HTTPServer):
+
+    daemon_threads = True
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+
+class TestConnectionPool(unittest2.TestCase):
+
+    def _log_rate(self, transport_type, duration, connections):
+        LOG.info("%(transport)s: %(requests)d requests over %(conns)d "
+                 "connection(s), %(rate).0f requests/s",
+                 {'transport': transport_type, 'requests': REQUESTS,
+                  'conns': connections, 'rate': REQUESTS / duration})
+
+    def test_tcp_rest_reuses_connection(self):
+        server = TCPStubServer(('127.0.0.1', 0), StubHandler)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        _serve(server)
+        port = server.server_address[1]
+        endpoint = '127.0.0.1:%s' % port
+
+        start = time.time()
+        for i in range(0, REQUESTS):
+            rest_api = transport.RestApi('127.0.0.1', port)
+            resp = rest_api.get('get_notifications')
+            self.assertEqual([], resp.json())
+        duration = time.time() - start
+
+        stats = transport.get_pool_stats()[endpoint]
+        self.assertEqual(REQUESTS, stats['requests'])
+        self.assertEqual(1, stats['connections'])
+        self._log_rate('tcp_rest', duration, stats['connections'])
+
+    def test_unix_rest_reuses_connection(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'uds_socket')
+        server = UnixStubServer(path, UnixStubHandler)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        _serve(server)
+        self.addCleanup(setattr, unix_rc, '_pool', None)
+        unix_rc._pool = None
+        unix_rc.pool_stats.update({'requests': 0, 'connections': 0})
+
+        with mock.patch.object(unix_rc.UnixHTTPConnection,
+                               'socket_path', path):
+            start = time.time()
+            for i in range(0, REQUESTS):
+                resp, content = unix_rc.get('nfp/get_notifications')
+                self.assertEqual(b'[]', content)
+            duration = time.time() - start
+
+        self.assertEqual(REQUESTS, unix_rc.pool_stats['requests'])
+        self.assertEqual(1, unix_rc.pool_stats['connections'])
+        self._log_rate('unix_rest', duration,
+                       unix_rc.pool_stats['connections'])
@@ -78,6 +78,31 @@ class NSOModuleTestCase(test_nfp_db.NFPDBTestCase):
                 nso.ServiceOrchestrator(controller, cfg.CONF))
             controller.register_events.assert_called_once_with(mock.ANY)
 
+    @mock.patch.object(nso, 'NodeDriverNotifierApi')
+    def test_node_driver_notified_after_commit(self, mock_notifier):
+        notifier = mock_notifier.return_value
+        db_patch = nso.NFPDbPatch(mock.Mock())
+        network_function = self.create_network_function()
+        with self.session.begin(subtransactions=True):
+            db_patch.update_network_function(
+                self.session, network_function['id'], {'status': 'ACTIVE'})
+            self.assertFalse(notifier.network_function_status_changed.called)
+        notifier.network_function_status_changed.assert_called_once_with(
+            network_function['id'], 'ACTIVE')
+
+        # Rolled back changes are not notified
+        def delete_and_fail():
+            with self.session.begin(subtransactions=True):
+                db_patch.delete_network_function(
+                    self.session, network_function['id'])
+                raise ValueError()
+        self.assertRaises(ValueError, delete_and_fail)
+        db_patch.update_network_function(
+            self.session, network_function['id'], {'status': 'ERROR'})
+        self.assertFalse(notifier.network_function_deleted.called)
+        notifier.network_function_status_changed.assert_called_with(
+            network_function['id'], 'ERROR')
+
 
 class NSORpcHandlerTestCase(NSOModuleTestCase):
 
@@ -102,6 +102,7 @@ class TestHeatDriver(unittest2.TestCase):
         #                      group='heat_driver')
         mock.patch(heat_client.__name__ + ".HeatClient",
                    new=MockHeatClient).start()
+        heat_client.stack_tracker.clear()
 
     @mock.patch.object(v2, "Password")
     @mock.patch.object(session.Session, "get_token")
@@ -223,16 +224,45 @@ class TestHeatDriver(unittest2.TestCase):
         result = self.heat_driver_obj._is_service_target(policy_target)
         self.assertEqual(result, expected_result)
 
-    @mock.patch.object(neutron_client.Client, "show_port")
+    @mock.patch.object(neutron_client.Client, "list_ports")
     @mock.patch.object(gbp_client.Client, "list_policy_targets")
-    def test_get_member_ips(self, list_pt_mock_obj, show_port_mock_obj):
+    def test_get_member_ips(self, list_pt_mock_obj, list_ports_mock_obj):
         list_pt_mock_obj.return_value = self.mock_dict.policy_targets
-        show_port_mock_obj.return_value = self.mock_dict.port_info
+        list_ports_mock_obj.return_value = {
+            'ports': [self.mock_dict.port_info['port']]}
         auth_token = "81273djs138"
         expected_member_ips = ['42.0.0.13']
         member_ips = self.heat_driver_obj._get_member_ips(
             auth_token, self.mock_dict.provider_ptg)
         self.assertEqual(member_ips, expected_member_ips)
+        list_ports_mock_obj.assert_called_once_with(
+            id=['dde7d849-4c7c-4b48-8c21-f3f52c646fbe'])
+
+    @mock.patch.object(neutron_client.Client, "list_ports")
+    @mock.patch.object(gbp_client.Client, "list_policy_targets")
+    def test_get_member_ips_bulk(self, list_pt_mock_obj,
+                                 list_ports_mock_obj):
+        members = 250
+        policy_targets = [{'name': 'pt%d' % i, 'port_id': 'port%d' % i}
+                          for i in range(members)]
+        policy_targets.append({'name': 'service_target_vip',
+                               'port_id': 'vip_port'})
+        list_pt_mock_obj.return_value = {'policy_targets': policy_targets}
+
+        def list_ports(id):
+            # Returned in another order than requested
+            return {'ports': [
+                {'id': port_id,
+                 'fixed_ips': [{'ip_address': port_id.replace('port', '')}]}
+                for port_id in reversed(id)]}
+
+        list_ports_mock_obj.side_effect = list_ports
+        member_ips = self.heat_driver_obj._get_member_ips(
+            "81273djs138", {'policy_targets': ['pt_ids']})
+        self.assertEqual([str(i) for i in range(members)], member_ips)
+        self.assertEqual(1, list_pt_mock_obj.call_count)
+        # One request per chunk of ports, none for the service target
+        self.assertEqual(3, list_ports_mock_obj.call_count)
 
     def test_modify_fw_resources_name(self):
         is_template_aws_version = False
@@ -295,12 +325,14 @@ class TestHeatDriver(unittest2.TestCase):
         self.heat_driver_obj.delete_config(stack_id, '1627')
         heat_delete_mock_obj.assert_called_once_with(stack_id)
 
+    @mock.patch.object(heat_client.HeatClient, 'list',
+                       return_value=[])
     @mock.patch.object(heat_client.HeatClient, 'get')
     @mock.patch.object(identity_client, "Client")
     @mock.patch.object(v2, "Password")
     @mock.patch.object(session.Session, "get_token")
     def test_is_config_complete(self, mock_session, mock_v2, mock_obj,
-            heat_get_mock_obj):
+            heat_get_mock_obj, heat_list_mock_obj):
         mock_session.return_value = True
         keystone_client = mock_obj.return_value
         keystone_client.tenants.find().id = '8ae6701128994ab281dde6b92207bb19'
@@ -319,10 +351,13 @@ class TestHeatDriver(unittest2.TestCase):
             stack_id, tenant_id, self.mock_dict.network_function_details)
         self.assertEqual(status, expected_status)
 
+    @mock.patch.object(heat_client.HeatClient, 'list',
+                       return_value=[])
     @mock.patch.object(heat_client.HeatClient, 'get')
     @mock.patch.object(identity_client, "Client")
     def test_is_config_delete_complete(self, identity_mock_obj,
-                                       heat_get_mock_obj):
+                                       heat_get_mock_obj,
+                                       heat_list_mock_obj):
         stack_id = '70754fdd-0325-4856-8a39-f171b65617d6'
         tenant_id = '8ae6701128994ab281dde6b92207bb19'
         self.heat_driver_obj._assign_admin_user_to_project = mock.Mock(
@@ -383,6 +418,11 @@ class TestHeatDriver(unittest2.TestCase):
 
     def test_update_firewall_template(self):
         self.mock_objects()
+        consumer_subnet = copy.deepcopy(self.mock_dict.subnet_info['subnet'])
+        consumer_subnet['id'] = self.mock_dict.policy_target_groups[
+            'policy_target_groups'][0]['subnets'][0]
+        self.heat_driver_obj.neutron_client.get_subnets.side_effect = [
+            self.mock_dict.subnets_info['subnets'], [consumer_subnet]]
         stack_template = copy.deepcopy(self.mock_dict.DEFAULT_FW_CONFIG)
         auth_token = 'adakjiq'
         stack_template = self.heat_driver_obj._update_firewall_template(
@@ -391,6 +431,7 @@ class TestHeatDriver(unittest2.TestCase):
         self.assertEqual(
             stack_template['resources']['sc_firewall_policy'],
             copy.deepcopy(self.mock_dict.updated_template_sc_firewall_policy))
+        self.assertFalse(self.heat_driver_obj.neutron_client.get_subnet.called)
 
     @mock.patch.object(neutron_client.Client, "list_networks")
     def test_create_node_config_data_vpn(self, mock_list_networks):
@@ -607,3 +648,93 @@ class TestHeatDriver(unittest2.TestCase):
         stack_id = self.heat_driver_obj.apply_config(
             self.mock_dict.network_function_details)
         self.assertIsNotNone(stack_id)
+
+
+class FakeStack(object):
+
+    def __init__(self, stack_id, status):
+        self.id = stack_id
+        self.stack_status = status
+
+
+class FakeHeatClient(object):
+
+    def __init__(self, tenant, stack_ids):
+        self.tenant = tenant
+        self.statuses = dict((stack_id, 'CREATE_IN_PROGRESS')
+                             for stack_id in stack_ids)
+        self.list_calls = 0
+        self.get_calls = 0
+
+    def list(self):
+        self.list_calls += 1
+        return [FakeStack(stack_id, status)
+                for stack_id, status in self.statuses.items()]
+
+    def get(self, stack_id):
+        self.get_calls += 1
+        if stack_id not in self.statuses:
+            raise heat_client.heat_exc.HTTPNotFound()
+        return FakeStack(stack_id, self.statuses[stack_id])
+
+
+class TestStackStatusTracker(unittest2.TestCase):
+
+    TENANTS = 3
+    STACKS_PER_TENANT = 20
+
+    def setUp(self):
+        self.tracker = heat_client.StackStatusTracker(refresh_interval=5)
+        self.clients = [
+            FakeHeatClient('tenant-%d' % i,
+                           ['stack-%d-%d' % (i, j)
+                            for j in range(0, self.STACKS_PER_TENANT)])
+            for i in range(0, self.TENANTS)]
+        self.time = mock.patch.object(heat_client.time, 'time',
+                                      return_value=0).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _poll_all(self):
+        return set(self.tracker.get(client, stack_id).stack_status
+                   for client in self.clients
+                   for stack_id in client.statuses)
+
+    def _complete_all(self):
+        for client in self.clients:
+            for stack_id in client.statuses:
+                client.statuses[stack_id] = 'CREATE_COMPLETE'
+
+    def test_one_listing_per_tenant_per_interval(self):
+        self.assertEqual(set(['CREATE_IN_PROGRESS']), self._poll_all())
+        self._complete_all()
+        self.time.return_value = 1
+        self.assertEqual(set(['CREATE_IN_PROGRESS']), self._poll_all())
+        self.time.return_value = 5
+        self.assertEqual(set(['CREATE_COMPLETE']), self._poll_all())
+        for client in self.clients:
+            self.assertEqual(2, client.list_calls)
+            self.assertEqual(0, client.get_calls)
+        self.assertEqual(2 * self.TENANTS, self.tracker.list_calls)
+
+    def test_unlisted_stack_fetched(self):
+        client = self.clients[0]
+        self.tracker.get(client, 'stack-0-0')
+        client.statuses['new-stack'] = 'CREATE_IN_PROGRESS'
+        self.assertEqual('CREATE_IN_PROGRESS', self.tracker.get(
+            client, 'new-stack').stack_status)
+        self.assertRaises(heat_client.heat_exc.HTTPNotFound,
+                          self.tracker.get, client, 'deleted-stack')
+        self.assertEqual(1, client.list_calls)
+        self.assertEqual(2, client.get_calls)
+
+    def test_forget(self):
+        client = self.clients[0]
+        self.tracker.get(client, 'stack-0-0')
+        client.statuses['stack-0-0'] = 'UPDATE_IN_PROGRESS'
+        self.tracker.forget(client.tenant, 'stack-0-0')
+        self.assertEqual('UPDATE_IN_PROGRESS', self.tracker.get(
+            client, 'stack-0-0').stack_status)
+        self.assertEqual('CREATE_IN_PROGRESS', self.tracker.get(
+            client, 'stack-0-1').stack_status)
+        self.assertEqual(1, client.list_calls)
+        self.tracker.forget('unknown-tenant', 'stack-0-0')
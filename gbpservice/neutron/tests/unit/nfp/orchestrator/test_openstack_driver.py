@@ -12,6 +12,7 @@
 
 import mock
 from oslo_config import cfg
+import time
 import unittest2
 
 from gbpclient.v2_0 import client as gbp_client
@@ -19,6 +20,7 @@ from gbpservice.nfp.orchestrator.openstack import openstack_driver
 from keystoneauth1.identity import v2
 from keystoneauth1 import session
 from keystoneclient.v2_0 import client as identity_client
+from neutronclient.common import exceptions as neutron_exc
 from neutronclient.v2_0 import client as neutron_client
 from novaclient import client as nova_client
 
@@ -64,6 +66,7 @@ class TestKeystoneClient(SampleData):
         cfg.CONF.set_override('auth_version',
                               'None',
                               group='nfp_keystone_authtoken')
+        openstack_driver.token_cache.clear()
 
     @mock.patch.object(v2, "Password")
     @mock.patch.object(session.Session, "get_token")
@@ -90,6 +93,42 @@ class TestKeystoneClient(SampleData):
                                         tenant_name=self.TENANT_NAME,
                                         username=self.USERNAME)
 
+    @mock.patch.object(v2, "Password")
+    @mock.patch.object(session.Session, "get_token")
+    def test_get_scoped_keystone_token_cached(self, mock_session, mock_v2,
+                                              mock_obj):
+        mock_session.return_value = self.AUTH_TOKEN
+        stats = openstack_driver.token_cache.stats()
+        for i in range(0, 3):
+            retval = self.keystone_obj.get_scoped_keystone_token(
+                self.USERNAME, self.PASSWORD, self.TENANT_NAME)
+            self.assertEqual(self.AUTH_TOKEN, retval)
+        mock_session.assert_called_once_with(auth=mock_v2.return_value)
+        self.assertEqual(stats['hits'] + 2,
+                         openstack_driver.token_cache.hits)
+        # Other project, other token
+        self.keystone_obj.get_scoped_keystone_token(
+            self.USERNAME, self.PASSWORD, 'service')
+        self.assertEqual(2, mock_session.call_count)
+
+    @mock.patch.object(v2, "Password")
+    @mock.patch.object(session.Session, "get_token")
+    def test_get_scoped_keystone_token_refreshed(self, mock_session,
+                                                 mock_v2, mock_obj):
+        mock_session.side_effect = ['token1', 'token2']
+        with mock.patch.object(openstack_driver.KeystoneClient,
+                               '_token_expiry') as expiry:
+            # Within the refresh margin of its expiry
+            expiry.return_value = time.time() + 30
+            self.assertEqual('token1',
+                             self.keystone_obj.get_scoped_keystone_token(
+                                 self.USERNAME, self.PASSWORD,
+                                 self.TENANT_NAME))
+            self.assertEqual('token2',
+                             self.keystone_obj.get_scoped_keystone_token(
+                                 self.USERNAME, self.PASSWORD,
+                                 self.TENANT_NAME))
+
     @mock.patch.object(v2, "Password")
     @mock.patch.object(session.Session, "get_token")
     def test_get_tenant_id(self, mock_session, mock_v2, mock_obj):
@@ -397,6 +436,28 @@ class TestNeutronClient(SampleData):
         mock_obj.assert_called_once_with(token=self.AUTH_TOKEN,
                                          endpoint_url=self.ENDPOINT_URL)
 
+    def test_rejected_token_dropped_from_cache(self, mock_obj):
+        token_cache = openstack_driver.token_cache
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        key = (self.AUTH_URL, self.USERNAME, self.PASSWORD, self.TENANT_NAME)
+        expires_at = time.time() + 3600
+        token_cache.get(key, lambda: (self.AUTH_TOKEN, expires_at))
+        instance = mock_obj.return_value
+        instance.show_port.side_effect = ValueError()
+        self.assertRaises(Exception, self.neutron_obj.get_port,
+                          self.AUTH_TOKEN, self.PORT_ID)
+        # Other errors keep the token
+        self.assertEqual(self.AUTH_TOKEN,
+                         token_cache.get(key, mock.Mock()))
+
+        instance.show_port.side_effect = neutron_exc.Unauthorized()
+        self.assertRaises(Exception, self.neutron_obj.get_port,
+                          self.AUTH_TOKEN, self.PORT_ID)
+        fetch = mock.Mock(return_value=('new_token', expires_at))
+        self.assertEqual('new_token', token_cache.get(key, fetch))
+        fetch.assert_called_once_with()
+
 
 @mock.patch.object(gbp_client, "Client")
 class TestGBPClient(SampleData):
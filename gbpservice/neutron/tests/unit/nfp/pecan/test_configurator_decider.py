@@ -0,0 +1,62 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import threading
+
+from gbpservice.nfp.pecan.api import configurator_decider
+from six.moves import http_client
+import unittest2
+from wsgiref import simple_server
+
+
+class KeepAliveWSGIRequestHandlerTestCase(unittest2.TestCase):
+
+    def setUp(self):
+        super(KeepAliveWSGIRequestHandlerTestCase, self).setUp()
+        self.requests = []
+        server = simple_server.make_server(
+            '127.0.0.1', 0, self._app,
+            server_class=configurator_decider.ThreadingWSGIServer,
+            handler_class=configurator_decider.KeepAliveWSGIRequestHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.conn = http_client.HTTPConnection(*server.server_address)
+        self.addCleanup(self.conn.close)
+
+    def _app(self, environ, start_response):
+        self.requests.append(environ['PATH_INFO'])
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        if environ['PATH_INFO'] == '/stream':
+            return iter([b'a', b'b'])
+        return [environ['PATH_INFO'].encode('utf-8')]
+
+    def _get(self, path, method='GET', body=None):
+        self.conn.request(method, path, body=body)
+        return self.conn.getresponse().read()
+
+    def test_connection_reused(self):
+        self.assertEqual(b'/one', self._get('/one'))
+        sock = self.conn.sock
+        self.assertIsNotNone(sock)
+        # The unread body does not leak into the next request
+        self.assertEqual(b'/two', self._get('/two', 'POST', b'{"a": 1}'))
+        self.assertEqual(b'/three', self._get('/three'))
+        self.assertIs(sock, self.conn.sock)
+        self.assertEqual(['/one', '/two', '/three'], self.requests)
+
+    def test_connection_closed_without_length(self):
+        self.assertEqual(b'ab', self._get('/stream'))
+        self.assertIsNone(self.conn.sock)
+        self.assertEqual(b'/one', self._get('/one'))
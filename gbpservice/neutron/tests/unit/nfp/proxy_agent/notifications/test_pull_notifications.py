@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from gbpservice.nfp.common import constants as nfp_constants
+from gbpservice.nfp.proxy_agent.lib import topics as a_topics
 from gbpservice.nfp.proxy_agent.notifications import pull
 import mock
 from neutron import context as ctx
@@ -55,15 +57,15 @@ class PullNotificationTestCase(unittest2.TestCase):
     def _cast(self, context, method, **kwargs):
         return
 
-    def _resp_data_nso(self, conf):
+    def _resp_data_nso(self, conf, wait=0):
         response_data = self._resp_base_structure('service_orch')
         return response_data
 
-    def _resp_data_ndo(self, conf):
+    def _resp_data_ndo(self, conf, wait=0):
         response_data = self._resp_base_structure('device_orch')
         return response_data
 
-    def _resp_data_nco(self, conf):
+    def _resp_data_nco(self, conf, wait=0):
         response_data = self._resp_base_structure('nas_service')
         return response_data
 
@@ -93,3 +95,43 @@ class PullNotificationTestCase(unittest2.TestCase):
             mock_get.side_effect = self._resp_data_ndo
             mock_cast.side_effect = self._cast
             self.p_notification.pull_notifications(self.ev)
+
+    def test_pull_notifications_long_poll(self):
+        import_get = self.import_lib + '.get_response_from_configurator'
+        with mock.patch(import_get) as (
+            mock_get), mock.patch(self.import_cast) as (
+            mock_cast), mock.patch('time.sleep') as mock_sleep:
+            mock_get.return_value = (self._resp_data_nso('conf') +
+                                     self._resp_data_nso('conf'))
+            mock_cast.side_effect = self._cast
+            with mock.patch.object(pull.transport, 'RPCClient',
+                                   wraps=pull.transport.RPCClient) as rpc:
+                self.p_notification.pull_notifications(self.ev)
+                self.p_notification.pull_notifications(self.ev)
+            # One rpc client per topic, reused across notifications
+            rpc.assert_called_once_with(a_topics.SERVICE_ORCH_TOPIC)
+            self.assertEqual(4, mock_cast.call_count)
+            mock_get.assert_called_with(
+                'conf', wait=nfp_constants.PULL_NOTIFICATIONS_WAIT)
+            self.assertFalse(mock_sleep.called)
+
+    def test_pull_notifications_no_long_poll(self):
+        import_get = self.import_lib + '.get_response_from_configurator'
+        with mock.patch(import_get) as (
+            mock_get), mock.patch('time.sleep') as (
+            mock_sleep), mock.patch.object(pull.time, 'time') as mock_time:
+            # Configurator answering right away, without notifications
+            mock_get.return_value = []
+            mock_time.return_value = 100
+            self.p_notification.pull_notifications(self.ev)
+            self.assertEqual(1, mock_get.call_count)
+            # Polls within the poll interval do not pull
+            mock_time.return_value = (
+                100 + nfp_constants.PULL_NOTIFICATIONS_SPACING - 1)
+            self.p_notification.pull_notifications(self.ev)
+            self.assertEqual(1, mock_get.call_count)
+            mock_time.return_value = (
+                100 + nfp_constants.PULL_NOTIFICATIONS_SPACING)
+            self.p_notification.pull_notifications(self.ev)
+            self.assertEqual(2, mock_get.call_count)
+            self.assertFalse(mock_sleep.called)
@@ -0,0 +1,118 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from gbpservice.nfp.proxy_agent.proxy import proxy
+import eventlet
+from oslo_log import log as oslo_logging
+import socket
+import time
+import unittest2
+
+LOG = oslo_logging.getLogger(__name__)
+
+REQUEST_SIZE = 4 * 1024
+RESPONSE_SIZE = 1024 * 1024
+ROUND_TRIPS = 20
+
+
+class Conf(object):
+
+    def __init__(self, idle_min_wait_timeout=10, idle_max_wait_timeout=10):
+        self.idle_min_wait_timeout = idle_min_wait_timeout
+        self.idle_max_wait_timeout = idle_max_wait_timeout
+        self.buffer_size = 65536
+
+
+def _recv_all(sock):
+    data = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b''.join(data)
+        data.append(chunk)
+
+
+def _server(sock, request_size, response):
+    received = 0
+    while received < request_size:
+        received += len(sock.recv(65536))
+    sock.sendall(response)
+    sock.close()
+
+
+def _pump(pc):
+    while pc.run():
+        pass
+
+
+class TestProxyConnection(unittest2.TestCase):
+
+    def _round_trip(self, conf, request, response):
+        client, unix_end = socket.socketpair()
+        tcp_end, server = socket.socketpair()
+        closed = []
+        pc = proxy.ProxyConnection(conf, unix_end, tcp_end,
+                                   on_close=closed.append)
+        relay = eventlet.spawn(_pump, pc)
+        server_thread = eventlet.spawn(_server, server, len(request),
+                                       response)
+        client.sendall(request)
+        client.shutdown(socket.SHUT_WR)
+        data = _recv_all(client)
+        client.close()
+        server_thread.wait()
+        relay.wait()
+        self.assertEqual([pc], closed)
+        return pc, data
+
+    def test_relay_both_directions(self):
+        conf = Conf()
+        start = time.time()
+        pc, data = self._round_trip(conf, b'q' * REQUEST_SIZE,
+                                    b'r' * RESPONSE_SIZE)
+        self.assertEqual(b'r' * RESPONSE_SIZE, data)
+        self.assertEqual(REQUEST_SIZE, pc.stats.bytes['unix'])
+        self.assertEqual(RESPONSE_SIZE, pc.stats.bytes['tcp'])
+        self.assertIsNotNone(pc.stats.latency)
+        # No idle wait on the data path
+        self.assertLess(time.time() - start, conf.idle_min_wait_timeout)
+
+    def test_idle_connection_closed(self):
+        conf = Conf(idle_min_wait_timeout=0.01, idle_max_wait_timeout=0.03)
+        client, unix_end = socket.socketpair()
+        tcp_end, server = socket.socketpair()
+        closed = []
+        pc = proxy.ProxyConnection(conf, unix_end, tcp_end,
+                                   on_close=closed.append)
+        _pump(pc)
+        self.assertEqual([pc], closed)
+        self.assertEqual(b'', client.recv(1))
+        pc.close()
+        self.assertEqual([pc], closed)
+
+    def test_loopback_benchmark(self):
+        conf = Conf()
+        request = b'q' * REQUEST_SIZE
+        response = b'r' * RESPONSE_SIZE
+        latencies = []
+        start = time.time()
+        for i in range(ROUND_TRIPS):
+            pc, data = self._round_trip(conf, request, response)
+            self.assertEqual(RESPONSE_SIZE, len(data))
+            latencies.append(pc.stats.latency)
+        duration = time.time() - start
+        total = ROUND_TRIPS * (REQUEST_SIZE + RESPONSE_SIZE)
+        LOG.info("%(trips)d round trips, %(rate).0f bytes/s, "
+                 "max latency %(latency).4fs",
+                 {'trips': ROUND_TRIPS, 'rate': total / duration,
+                  'latency': max(latencies)})
+        self.assertLess(max(latencies), conf.idle_min_wait_timeout)
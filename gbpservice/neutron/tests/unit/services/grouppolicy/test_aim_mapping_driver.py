@@ -14,6 +14,7 @@
 from gbpservice.neutron.plugins.ml2plus import patch_neutron  # noqa
 
 import copy
+import eventlet
 import hashlib
 import mock
 import netaddr
@@ -36,11 +37,14 @@ from neutron_lib import constants as n_constants
 from neutron_lib.plugins import directory
 from opflexagent import constants as ocst
 from oslo_config import cfg
+import unittest2
 import webob.exc
 
 from gbpservice.network.neutronv2 import local_api
 from gbpservice.neutron.db.grouppolicy import group_policy_mapping_db  # noqa
 from gbpservice.neutron.extensions import cisco_apic
+from gbpservice.neutron.plugins.ml2plus.drivers.apic_aim import (
+    cache as aim_cache)
 from gbpservice.neutron.plugins.ml2plus.drivers.apic_aim import (
     mechanism_driver as md)
 from gbpservice.neutron.services.grouppolicy.common import (
@@ -49,8 +53,12 @@ from gbpservice.neutron.services.grouppolicy.common import utils
 from gbpservice.neutron.services.grouppolicy import config
 from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
     aim_mapping as aimd)
+from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
+    aim_mapping_rpc)
 from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
     apic_mapping_lib as alib)
+from gbpservice.neutron.services.grouppolicy.drivers.cisco.apic import (
+    nova_client as nclient)
 from gbpservice.neutron.services.grouppolicy.drivers import nsp_manager
 from gbpservice.neutron.tests.unit.plugins.ml2plus import (
     test_apic_aim as test_aim_md)
@@ -163,6 +171,10 @@ class AIMBaseTestCase(test_nr_base.CommonNeutronBaseTestCase,
         vm = mock.Mock()
         vm.name = 'someid'
         nova_client.return_value = vm
+        mock.patch(
+            'gbpservice.neutron.services.grouppolicy.drivers.cisco.'
+            'apic.nova_client.NovaClient.get_servers',
+            return_value=[]).start()
 
         self.extension_attributes = ('router:external', DN,
                                      'apic:nat_type', 'apic:snat_host_pool',
@@ -3100,6 +3112,195 @@ class TestPolicyTarget(AIMBaseTestCase):
                                       monitored=True))
         self._do_test_get_gbp_details(pre_vrf=vrf)
 
+    def test_get_gbp_details_list(self):
+        ptg = self.create_policy_target_group(
+            name="ptg1")['policy_target_group']
+        devices = []
+        for i in range(0, 3):
+            pt = self.create_policy_target(
+                policy_target_group_id=ptg['id'])['policy_target']
+            self._bind_port_to_host(pt['port_id'], 'h1')
+            devices.append('tap%s' % pt['port_id'])
+        expected = [self.driver.get_gbp_details(
+            self._neutron_admin_context, device=device, host='h1')
+            for device in devices]
+        devices.append('tapnotthere')
+        expected.append({'device': 'tapnotthere'})
+        # Start from an empty VRF subnets cache
+        self.driver.aim_mech_driver.vrf_subnets_cache.invalidate()
+        callback = aim_mapping_rpc.AIMMappingRpcCallback(
+            self.driver, mock.Mock())
+
+        with mock.patch.object(
+                self.driver, '_query_vrf_subnets',
+                wraps=self.driver._query_vrf_subnets) as vrf_subnets:
+            with mock.patch.object(
+                    self.driver, '_get_aim_endpoint_group',
+                    wraps=self.driver._get_aim_endpoint_group) as epg:
+                with mock.patch.object(
+                        self.driver, 'get_gbp_details') as get_gbp_details:
+                    details = callback.get_gbp_details_list(
+                        self._neutron_admin_context, devices=devices,
+                        host='h1')
+                    # Not answered one device at a time
+                    self.assertFalse(get_gbp_details.called)
+                # Shared data is computed once per batch
+                self.assertEqual(1, vrf_subnets.call_count)
+                self.assertEqual(1, epg.call_count)
+        self.assertEqual(expected, details)
+        self.assertEqual([], callback.get_gbp_details_list(
+            self._neutron_admin_context, devices=[], host='h1'))
+
+    def test_get_gbp_details_vrf_subnets_cached(self):
+        vrf_subnets_cache = self.driver.aim_mech_driver.vrf_subnets_cache
+        ptg = self.create_policy_target_group(
+            name="ptg1")['policy_target_group']
+        pt = self.create_policy_target(
+            policy_target_group_id=ptg['id'])['policy_target']
+        self._bind_port_to_host(pt['port_id'], 'h1')
+        device = 'tap%s' % pt['port_id']
+
+        with mock.patch.object(
+                self.driver, '_query_vrf_subnets',
+                wraps=self.driver._query_vrf_subnets) as vrf_subnets:
+            stats = vrf_subnets_cache.stats()
+            vrf_subnets_cache.invalidate()
+            for i in range(0, 3):
+                mapping = self.driver.get_gbp_details(
+                    self._neutron_admin_context, device=device, host='h1')
+            # Resyncs of the VRF's endpoints are served from memory
+            self.assertEqual(1, vrf_subnets.call_count)
+            self.assertEqual(stats['hits'] + 2,
+                             vrf_subnets_cache.stats()['hits'])
+            self.assertEqual(stats['misses'] + 1,
+                             vrf_subnets_cache.stats()['misses'])
+
+            # A new subnet in the VRF invalidates the cache
+            ptg2 = self.create_policy_target_group(
+                name="ptg2")['policy_target_group']
+            self.assertEqual(0, vrf_subnets_cache.stats()['size'])
+            mapping2 = self.driver.get_gbp_details(
+                self._neutron_admin_context, device=device, host='h1')
+            self.assertEqual(2, vrf_subnets.call_count)
+        self.assertTrue(set(mapping['vrf_subnets']) <
+                        set(mapping2['vrf_subnets']))
+        self.assertEqual(len(ptg2['subnets']),
+                         len(set(mapping2['vrf_subnets']) -
+                             set(mapping['vrf_subnets'])))
+
+    def test_get_gbp_details_vrf_subnets_invalidated_by_other_process(self):
+        rpc_cache = self.driver.aim_mech_driver.vrf_subnets_cache
+        ptg = self.create_policy_target_group(
+            name="ptg1")['policy_target_group']
+        pt = self.create_policy_target(
+            policy_target_group_id=ptg['id'])['policy_target']
+        self._bind_port_to_host(pt['port_id'], 'h1')
+        device = 'tap%s' % pt['port_id']
+        mapping = self.driver.get_gbp_details(
+            self._neutron_admin_context, device=device, host='h1')
+        self.assertEqual(1, rpc_cache.stats()['size'])
+
+        # The API worker making the change has its own cache
+        with mock.patch.object(self.driver.aim_mech_driver,
+                               'vrf_subnets_cache',
+                               aim_cache.VrfSubnetsCache()):
+            ptg2 = self.create_policy_target_group(
+                name="ptg2")['policy_target_group']
+        self.assertEqual(1, rpc_cache.stats()['size'])
+
+        with mock.patch.object(
+                self.driver, '_query_vrf_subnets',
+                wraps=self.driver._query_vrf_subnets) as vrf_subnets:
+            mapping2 = self.driver.get_gbp_details(
+                self._neutron_admin_context, device=device, host='h1')
+            self.assertEqual(1, vrf_subnets.call_count)
+        self.assertEqual(len(ptg2['subnets']),
+                         len(set(mapping2['vrf_subnets']) -
+                             set(mapping['vrf_subnets'])))
+
+    def _get_vm_name_for_new_pt(self):
+        ptg = self.create_policy_target_group(
+            name="ptg1")['policy_target_group']
+        pt = self.create_policy_target(
+            policy_target_group_id=ptg['id'])['policy_target']
+        self._bind_port_to_host(pt['port_id'], 'h1')
+        return pt, lambda: self.driver.get_gbp_details(
+            self._neutron_admin_context, device='tap%s' % pt['port_id'],
+            host='h1')['vm-name']
+
+    def test_get_gbp_details_vm_name_cached(self):
+        pt, get_vm_name = self._get_vm_name_for_new_pt()
+        vm = mock.Mock()
+        vm.name = 'vm1'
+        with mock.patch.object(nclient.NovaClient, 'get_server',
+                               return_value=vm) as get_server:
+            self.assertEqual('vm1', get_vm_name())
+            self.assertEqual('vm1', get_vm_name())
+            get_server.assert_called_once_with('someid')
+
+    def test_get_gbp_details_vm_name_prefetched_by_host(self):
+        pt, get_vm_name = self._get_vm_name_for_new_pt()
+        vm = mock.Mock(id='someid')
+        vm.name = 'vm1'
+        with mock.patch.object(nclient.NovaClient, 'get_servers',
+                               return_value=[vm]) as get_servers:
+            with mock.patch.object(nclient.NovaClient,
+                                   'get_server') as get_server:
+                self.assertEqual('vm1', get_vm_name())
+                get_servers.assert_called_once_with('h1')
+                self.assertFalse(get_server.called)
+
+    def test_vm_name_concurrent_lookups_list_host_once(self):
+        vms = []
+        for i in range(0, 5):
+            vm = mock.Mock(id='vm-id%d' % i)
+            vm.name = 'vm%d' % i
+            vms.append(vm)
+
+        def slow_get_servers(host):
+            eventlet.sleep(0.05)
+            return vms
+
+        self.driver._get_vm_name_cache()
+        with mock.patch.object(nclient.NovaClient, 'get_servers',
+                               side_effect=slow_get_servers) as get_servers:
+            with mock.patch.object(nclient.NovaClient,
+                                   'get_server') as get_server:
+                lookups = [eventlet.spawn(self.driver._lookup_vm_name,
+                                          vm.id, 'h1') for vm in vms]
+                self.assertEqual([vm.name for vm in vms],
+                                 [lookup.wait() for lookup in lookups])
+                get_servers.assert_called_once_with('h1')
+                self.assertFalse(get_server.called)
+                self.assertEqual({}, self.driver._vm_name_prefetches)
+
+    def test_get_gbp_details_vm_name_lookup_timeout(self):
+        pt, get_vm_name = self._get_vm_name_for_new_pt()
+        cfg.CONF.set_override('vm_name_lookup_timeout', 0.01,
+                              group='aim_mapping')
+        vm = mock.Mock()
+        vm.name = 'vm1'
+
+        def slow_get_server(server_id):
+            eventlet.sleep(0.1)
+            return vm
+
+        with mock.patch.object(nclient.NovaClient, 'get_server',
+                               side_effect=slow_get_server):
+            with mock.patch.object(
+                    self.driver,
+                    '_send_port_update_notification') as notify:
+                # Fall back to the device_id while Nova is slow
+                self.assertEqual('someid', get_vm_name())
+                self.assertFalse(notify.called)
+                eventlet.sleep(0.2)
+                notify.assert_called_once_with(mock.ANY, pt['port_id'])
+                # Not notified with the context of the RPC request
+                context = notify.call_args[0][0]
+                self.assertIsNot(self._neutron_admin_context, context)
+                self.assertTrue(context.is_admin)
+                self.assertEqual('vm1', get_vm_name())
+
     def test_get_gbp_details_no_pt(self):
         # Test that traditional Neutron ports behave correctly from the
         # RPC perspective
@@ -4914,3 +5115,32 @@ class TestPerL3PImplicitContractsConfig(TestL2PolicyWithAutoPTG):
 
     def test_create_not_called(self):
         self.mock_create.assert_not_called()
+
+
+class TestVMNameCache(unittest2.TestCase):
+
+    def test_lru_eviction(self):
+        cache = nclient.VMNameCache(max_size=2)
+        cache.set('vm1', 'name1')
+        cache.set('vm2', 'name2')
+        # vm1 is used, so vm2 is the least recently used
+        self.assertEqual('name1', cache.get('vm1'))
+        cache.set('vm3', 'name3')
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get('vm2'))
+        self.assertEqual('name1', cache.get('vm1'))
+        self.assertEqual('name3', cache.get('vm3'))
+
+    def test_ttl_expiry(self):
+        cache = nclient.VMNameCache(ttl=10)
+        vm = mock.Mock(id='vm1')
+        vm.name = 'name1'
+        with mock.patch('time.time', return_value=100):
+            self.assertTrue(cache.prefetch_needed('h1'))
+            cache.prefetched('h1', [vm])
+            self.assertFalse(cache.prefetch_needed('h1'))
+            self.assertEqual('name1', cache.get('vm1'))
+        with mock.patch('time.time', return_value=111):
+            self.assertTrue(cache.prefetch_needed('h1'))
+            self.assertIsNone(cache.get('vm1'))
+            self.assertEqual(0, len(cache))
@@ -574,6 +574,34 @@ class TestPolicyTargetGroup(GroupPolicyPluginTestCase):
         self.assertRaises(gpolicy.PolicyTargetGroupNotFound,
                           self.plugin.get_policy_target_group, ctx, ptg['id'])
 
+    def test_list_ptgs_loads_requested_fields(self):
+        prs_id = self.create_policy_rule_set()['policy_rule_set']['id']
+        for i in range(0, 3):
+            ptg_id = self.create_policy_target_group(
+                provided_policy_rule_sets={prs_id: 'scope'},
+                consumed_policy_rule_sets={prs_id: 'scope'})[
+                    'policy_target_group']['id']
+            self.create_policy_target(policy_target_group_id=ptg_id)
+        ctx = context.get_admin_context()
+
+        ptgs, queries = self._count_queries(
+            self.plugin.get_policy_target_groups, ctx,
+            fields=['id', 'name', 'policy_targets'])
+        ptgs, fields_queries = self._count_queries(
+            self.plugin.get_policy_target_groups, ctx,
+            fields=['id', 'name'])
+        # Relationships backing fields not requested are not loaded
+        self.assertLess(fields_queries, queries)
+        self.assertEqual(3, len(ptgs))
+        for ptg in ptgs:
+            self.assertEqual(set(['id', 'name']), set(ptg))
+
+        # Filtered attributes are read even if not requested
+        ptgs = self.plugin.get_policy_target_groups(
+            ctx, filters={'id': [ptg_id]}, fields=['name'])
+        self.assertEqual(1, len(ptgs))
+        self.assertEqual(set(['name']), set(ptgs[0]))
+
     def test_delete_fails_on_used_ptg(self):
         with self.port() as port:
             port_id = port['port']['id']
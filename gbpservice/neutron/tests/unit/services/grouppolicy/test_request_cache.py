@@ -0,0 +1,80 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import unittest2
+
+from gbpservice.neutron.services.grouppolicy.common import cache
+
+
+class FakeContext(object):
+    pass
+
+
+class TestRequestCache(unittest2.TestCase):
+
+    def setUp(self):
+        self.context = FakeContext()
+        self.cache = cache.get_request_cache(self.context)
+        self.db = {'prs1': {'id': 'prs1', 'policy_rules': ['pr1']},
+                   'prs2': {'id': 'prs2', 'policy_rules': []}}
+        self.loader = mock.Mock(side_effect=lambda x: self.db[x])
+        self.many_loader = mock.Mock(
+            side_effect=lambda ids: [self.db[x] for x in ids if x in self.db])
+
+    def test_cache_attached_to_context(self):
+        self.assertIs(self.cache, cache.get_request_cache(self.context))
+        self.assertIsNot(self.cache, cache.get_request_cache(FakeContext()))
+
+    def test_get_reads_through_once(self):
+        for i in range(0, 3):
+            self.assertEqual(self.db['prs1'], self.cache.get(
+                'policy_rule_set', 'prs1', self.loader))
+        self.loader.assert_called_once_with('prs1')
+        self.assertEqual({'hits': 2, 'misses': 1, 'size': 1},
+                         self.cache.stats())
+
+    def test_get_returns_copies(self):
+        prs = self.cache.get('policy_rule_set', 'prs1', self.loader)
+        prs['policy_rules'].append('pr2')
+        self.assertEqual(['pr1'], self.cache.get(
+            'policy_rule_set', 'prs1', self.loader)['policy_rules'])
+
+    def test_get_keyed_by_admin(self):
+        self.cache.get('policy_rule_set', 'prs1', self.loader)
+        self.cache.get('policy_rule_set', 'prs1', self.loader, is_admin=True)
+        self.assertEqual(2, self.loader.call_count)
+
+    def test_get_not_found_not_cached(self):
+        self.assertRaises(KeyError, self.cache.get, 'policy_rule_set',
+                          'prs3', self.loader)
+        self.assertEqual(0, self.cache.stats()['size'])
+
+    def test_get_many_loads_missing_only(self):
+        self.cache.get('policy_rule_set', 'prs1', self.loader)
+        result = self.cache.get_many('policy_rule_set',
+                                     ['prs1', 'prs2', 'prs3'],
+                                     self.many_loader)
+        self.assertEqual([self.db['prs1'], self.db['prs2']], result)
+        self.many_loader.assert_called_once_with(['prs2', 'prs3'])
+        self.assertEqual([], self.cache.get_many(
+            'policy_rule_set', [], self.many_loader))
+        self.assertEqual(1, self.many_loader.call_count)
+
+    def test_invalidate(self):
+        self.cache.get('policy_rule_set', 'prs1', self.loader)
+        cache.invalidate_request_cache(self.context)
+        self.cache.get('policy_rule_set', 'prs1', self.loader)
+        self.assertEqual(2, self.loader.call_count)
+        self.assertEqual(2, self.cache.misses)
+        # No cache on the context, nothing to do
+        cache.invalidate_request_cache(FakeContext())
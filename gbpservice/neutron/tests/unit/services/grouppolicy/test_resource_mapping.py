@@ -3879,6 +3879,101 @@ class TestExternalPolicy(ResourceMappingTestCase):
                                 and rule['remote_ip_prefix'] == ['0.0.0.0/0']):
                             self.assertFalse(self._get_sg_rule(**rule))
 
+    def test_prs_rules_programmed_in_bulk(self):
+        routes = [{'destination': '172.%d.0.0/16' % i, 'nexthop': None}
+                  for i in range(0, 10)]
+        with self.network(router__external=True) as net:
+            with self.subnet(cidr='10.10.1.0/24', network=net) as sub:
+                es = self.create_external_segment(
+                    subnet_id=sub['subnet']['id'], external_routes=routes,
+                    shared=True, is_admin_context=True)['external_segment']
+                ep = self.create_external_policy(
+                    external_segments=[es['id']])['external_policy']
+                pr = self._create_ssh_allow_rule()
+                prs = self.create_policy_rule_set(
+                    policy_rules=[pr['id']])['policy_rule_set']
+                plugin = directory.get_plugin()
+                with mock.patch.object(
+                        plugin, 'create_security_group_rule_bulk',
+                        wraps=plugin.create_security_group_rule_bulk) as bulk:
+                    self.update_external_policy(
+                        ep['id'], consumed_policy_rule_sets={prs['id']: ''},
+                        expected_res_status=200)
+                    # Only the provided SG gets rules, all in one call
+                    self.assertEqual(1, bulk.call_count)
+                expected = self._verify_prs_rules(prs['id'])
+
+                self.update_external_policy(
+                    ep['id'], consumed_policy_rule_sets={},
+                    expected_res_status=200)
+                for rule in expected:
+                    self.assertFalse(self._get_sg_rule(**rule))
+
+    def test_sg_rules_bulk_create_skips_existing(self):
+        pr = self._create_ssh_allow_rule()
+        prs = self.create_policy_rule_set(
+            policy_rules=[pr['id']])['policy_rule_set']
+        mapping = self._get_prs_mapping(prs['id'])
+        ctx = nctx.get_admin_context()
+        driver = resource_mapping.ResourceMappingDriver()
+        attrs = driver._sg_rule_attrs(
+            prs['tenant_id'], mapping.provided_sg_id, 'ingress', 'tcp',
+            '22', '10.0.0.0/24')
+        new_attrs = dict(attrs, port_range_min=443, port_range_max=443)
+        driver._sync_sg_rules(ctx, [attrs])
+        plugin = directory.get_plugin()
+        orig_bulk = plugin.create_security_group_rule_bulk
+
+        def create_bulk(context, rules):
+            # Agents must not be notified before the rules are committed
+            self.assertIsNone(context.session.transaction)
+            return orig_bulk(context, rules)
+
+        with mock.patch.object(plugin, 'create_security_group_rule_bulk',
+                               side_effect=create_bulk) as bulk:
+            driver._sync_sg_rules(ctx, [attrs, new_attrs])
+        # Only the missing rule is created
+        rules = bulk.call_args[0][1]['security_group_rules']
+        self.assertEqual([443], [x['security_group_rule']['port_range_min']
+                                 for x in rules])
+        self.assertEqual(1, len(self._get_sg_rule(**dict(
+            (key, [value]) for key, value in attrs.items()
+            if value is not None))))
+        # Protocol numbers and the any prefix match existing rules
+        self.assertEqual(
+            driver._sg_rule_key(dict(attrs, protocol='6',
+                                     remote_ip_prefix='0.0.0.0/0')),
+            driver._sg_rule_key(dict(attrs, protocol='tcp',
+                                     remote_ip_prefix=None)))
+
+    def test_prs_resources_read_once_per_request(self):
+        route = {'destination': '172.0.0.0/8', 'nexthop': None}
+        with self.network(router__external=True) as net:
+            with self.subnet(cidr='10.10.1.0/24', network=net) as sub:
+                es = self.create_external_segment(
+                    subnet_id=sub['subnet']['id'], external_routes=[route],
+                    shared=True, is_admin_context=True)['external_segment']
+                ep = self.create_external_policy(
+                    external_segments=[es['id']])['external_policy']
+                pr = self._create_ssh_allow_rule()
+                prs1 = self.create_policy_rule_set(
+                    policy_rules=[pr['id']])['policy_rule_set']
+                prs2 = self.create_policy_rule_set(
+                    policy_rules=[pr['id']])['policy_rule_set']
+                plugin = directory.get_plugin(pconst.GROUP_POLICY)
+                with mock.patch.object(
+                        plugin, 'get_policy_classifier',
+                        wraps=plugin.get_policy_classifier) as get:
+                    self.update_external_policy(
+                        ep['id'], consumed_policy_rule_sets={
+                            prs1['id']: '', prs2['id']: ''},
+                        expected_res_status=200)
+                    # The rule's classifier is shared by both PRSs
+                    get.assert_called_once_with(
+                        mock.ANY, pr['policy_classifier_id'])
+                self._verify_prs_rules(prs1['id'])
+                self._verify_prs_rules(prs2['id'])
+
 
 class TestPolicyAction(ResourceMappingTestCase):
 
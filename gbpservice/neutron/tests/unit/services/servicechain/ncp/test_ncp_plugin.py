@@ -11,6 +11,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
 import webob.exc
 
 import mock
@@ -22,6 +24,7 @@ from neutron_lib.db import model_base
 from neutron_lib import exceptions as n_exc
 from neutron_lib.plugins import directory
 from oslo_config import cfg
+from oslo_log import log as logging
 from oslo_serialization import jsonutils
 
 from gbpservice.neutron.db.grouppolicy import group_policy_mapping_db  # noqa
@@ -30,6 +33,10 @@ from gbpservice.neutron.services.servicechain.plugins.ncp import (
     context as ncp_context)
 from gbpservice.neutron.services.servicechain.plugins.ncp import (
     exceptions as exc)
+from gbpservice.neutron.services.servicechain.plugins.ncp import (
+    model as ncp_model)
+from gbpservice.neutron.services.servicechain.plugins.ncp import (
+    node_driver_manager as ncp_manager)
 from gbpservice.neutron.services.servicechain.plugins.ncp import (
     plugin as ncp_plugin)
 import gbpservice.neutron.services.servicechain.plugins.ncp.config  # noqa
@@ -41,6 +48,10 @@ from gbpservice.neutron.tests.unit.services.grouppolicy import (
 from gbpservice.neutron.tests.unit.services.servicechain import (
     base_test_servicechain_plugin as test_base)
 
+LOG = logging.getLogger(__name__)
+
+STATUS_READS = 100
+
 
 class ServiceChainNCPTestPlugin(ncp_plugin.NodeCompositionPlugin):
 
@@ -345,6 +356,154 @@ class NodeCompositionPluginTestCase(
         self.assertEqual(1, update.call_count)
         self.assertEqual(0, destroy.call_count)
 
+    def test_status_reads_cached(self):
+        self._create_simple_service_chain(3)
+        instance = self._list('servicechain_instances')[
+            'servicechain_instances'][0]
+        plugin_context = n_context.get_admin_context()
+        with mock.patch.object(
+                self.driver, 'get_plumbing_info') as plumbing_info, \
+                mock.patch.object(ncp_model, 'get_node_owner',
+                                  wraps=ncp_model.get_node_owner) as owner, \
+                mock.patch.object(self.driver, 'get_status',
+                                  wraps=self.driver.get_status) as status:
+            start = time.time()
+            for i in range(0, STATUS_READS):
+                self.sc_plugin.get_servicechain_instance(
+                    plugin_context, instance['id'])
+            duration = time.time() - start
+            LOG.info("%(reads)d servicechain instance status reads, "
+                     "%(rate).0f reads/s",
+                     {'reads': STATUS_READS, 'rate': STATUS_READS / duration})
+            # Owners cached on deploy, no plumbing needed to read the status
+            self.assertFalse(plumbing_info.called)
+            self.assertFalse(owner.called)
+            self.assertEqual(3 * STATUS_READS, status.call_count)
+
+            # Nodes are not scheduled unless the status is requested
+            status.reset_mock()
+            self.sc_plugin.get_servicechain_instance(
+                plugin_context, instance['id'], fields=['id', 'name'])
+            self.assertFalse(status.called)
+
+            # Node update invalidates the cached scheduling
+            self.update_servicechain_node(
+                self.sc_plugin.get_servicechain_spec(
+                    plugin_context,
+                    instance['servicechain_specs'][0])['nodes'][0],
+                description='updated', expected_res_status=200)
+            self.assertEqual(1, plumbing_info.call_count)
+            self.assertEqual(1, owner.call_count)
+
+    def test_scheduling_cache_bounded(self):
+        cache = ncp_manager.SchedulingCache(ttl=10, max_size=2)
+        with mock.patch.object(ncp_manager.time, 'time', return_value=1000):
+            cache.set(('sci1', 'node1'), 'driver1')
+            cache.set(('sci1', 'node2'), 'driver2')
+            self.assertEqual('driver1', cache.get(('sci1', 'node1')))
+            cache.set(('sci2', 'node1'), 'driver3')
+            # Least recently used entry evicted
+            self.assertEqual(2, len(cache))
+            self.assertIsNone(cache.get(('sci1', 'node2')))
+        with mock.patch.object(ncp_manager.time, 'time', return_value=1011):
+            # Entries changed by other servers expire
+            self.assertIsNone(cache.get(('sci1', 'node1')))
+            cache.set(('sci1', 'node1'), 'driver1')
+            cache.forget(node_id='node1')
+            self.assertEqual(0, len(cache))
+
+    def test_pts_added_scheduled_once_per_instance(self):
+        add = self.driver.update_policy_target_added = mock.Mock()
+        rem = self.driver.update_policy_target_removed = mock.Mock()
+        self._create_simple_service_chain(3)
+        self._create_simple_service_chain(2)
+        instance_ids = [instance['id'] for instance in self._list(
+            'servicechain_instances')['servicechain_instances']]
+        self.assertEqual(2, len(instance_ids))
+        plugin_context = n_context.get_admin_context()
+        pts = [{'id': 'pt%d' % i} for i in range(0, 4)]
+        with mock.patch.object(self.driver, 'get_status') as status, \
+                mock.patch.object(
+                    ncp_context, 'get_node_driver_context',
+                    wraps=ncp_context.get_node_driver_context) as node_context:
+            self.sc_plugin.update_chains_pts_added(plugin_context, pts,
+                                                   instance_ids)
+            # One node context per node, whatever the number of PTs
+            self.assertEqual(5, node_context.call_count)
+            self.assertEqual(20, add.call_count)
+            add.assert_any_call(mock.ANY, pts[3])
+
+            node_context.reset_mock()
+            self.sc_plugin.update_chains_pts_removed(plugin_context, pts[:1],
+                                                     instance_ids)
+            self.assertEqual(5, node_context.call_count)
+            self.assertEqual(5, rem.call_count)
+            self.assertFalse(status.called)
+
+    def test_pt_added_notified_once_for_provider_instances(self):
+        prof = self.create_service_profile(
+            service_type='LOADBALANCER',
+            vendor=self.SERVICE_PROFILE_VENDOR)['service_profile']
+        prs_ids = []
+        for i in range(0, 2):
+            node = self.create_servicechain_node(
+                service_profile_id=prof['id'],
+                config=self.DEFAULT_LB_CONFIG)['servicechain_node']
+            spec = self.create_servicechain_spec(
+                nodes=[node['id']])['servicechain_spec']
+            prs_ids.append(self._create_redirect_prs(
+                spec['id'])['policy_rule_set']['id'])
+        provider = self.create_policy_target_group(
+            provided_policy_rule_sets=dict(
+                (prs_id, '') for prs_id in prs_ids))['policy_target_group']
+        self.create_policy_target_group(
+            consumed_policy_rule_sets=dict(
+                (prs_id, '') for prs_id in prs_ids))
+        instance_ids = [instance['id'] for instance in self._list(
+            'servicechain_instances')['servicechain_instances']]
+        self.assertEqual(2, len(instance_ids))
+
+        with mock.patch.object(self.sc_plugin,
+                               'update_chains_pts_added') as pts_added:
+            pt = self.create_policy_target(
+                policy_target_group_id=provider['id'])['policy_target']
+        # One notification for all the instances of the PTG
+        pts_added.assert_called_once_with(mock.ANY, [mock.ANY], mock.ANY)
+        self.assertEqual(pt['id'], pts_added.call_args[0][1][0]['id'])
+        self.assertEqual(sorted(instance_ids),
+                         sorted(pts_added.call_args[0][2]))
+
+    def test_list_servicechain_instances_bulk_status(self):
+        get_statuses = self.driver.get_statuses = mock.Mock(
+            side_effect=lambda context, node_instances: dict(
+                (x, {'status': 'ACTIVE',
+                     'status_details': 'node deployment completed'})
+                for x in node_instances))
+        plugin_context = n_context.get_admin_context()
+        list_instances = self.sc_plugin.get_servicechain_instances
+
+        self._create_simple_service_chain(2)
+        instances = list_instances(plugin_context)
+        self.assertEqual(['ACTIVE'], [x['status'] for x in instances])
+        self.assertEqual(1, get_statuses.call_count)
+        list_instances(plugin_context, fields=['id', 'name'])
+        self.assertEqual(1, get_statuses.call_count)
+
+        _, queries = self._count_queries(list_instances, plugin_context)
+        for i in range(0, 3):
+            self._create_simple_service_chain(2)
+        # Statuses of the new instances are stored by the first listing
+        list_instances(plugin_context)
+        get_statuses.reset_mock()
+        instances, more_queries = self._count_queries(list_instances,
+                                                      plugin_context)
+        self.assertEqual(4, len(instances))
+        self.assertEqual(set(['ACTIVE']),
+                         set(x['status'] for x in instances))
+        self.assertEqual(1, get_statuses.call_count)
+        self.assertEqual(8, len(get_statuses.call_args[0][1]))
+        self.assertEqual(queries, more_queries)
+
     def test_create_service_chain_fails(self):
         deploy = self.driver.create = mock.Mock()
         destroy = self.driver.delete = mock.Mock()
@@ -11,11 +11,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+
+import eventlet
 import mock
 from neutron.db import api as db_api
 from neutron.plugins.common import constants
 from neutron_lib.db import model_base
 from oslo_serialization import jsonutils
+import unittest2
 import webob
 
 from gbpservice.neutron.services.servicechain.plugins.ncp import (
@@ -30,6 +34,7 @@ from gbpservice.neutron.tests.unit.services.servicechain import (
     base_test_servicechain_plugin as test_base)
 from gbpservice.neutron.tests.unit.services.servicechain.ncp import (
     test_ncp_plugin as test_ncp_plugin)
+from gbpservice.nfp.common import constants as nfp_constants
 from gbpservice.nfp.orchestrator.db import nfp_db as nfp_db
 
 SERVICE_DELETE_TIMEOUT = 15
@@ -859,3 +864,94 @@ class TestServiceChainInstance(NFPNodeDriverTestCase):
                 self.assertSetEqual(set(ref_ptg['provided_policy_rule_sets']),
                                     set(current_ptg[
                                             'provided_policy_rule_sets']))
+
+
+class TestNetworkFunctionStatusWaiters(unittest2.TestCase):
+
+    def setUp(self):
+        super(TestNetworkFunctionStatusWaiters, self).setUp()
+        self.driver = nfp_node_driver.NFPNodeDriver()
+        self.driver.nfp_notifier = mock.Mock()
+        self.driver.nfp_notifier.get_network_function.side_effect = (
+            lambda context, nf_id: {'id': nf_id, 'status': 'PENDING_CREATE'})
+        self.context = mock.Mock()
+        self.callbacks = nfp_node_driver.NFPNodeDriverCallbacks()
+        config.cfg.CONF.set_override('service_status_poll_interval', 60,
+                                     group='nfp_node_driver')
+        self.addCleanup(config.cfg.CONF.clear_override,
+                        'service_status_poll_interval',
+                        group='nfp_node_driver')
+
+    def _spawn_waiters(self, nf_ids):
+        return [eventlet.spawn(
+            self.driver._wait_for_network_function_operation_completion,
+            self.context, nf_id, 'create') for nf_id in nf_ids]
+
+    def test_chain_completes_on_notification(self):
+        nf_ids = ['nf1', 'nf2', 'nf3']
+        start = time.time()
+        waiters = self._spawn_waiters(nf_ids)
+        eventlet.sleep(0)
+        for nf_id in nf_ids:
+            self.callbacks.network_function_status_changed(
+                mock.ANY, nf_id, 'ACTIVE')
+        for waiter in waiters:
+            waiter.wait()
+        self.assertLess(time.time() - start, 1)
+        # Polled only once, on start
+        self.assertEqual(
+            len(nf_ids),
+            self.driver.nfp_notifier.get_network_function.call_count)
+        self.assertEqual({}, nfp_node_driver.nf_status_waiters._events)
+
+    def test_error_notification_fails_create(self):
+        waiter = self._spawn_waiters(['nf1'])[0]
+        eventlet.sleep(0)
+        self.callbacks.network_function_status_changed(
+            mock.ANY, 'nf1', 'ERROR')
+        self.assertRaises(nfp_node_driver.NodeInstanceCreateFailed,
+                          waiter.wait)
+
+    def test_delete_completes_on_notification(self):
+        waiter = eventlet.spawn(
+            self.driver._wait_for_network_function_delete_completion,
+            self.context, 'nf1')
+        eventlet.sleep(0)
+        self.callbacks.network_function_deleted(mock.ANY, 'nf1')
+        waiter.wait()
+        self.assertEqual(
+            1, self.driver.nfp_notifier.get_network_function.call_count)
+
+    def test_poll_without_notification(self):
+        config.cfg.CONF.set_override('service_status_poll_interval', 0,
+                                     group='nfp_node_driver')
+        statuses = ['PENDING_CREATE', 'PENDING_CREATE', 'ACTIVE']
+        self.driver.nfp_notifier.get_network_function.side_effect = (
+            lambda context, nf_id: {'id': nf_id, 'status': statuses.pop(0)})
+        self.driver._wait_for_network_function_operation_completion(
+            self.context, 'nf1', 'create')
+        self.assertEqual(
+            3, self.driver.nfp_notifier.get_network_function.call_count)
+
+
+class TestNFPNodeDriverStatuses(unittest2.TestCase):
+
+    def test_get_statuses(self):
+        driver = nfp_node_driver.NFPNodeDriver()
+        maps = [mock.Mock(sc_instance_id='sci1', sc_node_id='node1',
+                          status='ACTIVE'),
+                mock.Mock(sc_instance_id='sci1', sc_node_id='node2',
+                          status='unknown')]
+        with mock.patch.object(nfp_db.NFPDbBase,
+                               'get_instances_network_function_maps',
+                               return_value=maps) as get_maps:
+            statuses = driver.get_statuses(
+                mock.Mock(), [('sci1', 'node1'), ('sci1', 'node2'),
+                              ('sci2', 'node1')])
+        self.assertEqual(1, get_maps.call_count)
+        self.assertEqual(['sci1', 'sci2'],
+                         sorted(get_maps.call_args[0][1]))
+        self.assertEqual(
+            {('sci1', 'node1'): nfp_constants.NFP_STATUS_MAP['ACTIVE'],
+             ('sci1', 'node2'): nfp_constants.NFP_STATUS_MAP['BUILD']},
+            statuses)
@@ -125,14 +125,26 @@ CHECK_USER_CONFIG_COMPLETE_SPACING = 10
 CHECK_USER_CONFIG_COMPLETE_MAXRETRY = 40
 
 PULL_NOTIFICATIONS_SPACING = 10
+# Notifications are long polled, the configurator holds the request
+# up to PULL_NOTIFICATIONS_WAIT secs, so the next poll can follow
+# right away. Configurators answering without waiting are polled
+# every PULL_NOTIFICATIONS_SPACING secs.
+PULL_NOTIFICATIONS_WAIT = 5
+PULL_NOTIFICATIONS_LONG_POLL_SPACING = 1
 
 #nfp_node_deriver_config
 # all units in sec.
 SERVICE_CREATE_TIMEOUT = 1500
 SERVICE_DELETE_TIMEOUT = 600
+# Completion is notified by the orchestrator, network function status
+# is polled every SERVICE_STATUS_POLL_INTERVAL secs only as a fallback
+SERVICE_STATUS_POLL_INTERVAL = 30
 
 # heat stack creation timeout
 STACK_ACTION_WAIT_TIME = 300
+# Stack status is read from a listing of the tenant stacks taken at
+# most STACK_STATUS_REFRESH_INTERVAL secs ago
+STACK_STATUS_REFRESH_INTERVAL = 5
 
 # default directory for config files
 CONFIG_DIR = '/etc/nfp/'
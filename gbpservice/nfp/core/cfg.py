@@ -31,6 +31,19 @@ NFP_OPTS = [
         'backend',
         default='rpc',
         help='Backend Support for communicationg with configurator.'
+    ),
+    oslo_config.StrOpt(
+        'event_codec',
+        default='pickle',
+        choices=['pickle', 'msgpack'],
+        help='Codec used to serialize event data sent between '
+        'distributor and worker processes.'
+    ),
+    oslo_config.IntOpt(
+        'event_compress_threshold',
+        default=1024,
+        help='Serialized event data larger than this many bytes '
+        'is zlib compressed, -1 disables compression.'
     )
 ]
 
@@ -0,0 +1,119 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import zlib
+
+from six.moves import cPickle as pickle
+
+from gbpservice.nfp.core import log as nfp_logging
+
+try:
+    from oslo_serialization import msgpackutils
+except ImportError:
+    msgpackutils = None
+
+LOG = nfp_logging.getLogger(__name__)
+
+DEFAULT_CODEC = 'pickle'
+# Payloads smaller than this are not worth zlib'ing.
+DEFAULT_COMPRESS_THRESHOLD = 1024
+
+"""Header byte prefixed to each encoded blob. """
+RAW = b'\x00'
+ZLIB = b'\x01'
+
+"""Serializers for the event payload.
+
+    Event context & data are encoded before the event is
+    written on the pipe. Codec serializes the payload and
+    compresses it only if it is above the configured threshold.
+"""
+
+
+class EventCodec(object):
+
+    name = None
+
+    def __init__(self, compress_threshold=DEFAULT_COMPRESS_THRESHOLD):
+        self._compress_threshold = compress_threshold
+
+    def dumps(self, obj):
+        raise NotImplementedError()
+
+    def loads(self, blob):
+        raise NotImplementedError()
+
+    def encode(self, obj):
+        blob = self.dumps(obj)
+        if self._compress_threshold >= 0 and (
+                len(blob) > self._compress_threshold):
+            return ZLIB + zlib.compress(blob)
+        return RAW + blob
+
+    def decode(self, blob):
+        header, blob = blob[:1], blob[1:]
+        if header == ZLIB:
+            blob = zlib.decompress(blob)
+        elif header != RAW:
+            raise ValueError("Unknown codec header %r" % (header))
+        return self.loads(blob)
+
+
+class PickleCodec(EventCodec):
+    """Pickle protocol 2, handles any picklable object. """
+
+    name = 'pickle'
+
+    def dumps(self, obj):
+        return pickle.dumps(obj, 2)
+
+    def loads(self, blob):
+        return pickle.loads(blob)
+
+
+class MsgpackCodec(EventCodec):
+    """Msgpack with oslo extensions for datetime, uuid, set etc. """
+
+    name = 'msgpack'
+
+    def __init__(self, **kwargs):
+        if not msgpackutils:
+            raise ImportError("msgpack codec needs oslo.serialization")
+        super(MsgpackCodec, self).__init__(**kwargs)
+
+    def dumps(self, obj):
+        return msgpackutils.dumps(obj)
+
+    def loads(self, blob):
+        return msgpackutils.loads(blob)
+
+
+CODECS = {
+    PickleCodec.name: PickleCodec,
+    MsgpackCodec.name: MsgpackCodec
+}
+
+
+def get_codec(name=DEFAULT_CODEC,
+              compress_threshold=DEFAULT_COMPRESS_THRESHOLD):
+    """Return codec object for the configured name.
+
+        Falls back to pickle if the codec is unknown or
+        its library is not available.
+    """
+    try:
+        return CODECS[name](compress_threshold=compress_threshold)
+    except (KeyError, ImportError) as e:
+        message = "Event codec %s not usable - %r, using %s" % (
+            name, e, DEFAULT_CODEC)
+        LOG.warning(message)
+        return CODECS[DEFAULT_CODEC](compress_threshold=compress_threshold)
@@ -10,6 +10,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import bisect
+
 from oslo_config import cfg as oslo_cfg
 from oslo_log import log as oslo_logging
 
@@ -66,3 +68,42 @@ def identify(obj):
     except Exception:
         # Some unknown type, returning empty
         return ""
+
+
+"""Histogram of latencies.
+
+    Samples are recorded in seconds and bucketed in
+    milliseconds, used for state reporting.
+"""
+
+
+class LatencyHistogram(object):
+
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._counts = [0] * (len(self.BUCKETS_MS) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, seconds):
+        ms = max(seconds, 0) * 1000.0
+        self._counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self._count += 1
+        self._total += ms
+        self._max = max(self._max, ms)
+
+    def to_dict(self):
+        buckets = {}
+        for bound, count in zip(self.BUCKETS_MS, self._counts):
+            buckets['<=%dms' % (bound)] = count
+        buckets['>%dms' % (self.BUCKETS_MS[-1])] = self._counts[-1]
+        avg = (self._total / self._count) if self._count else 0.0
+        return {'count': self._count,
+                'avg_ms': round(avg, 3),
+                'max_ms': round(self._max, 3),
+                'buckets': buckets}
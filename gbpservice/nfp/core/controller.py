@@ -10,11 +10,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import ast
 import eventlet
 eventlet.monkey_patch()
 
 import collections
+import contextlib
 import multiprocessing
 import operator
 import os
@@ -22,12 +22,12 @@ import pickle
 import six
 import sys
 import time
-import zlib
 
 from oslo_config import cfg as oslo_config
 from oslo_service import service as oslo_service
 
 from gbpservice.nfp.core import cfg as nfp_cfg
+from gbpservice.nfp.core import codec as nfp_codec
 from gbpservice.nfp.core import common as nfp_common
 from gbpservice.nfp.core import context
 from gbpservice.nfp.core import event as nfp_event
@@ -50,6 +50,17 @@ deque = collections.deque
 # REVISIT (mak): fix to pass compliance check
 config = config
 
+# Max #of events coalesced into a single frame written on the pipe.
+PIPE_MAX_BATCH = 256
+# Max #of frames drained from a pipe in one receive pass, bounds the
+# time spent on a single busy worker.
+PIPE_MAX_FRAMES = 64
+# Max secs the manager sleeps when no worker pipe is readable,
+# bounds the period of child watching.
+MANAGER_IDLE_TIMEOUT = 1.0
+# Secs to back off when stashed events could not be resent.
+RESEND_BACKOFF = 0.1
+
 """Implements NFP service.
 
     Base class for nfp modules, modules can invoke methods
@@ -129,6 +140,7 @@ class NfpService(object):
         event.desc.flag = nfp_event.EVENT_NEW
         event.desc.pid = os.getpid()
         event.desc.target = module
+        event.desc.posted_at = time.time()
         if event.lifetime == -1:
             event.lifetime = nfp_event.EVENT_DEFAULT_LIFETIME
         if not event.context:
@@ -234,6 +246,21 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
         self._pipe = None
         # Queue to stash events.
         self._stashq = deque()
+        # Released when an event is stashed, wakes the resender
+        self._stash_sem = eventlet.semaphore.Semaphore(0)
+        # Events waiting to be framed & sent, {pipe: [events]}
+        self._sendq = {}
+        # Depth of nested pipe_batch() blocks, {greenthread: depth}.
+        # Only sends of the batching greenthread are coalesced, sends
+        # from other greenthreads flush right away.
+        self._batching = {}
+
+        # Serializer for event context & data sent on pipes
+        self._codec = nfp_codec.get_codec(
+            name=getattr(conf, 'event_codec', nfp_codec.DEFAULT_CODEC),
+            compress_threshold=getattr(
+                conf, 'event_compress_threshold',
+                nfp_codec.DEFAULT_COMPRESS_THRESHOLD))
 
         self._manager = nfp_manager.NfpResourceManager(conf, self)
         self._worker = nfp_worker.NfpWorker(conf)
@@ -242,20 +269,18 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
         self.PROCESS_TYPE = "distributor"
 
     def compress(self, event):
-        # REVISIT (mak) : zip only if length is > than threshold (1k maybe)
         if not event.zipped:
             event.zipped = True
             data = {'context': event.context}
             event.context = {}
             if event.data:
                 data['data'] = event.data
-            event.data = zlib.compress(str(data))
+            event.data = self._codec.encode(data)
 
     def decompress(self, event):
         if event.zipped:
             try:
-                data = ast.literal_eval(
-                    zlib.decompress(event.data))
+                data = self._codec.decode(event.data)
                 event.data = data.get('data')
                 event.context = data['context']
                 event.zipped = False
@@ -277,40 +302,114 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
             assert False, message
 
     def pipe_recv(self, pipe):
-        event = None
+        """Receive one frame from the pipe.
+
+            A frame is a list of events written by a single
+            pipe.send(), a bare event from an older peer is
+            treated as a frame of one.
+
+            Returns: Events[] in the frame.
+        """
+        events = []
         try:
-            event = pipe.recv()
+            frame = pipe.recv()
         except Exception as exc:
             LOG.debug("Failed to receive event from pipe "
                       "with exception - %r - will retry..", (exc))
             eventlet.greenthread.sleep(1.0)
-        if event:
-            self.decompress(event)
-        return event
-
-    def pipe_send(self, pipe, event, resending=False):
-        self.is_picklable(event)
-
+            return events
+        if not isinstance(frame, list):
+            frame = [frame]
+        for event in frame:
+            if event:
+                self.decompress(event)
+                events.append(event)
+        return events
+
+    def pipe_recv_all(self, pipe, timeout=0.01,
+                      max_frames=PIPE_MAX_FRAMES):
+        """Drain all the ready frames from the pipe.
+
+            Wait till timeout for the first frame and then
+            pull as many as available, upto max_frames.
+
+            Returns: Events[] pulled from pipe.
+        """
+        events = []
+        ready = pipe.poll(timeout)
+        frames = 0
+        while ready and frames < max_frames:
+            events += self.pipe_recv(pipe)
+            frames += 1
+            ready = pipe.poll()
+        return events
+
+    def _pipe_send_frame(self, pipe, events):
         try:
             # If there is no reader yet
             if not pipe.poll():
-                self.compress(event)
-                pipe.send(event)
+                pipe.send(events)
                 return True
         except Exception as e:
-            message = ("Failed to send event - %s via pipe"
+            message = ("Failed to send %d events via pipe"
                        "- exception - %r - will resend" % (
-                            event.identify(), e))
+                            len(events), e))
             LOG.debug(message)
+        return False
+
+    def _pipe_flush(self, pipe):
+        events = self._sendq.pop(pipe, None)
+        if not events:
+            return True
+        sent = True
+        for i in range(0, len(events), PIPE_MAX_BATCH):
+            frame = events[i:i + PIPE_MAX_BATCH]
+            if sent:
+                sent = self._pipe_send_frame(pipe, frame)
+            if not sent:
+                # If couldnt send event.. stash it so that
+                # resender task will send event again
+                self._stashq.extend(frame)
+                self._stash_sem.release()
+        return sent
+
+    def pipe_flush(self):
+        """Send all the events queued on every pipe. """
+        while self._sendq:
+            pipe = next(iter(self._sendq))
+            self._pipe_flush(pipe)
+
+    @contextlib.contextmanager
+    def pipe_batch(self):
+        """Coalesce events sent within the block.
+
+            Events sent on a pipe by the calling greenthread
+            are queued and written as a single frame per pipe
+            when its outermost block exits.
+        """
+        thread = eventlet.getcurrent()
+        self._batching[thread] = self._batching.get(thread, 0) + 1
+        try:
+            yield
+        finally:
+            self._batching[thread] -= 1
+            if not self._batching[thread]:
+                del self._batching[thread]
+                self.pipe_flush()
+
+    def pipe_send(self, pipe, event):
+        self.is_picklable(event)
+        self.compress(event)
+
+        try:
+            self._sendq[pipe].append(event)
+        except KeyError:
+            self._sendq[pipe] = [event]
 
-        # If the event is being sent by resending task
-        # then dont append here, task will put back the
-        # event at right location
-        if not resending:
-            # If couldnt send event.. stash it so that
-            # resender task will send event again
-            self._stashq.append(event)
-            return False
+        if (eventlet.getcurrent() in self._batching and
+                len(self._sendq[pipe]) < PIPE_MAX_BATCH):
+            return True
+        return self._pipe_flush(pipe)
 
     def _fork(self, args):
         proc = PROCESS(target=self.child, args=args)
@@ -318,34 +417,62 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
         proc.start()
         return proc
 
+    def _resend_stashed(self):
+        """Resend all the stashed events, one frame per pipe. """
+        frames = collections.OrderedDict()
+        while self._stashq:
+            event = self._stashq.popleft()
+            if self.PROCESS_TYPE != "worker":
+                evm = self._manager._get_event_manager(event.desc.worker)
+                if not evm:
+                    message = ("(event - %s) - worker gone, "
+                               "dropping stashed event" % (event.identify()))
+                    LOG.error(message)
+                    continue
+                pipe = evm._pipe
+            else:
+                pipe = self._pipe
+            try:
+                frames[pipe].append(event)
+            except KeyError:
+                frames[pipe] = [event]
+
+        unsent = []
+        for pipe, events in six.iteritems(frames):
+            LOG.debug("Resending %d events", (len(events)))
+            for i in range(0, len(events), PIPE_MAX_BATCH):
+                frame = events[i:i + PIPE_MAX_BATCH]
+                if not self._pipe_send_frame(pipe, frame):
+                    unsent += events[i:]
+                    break
+        # Put back in front
+        self._stashq.extendleft(reversed(unsent))
+
     def _resending_task(self):
         while(True):
+            # Sleep till an event is stashed
+            if not self._stashq:
+                self._stash_sem.acquire()
             try:
-                event = self._stashq.popleft()
-                if self.PROCESS_TYPE != "worker":
-                    evm = self._manager._get_event_manager(event.desc.worker)
-                    LOG.debug("Resending event - %s", (event.identify()))
-                    sent = self.pipe_send(evm._pipe, event, resending=True)
-                else:
-                    sent = self.pipe_send(self._pipe, event, resending=True)
-                # Put back in front
-                if not sent:
-                    self._stashq.appendleft(event)
-            except IndexError:
-                pass
+                self._resend_stashed()
             except Exception as e:
                 message = ("Unexpected exception - %r - while"
-                    "sending event - %s" % (e, event.identify()))
+                    "resending events" % (e))
                 LOG.error(message)
 
-            eventlet.greenthread.sleep(0.1)
+            if self._stashq:
+                eventlet.greenthread.sleep(RESEND_BACKOFF)
 
     def _manager_task(self):
+        ready = None
         while True:
             # Run 'Manager' here to monitor for workers and
             # events.
-            self._manager.manager_run()
-            eventlet.greenthread.sleep(0.1)
+            self._manager.manager_run(ready=ready)
+            # Sleep till a worker has sent events, manager is
+            # woken up or the idle timeout.
+            ready = self._manager.wait_for_events(
+                timeout=MANAGER_IDLE_TIMEOUT)
 
     def _update_manager(self):
         childs = self.get_childrens()
@@ -441,9 +568,11 @@ class NfpController(nfp_launcher.NfpLauncher, NfpService):
 
     def report_state(self):
         """Invoked by report_task to report states of all agents. """
+        stats = self._manager.get_latency_stats()
+        LOG.debug("NFP manager latency stats - %s", (stats))
         for value in self._rpc_agents.itervalues():
             for agent in value['agents']:
-                agent.report_state()
+                agent.report_state(stats=stats)
 
     def _verify_graph(self, graph):
         """Checks for sanity of a graph definition.
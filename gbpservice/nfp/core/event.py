@@ -93,6 +93,8 @@ class EventDesc(object):
         self.path_key = kwargs.get('path_key')
         # Marks whether an event was acked or not
         self.acked = False
+        # Time at which the event was posted, for latency stats
+        self.posted_at = kwargs.get('posted_at')
 
     def from_desc(self, desc):
         self.type = desc.type
@@ -302,19 +304,32 @@ class NfpEventHandlers(object):
 
 class NfpEventManager(object):
 
-    def __init__(self, conf, controller, sequencer, pipe=None, pid=-1):
+    def __init__(self, conf, controller, sequencer, pipe=None, pid=-1,
+                 scheduler=None):
         self._conf = conf
         self._controller = controller
         # PID of process to which this event manager is associated
         self._pid = pid
         # Duplex pipe to read & write events
         self._pipe = pipe
-        # Cache of UUIDs of events which are dispatched to
-        # the worker which is handled by this em.
-        self._cache = deque()
+        # Worker scheduler to be informed of load changes
+        self._scheduler = scheduler
+        # Index of UUIDs of events which are dispatched to
+        # the worker which is handled by this em, in dispatch order.
+        self._cache = collections.OrderedDict()
         # Load on this event manager - num of events pending to be completed
         self._load = 0
 
+    @property
+    def _load(self):
+        return self.__load
+
+    @_load.setter
+    def _load(self, load):
+        self.__load = load
+        if self._scheduler:
+            self._scheduler.update(self._pid, load)
+
     def _log_meta(self, event=None):
         if event:
             return "(event - %s) - (event_manager - %d)" % (
@@ -331,11 +346,7 @@ class NfpEventManager(object):
         """
         events = []
         try:
-            ret = pipe.poll(timeout)
-            if ret:
-                event = self._controller.pipe_recv(pipe)
-                if event:
-                    events.append(event)
+            events = self._controller.pipe_recv_all(pipe, timeout=timeout)
         except multiprocessing.TimeoutError as err:
             message = "%s" % (err)
             LOG.exception(message)
@@ -373,10 +384,10 @@ class NfpEventManager(object):
         message = "%s - pop event" % (self._log_meta(event))
         LOG.debug(message)
         try:
-            self._cache.remove(event.desc.uuid)
+            del self._cache[event.desc.uuid]
             self._load -= 1
-        except ValueError as verr:
-            verr = verr
+        except KeyError as kerr:
+            kerr = kerr
             message = "%s - event not in cache" % (
                 self._log_meta(event))
             LOG.debug(message)
@@ -403,7 +414,7 @@ class NfpEventManager(object):
         self._load = (self._load + 1) if inc_load else self._load
         # Add to the cache
         if cache:
-            self._cache.append(event.desc.uuid)
+            self._cache[event.desc.uuid] = None
 
     def event_watcher(self, timeout=0.01):
         """Watch for events. """
@@ -10,9 +10,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import errno
+import heapq
 import os
+import select
 import six
+import time
 
+from gbpservice.nfp.core import common as nfp_common
 from gbpservice.nfp.core import event as nfp_event
 from gbpservice.nfp.core import executor as nfp_executor
 from gbpservice.nfp.core import log as nfp_logging
@@ -48,6 +54,56 @@ def IS_PATH_COMPLETE_EVENT(event):
     return event.id == 'PATH_COMPLETE'
 
 
+"""Picks the least loaded worker.
+
+    Keeps a heap of (load, rank, pid) entries, a new entry is
+    pushed on every load change and outdated entries are
+    discarded lazily when they reach the top. Ties are broken
+    by the order in which workers were added.
+"""
+
+
+class WorkerScheduler(object):
+
+    def __init__(self):
+        self._heap = []
+        # Current load of each worker - {'pid': load}
+        self._loads = {}
+        # Order in which workers were added - {'pid': rank}
+        self._ranks = {}
+        self._next_rank = 0
+
+    def add(self, pid, load=0):
+        self._ranks[pid] = self._next_rank
+        self._next_rank += 1
+        self.update(pid, load)
+
+    def remove(self, pid):
+        self._loads.pop(pid, None)
+        self._ranks.pop(pid, None)
+
+    def update(self, pid, load):
+        if pid not in self._ranks:
+            return
+        self._loads[pid] = load
+        heapq.heappush(self._heap, (load, self._ranks[pid], pid))
+        # Rebuild when outdated entries outnumber the live ones.
+        if len(self._heap) > 2 * len(self._loads) + 32:
+            self._heap = [(wload, self._ranks[wpid], wpid)
+                          for wpid, wload in six.iteritems(self._loads)]
+            heapq.heapify(self._heap)
+
+    def pick(self):
+        """Returns pid of the least loaded worker. """
+        while self._heap:
+            load, rank, pid = self._heap[0]
+            if self._loads.get(pid) == load and (
+                    self._ranks.get(pid) == rank):
+                return pid
+            heapq.heappop(self._heap)
+        return None
+
+
 """Manages the forked childs.
 
     Invoked periodically, compares the alive childs with
@@ -101,7 +157,9 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
         self._conf = conf
         self._controller = controller
         # Process, Event mixin, {'pid': event_manager}
-        self._resource_map = {}
+        self._resource_map = collections.OrderedDict()
+        # Least loaded worker selection
+        self._worker_scheduler = WorkerScheduler()
         # Cache of event objects - {'uuid':<event>}
         self._event_cache = {}
         # watchdog object mapping with event id - {'uuid':<watchdog>}
@@ -112,6 +170,14 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
         self._event_sequencer = nfp_sequencer.EventSequencer()
         # Graph executor
         self.graph_executor = NfpGraphExecutor(self)
+        # Self pipe to wake the manager loop waiting on worker pipes
+        self._wakeup_rfd, self._wakeup_wfd = os.pipe()
+        # Time at which wakeup was requested, None if not pending
+        self._wakeup_at = None
+        # Latency from event post to dispatch to a worker
+        self._dispatch_latency = nfp_common.LatencyHistogram()
+        # Latency from wakeup request to manager run
+        self._wakeup_latency = nfp_common.LatencyHistogram()
 
         NfpProcessManager.__init__(self, conf, controller)
         NfpEventManager.__init__(self, conf, controller, self._event_sequencer)
@@ -126,22 +192,60 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
             :param process: Context of new process.
             :param pipe: Pipe to communicate with this child.
         """
+        self._worker_scheduler.add(pid)
         ev_manager = NfpEventManager(
             self._conf, self._controller,
             self._event_sequencer,
-            pipe=pipe, pid=pid)
-        self._resource_map.update(dict({pid: ev_manager}))
+            pipe=pipe, pid=pid, scheduler=self._worker_scheduler)
+        self._resource_map[pid] = ev_manager
         super(NfpResourceManager, self).new_child(pid, pipe)
 
-    def manager_run(self):
+    def manager_run(self, ready=None):
         """Invoked periodically to check on resources.
 
             a) Checks if childrens are active or any killed.
             b) Checks if there are messages from any of workers.
             c) Dispatches the events ready to be handled to workers.
+
+            :param ready: pids of workers with events pending on
+                pipe, None to check all the workers.
         """
+        if self._wakeup_at:
+            self._wakeup_latency.record(time.time() - self._wakeup_at)
+            self._wakeup_at = None
         self._child_watcher()
-        self._event_watcher()
+        self._event_watcher(ready=ready)
+
+    def wakeup(self):
+        """Wake the manager loop to run sequencer & paths. """
+        if not self._wakeup_at:
+            self._wakeup_at = time.time()
+            os.write(self._wakeup_wfd, b'w')
+
+    def wait_for_events(self, timeout=None):
+        """Wait till a worker pipe is readable or manager is woken up.
+
+            Returns: pids of workers with events pending on pipe.
+        """
+        fds = {}
+        for pid, event_manager in six.iteritems(self._resource_map):
+            fds[event_manager._pipe.fileno()] = pid
+        try:
+            readable, _, _ = select.select(
+                list(fds) + [self._wakeup_rfd], [], [], timeout)
+        except (select.error, IOError, OSError) as err:
+            # Interrupted by SIGALRM of watchdog
+            if err.args[0] != errno.EINTR:
+                message = "Failed to wait on worker pipes - %r" % (err)
+                LOG.error(message)
+            return []
+        if self._wakeup_rfd in readable:
+            os.read(self._wakeup_rfd, 4096)
+        return [fds[fd] for fd in readable if fd in fds]
+
+    def get_latency_stats(self):
+        return {'dispatch': self._dispatch_latency.to_dict(),
+                'wakeup': self._wakeup_latency.to_dict()}
 
     def get_event(self, event_id):
         return self._event_cache[event_id]
@@ -153,9 +257,11 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
 
     def _dispatch_event(self, event):
         """Dispatch event to a worker. """
-        load_info = self._load_init()
-        event_manager, load_info = self._get_min_loaded_em(load_info)
+        pid = self._worker_scheduler.pick()
+        event_manager = self._resource_map[pid]
         event_manager.dispatch_event(event)
+        if event.desc.posted_at:
+            self._dispatch_latency.record(time.time() - event.desc.posted_at)
 
     def _graph_event(self, event):
         if isinstance(event.desc.graph, dict):
@@ -319,24 +425,33 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
             to pollq.
 
         """
-        for event in events:
-            message = "%s - processing event" % (event.identify())
-            LOG.debug(message)
-            if IS_PATH_COMPLETE_EVENT(event):
-                self._handle_path_complete(event)
-            elif IS_SCHEDULED_EVENT_ACK(event):
-                self._scheduled_event_ack(event)
-            elif IS_SCHEDULED_NEW_EVENT(event):
-                if IS_EVENT_GRAPH(event):
-                    self._graph_event(event)
-                else:
-                    self._scheduled_new_event(event)
-            elif IS_EVENT_COMPLETE(event):
-                self._scheduled_event_complete(event)
+        # Events dispatched to workers are coalesced into
+        # one frame per worker pipe.
+        with self._controller.pipe_batch():
+            for event in events:
+                self._process_event(event)
+        # Sequencer & paths may have events unblocked now
+        if events:
+            self.wakeup()
+
+    def _process_event(self, event):
+        message = "%s - processing event" % (event.identify())
+        LOG.debug(message)
+        if IS_PATH_COMPLETE_EVENT(event):
+            self._handle_path_complete(event)
+        elif IS_SCHEDULED_EVENT_ACK(event):
+            self._scheduled_event_ack(event)
+        elif IS_SCHEDULED_NEW_EVENT(event):
+            if IS_EVENT_GRAPH(event):
+                self._graph_event(event)
             else:
-                self._non_schedule_event(event)
+                self._scheduled_new_event(event)
+        elif IS_EVENT_COMPLETE(event):
+            self._scheduled_event_complete(event)
+        else:
+            self._non_schedule_event(event)
 
-    def _event_watcher(self):
+    def _event_watcher(self, ready=None):
         """Watches for events for each event manager.
 
             Invokes each event manager to get events from workers.
@@ -347,7 +462,10 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
         events = self._event_sequencer.run()
         events += nfp_path.run()
         for pid, event_manager in six.iteritems(self._resource_map):
-            events += event_manager.event_watcher(timeout=0.01)
+            if ready is None:
+                events += event_manager.event_watcher(timeout=0.01)
+            elif pid in ready:
+                events += event_manager.event_watcher(timeout=0)
         # Process the type of events received, dispatch only the
         # required ones.
         self.process_events(events)
@@ -398,22 +516,7 @@ class NfpResourceManager(NfpProcessManager, NfpEventManager):
             new_proc = new.pop()
             self._replace_child(killed_proc, new_proc)
             del self._resource_map[killed_proc]
-
-    def _load_init(self):
-        """Intializes load with current information. """
-        load_info = []
-        for pid, event_manager in six.iteritems(self._resource_map):
-            load = event_manager.get_load()
-            load_info.append([event_manager, load, pid])
-
-        return load_info
-
-    def _get_min_loaded_em(self, load_info):
-        """Returns the min loaded event_manager. """
-        minloaded = min(load_info, key=lambda x: x[1])
-        load = minloaded[1] + 1
-        load_info[load_info.index(minloaded)][1] = load
-        return minloaded[0], load_info
+            self._worker_scheduler.remove(killed_proc)
 
     def _get_event_manager(self, pid):
         """Returns event manager of a process. """
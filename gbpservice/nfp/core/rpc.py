@@ -105,11 +105,11 @@ class RpcAgent(object):
         if report_state:
             self._report_state = ReportState(report_state)
 
-    def report_state(self):
+    def report_state(self, stats=None):
         if hasattr(self, '_report_state'):
             LOG.debug("Agent (%s) reporting state",
                       (self.identify()))
-            self._report_state.report()
+            self._report_state.report(stats=stats)
 
     def identify(self):
         return "(host=%s,topic=%s)" % (self.host, self.topic)
@@ -133,8 +133,11 @@ class ReportState(object):
         self._state_rpc = n_agent_rpc.PluginReportStateAPI(
             self._topic)
 
-    def report(self):
+    def report(self, stats=None):
         try:
+            if stats:
+                configurations = self._data.setdefault('configurations', {})
+                configurations['nfp_latency'] = stats
             LOG.debug("Reporting state with data (%s)",
                       (self._data))
             self._state_rpc.report_state(self._n_context, self._data)
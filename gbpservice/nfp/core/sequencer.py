@@ -27,7 +27,12 @@ class SequencerEmpty(Exception):
 class SequencerBusy(Exception):
     pass
 
-"""Sequences the events. """
+"""Sequences the events.
+
+    Events with the same binding key are scheduled one after the
+    other. Keys which have an event waiting and none in progress
+    are kept in a ready index, so run() only visits those keys.
+"""
 
 
 class EventSequencer(object):
@@ -40,13 +45,14 @@ class EventSequencer(object):
             # Currently scheduled event
             self._scheduled = None
 
-        def _is_busy(self):
-            if self._scheduled:
-                raise SequencerBusy
+        def is_busy(self):
+            return self._scheduled is not None
+
+        def is_empty(self):
+            return not len(self._waitq)
 
-        def _is_empty(self):
-            if not len(self._waitq):
-                raise SequencerEmpty
+        def is_ready(self):
+            return not self.is_busy() and not self.is_empty()
 
         def sequence(self, event):
             self._waitq.append(event)
@@ -55,12 +61,11 @@ class EventSequencer(object):
             """Run to get event to be scheduled.
 
                 If sequencer is busy - i.e, an event is already
-                scheduled and in progress raises busy except.
-                If sequencer is empty - i.e, no event in sequencer
-                raises empty except.
+                scheduled and in progress or if sequencer is
+                empty - i.e, no event in sequencer, returns None.
             """
-            self._is_busy()
-            self._is_empty()
+            if not self.is_ready():
+                return None
             # Pop the first element in the queue - FIFO
             self._scheduled = self._waitq.popleft()
             return self._scheduled
@@ -84,53 +89,58 @@ class EventSequencer(object):
         # Sequence of related events
         # {key: sequencer()}
         self._sequencer = {}
+        # Keys ready to schedule an event, in the order they got ready
+        self._ready = collections.OrderedDict()
 
     def sequence(self, key, event):
         try:
-            self._sequencer[key].sequence(event)
+            sequencer = self._sequencer[key]
         except KeyError:
-            self._sequencer[key] = self.Sequencer()
-            self._sequencer[key].sequence(event)
+            sequencer = self._sequencer[key] = self.Sequencer()
+        sequencer.sequence(event)
+        if sequencer.is_ready():
+            self._ready[key] = None
         message = "Sequenced event - %s" % (event.identify())
         LOG.debug(message)
 
     def run(self):
         events = []
-        # Loop over copy and delete from original
-        sequencers = dict(self._sequencer)
-        for key, sequencer in six.iteritems(sequencers):
-            try:
-                event = sequencer.run()
-                if event:
-                    message = "Desequenced event - %s" % (
-                        event.identify())
-                    LOG.debug(message)
-                    event.sequence = False
-                    events.append(event)
-            except SequencerBusy as exc:
-                pass
-            except SequencerEmpty as exc:
-                exc = exc
-                message = "Sequencer empty"
+        # Keys getting ready while running are picked in next run
+        ready, self._ready = self._ready, collections.OrderedDict()
+        for key in ready:
+            sequencer = self._sequencer.get(key)
+            event = sequencer.run() if sequencer else None
+            if event:
+                message = "Desequenced event - %s" % (
+                    event.identify())
                 LOG.debug(message)
-                del self._sequencer[key]
+                event.sequence = False
+                events.append(event)
         return events
 
     def pop(self):
         events = []
-        sequencers = dict(self._sequencer)
-        for key, sequencer in six.iteritems(sequencers):
+        for key, sequencer in six.iteritems(self._sequencer):
             events += sequencer.pop()
+        self._sequencer.clear()
+        self._ready.clear()
         return events
 
     def release(self, key, event):
         try:
             message = "(event - %s) checking to release" % (event.identify())
             LOG.debug(message)
-            if self._sequencer[key].is_scheduled(event):
+            sequencer = self._sequencer[key]
+            if sequencer.is_scheduled(event):
                 message = "(event - %s) Releasing sequencer" % (
                     event.identify())
                 LOG.debug(message)
-                self._sequencer[key].release()
+                sequencer.release()
+                if sequencer.is_empty():
+                    message = "Sequencer empty"
+                    LOG.debug(message)
+                    del self._sequencer[key]
+                else:
+                    self._ready[key] = None
         except KeyError:
             return
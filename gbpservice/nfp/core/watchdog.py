@@ -12,6 +12,7 @@
 
 
 import heapq
+import math
 import signal
 from time import time
 
@@ -20,13 +21,6 @@ from gbpservice.nfp.core import log as nfp_logging
 
 LOG = nfp_logging.getLogger(__name__)
 
-alarmlist = []
-
-__new_alarm = lambda t, f, a, k: (t + time(), f, a, k)
-__next_alarm = lambda: int(
-    round(alarmlist[0][0] - time())) if alarmlist else None
-__set_alarm = lambda: signal.alarm(max(__next_alarm(), 1))
-
 
 class Watchdog(object):
 
@@ -54,60 +48,161 @@ class Watchdog(object):
             LOG.error(message)
 
 
+class Timer(object):
+
+    __slots__ = ('expiry', 'func', 'args', 'keys', 'cancelled')
+
+    def __init__(self, expiry, func, args, keys):
+        self.expiry = expiry
+        self.func = func
+        self.args = args
+        self.keys = keys
+        self.cancelled = False
+
+
+"""Hashed timer wheel with one second ticks.
+
+    Timers are bucketed by the second in which they expire,
+    arming and cancelling a timer is O(1). Cancelled timers
+    are left in their slot and skipped when the slot expires.
+    SIGALRM is raised only when the earliest slot holding an
+    armed timer is due.
+"""
+
+
+class TimerWheel(object):
+
+    def __init__(self):
+        # {second: [Timer]}
+        self._slots = {}
+        # Heap of the seconds having a slot
+        self._seconds = []
+        # Second the alarm is raised at, None when not raised
+        self.armed = None
+        # Number of armed timers, excludes cancelled ones
+        self._count = 0
+        # Last second whose slot is expired
+        self._last_tick = int(time())
+
+    def __len__(self):
+        return self._count
+
+    def add(self, timer):
+        if not self._count:
+            # Wheel is idle, nothing to catch up on
+            self._slots.clear()
+            self._seconds = []
+            self._last_tick = int(time())
+        second = max(int(math.ceil(timer.expiry)), self._last_tick + 1)
+        try:
+            self._slots[second].append(timer)
+        except KeyError:
+            self._slots[second] = [timer]
+            heapq.heappush(self._seconds, second)
+        self._count += 1
+        return second
+
+    def cancel(self, timer):
+        if timer.cancelled:
+            raise ValueError("Timer already expired or cancelled")
+        timer.cancelled = True
+        self._count -= 1
+
+    def expire(self, now):
+        """Returns the timers due till now, in expiry order. """
+        due = []
+        now = int(now)
+        while self._seconds and self._seconds[0] <= now:
+            second = heapq.heappop(self._seconds)
+            for timer in self._slots.pop(second):
+                if not timer.cancelled:
+                    timer.cancelled = True
+                    self._count -= 1
+                    due.append(timer)
+        self._last_tick = max(self._last_tick, now)
+        return due
+
+    def next_expiry(self):
+        """Returns the earliest second holding an armed timer. """
+        while self._seconds:
+            second = self._seconds[0]
+            if any(not timer.cancelled for timer in self._slots[second]):
+                return second
+            # Only cancelled timers left, drop the slot
+            heapq.heappop(self._seconds)
+            del self._slots[second]
+        return None
+
+
+wheel = TimerWheel()
+
+
+def __set_alarm():
+    """Raise SIGALRM when the earliest armed timer is due. """
+    second = wheel.next_expiry() if len(wheel) else None
+    wheel.armed = second
+    if second is None:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    else:
+        # Zero would disarm, a slot already due fires right away
+        signal.setitimer(signal.ITIMER_REAL, max(second - time(), 0.001))
+
+
 def __clear_alarm():
-    """Clear an existing alarm.
+    """Disarm the alarm before the wheel is changed.
 
-    If the alarm signal was set to a callable other than our own, queue the
-    previous alarm settings.
+    The handler changes the wheel too, it must not run halfway through
+    an update. If the alarm signal was set to a callable other than our
+    own, queue the previous alarm settings.
     """
-    oldsec = signal.alarm(0)
-    oldfunc = signal.signal(signal.SIGALRM, __alarm_handler)
-    if oldsec > 0 and oldfunc != __alarm_handler:
-        heapq.heappush(alarmlist, (__new_alarm(oldsec, oldfunc, [], {})))
+    if signal.getsignal(signal.SIGALRM) != __alarm_handler:
+        oldsec = signal.alarm(0)
+        oldfunc = signal.signal(signal.SIGALRM, __alarm_handler)
+        if oldsec > 0 and callable(oldfunc):
+            wheel.add(Timer(oldsec + time(), oldfunc,
+                            (signal.SIGALRM, None), {}))
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    wheel.armed = None
 
 
 def __alarm_handler(*zargs):
-    """Handle an alarm by calling any due heap entries and resetting the alarm.
+    """Handle an alarm by calling the due timers and resetting the alarm.
 
-    Note that multiple heap entries might get called, especially if calling an
-    entry takes a lot of time.
+    Note that multiple timers might get called, especially if calling a
+    timer takes a lot of time.
     """
     try:
-        nextt = __next_alarm()
-        while nextt is not None and nextt <= 0:
-            (tm, func, args, keys) = heapq.heappop(alarmlist)
-            func(*args, **keys)
-            nextt = __next_alarm()
+        for timer in wheel.expire(time()):
+            timer.func(*timer.args, **timer.keys)
     finally:
-        if alarmlist:
-            __set_alarm()
+        # A timer may have armed the alarm again
+        __clear_alarm()
+        __set_alarm()
 
 
 def alarm(sec, func, *args, **keys):
     """Set an alarm.
 
     When the alarm is raised in `sec` seconds, the handler will call `func`,
-    passing `args` and `keys`. Return the heap entry (which is just a big
-    tuple), so that it can be cancelled by calling `cancel()`.
+    passing `args` and `keys`. Return the timer, so that it can be cancelled
+    by calling `cancel()`.
     """
     __clear_alarm()
     try:
-        newalarm = __new_alarm(sec, func, args, keys)
-        heapq.heappush(alarmlist, newalarm)
-        return newalarm
+        timer = Timer(sec + time(), func, args, keys)
+        wheel.add(timer)
+        return timer
     finally:
         __set_alarm()
 
 
 def cancel(alarm):
-    """Cancel an alarm by passing the heap entry returned by `alarm()`.
+    """Cancel an alarm by passing the timer returned by `alarm()`.
 
     It is an error to try to cancel an alarm which has already occurred.
     """
     __clear_alarm()
     try:
-        alarmlist.remove(alarm)
-        heapq.heapify(alarmlist)
+        wheel.cancel(alarm)
     finally:
-        if alarmlist:
-            __set_alarm()
+        __set_alarm()
@@ -71,19 +71,25 @@ class NfpWorker(Service):
         eventlet.spawn_n(self.controller._resending_task)
 
         while True:
+            events = []
             try:
-                event = None
-                if self.pipe.poll(0.1):
-                    event = self.controller.pipe_recv(self.pipe)
-                if event:
-                    message = "%s - received event" % (
-                        self._log_meta(event))
-                    LOG.debug(message)
-                    self.controller.decompress(event)
-                    self._process_event(event)
+                events = self.controller.pipe_recv_all(
+                    self.pipe, timeout=0.1)
             except Exception as e:
                 message = "Exception - %s" % (e)
                 LOG.error(message)
+            # Acks & events posted inline are sent as
+            # a single frame to distributor.
+            with self.controller.pipe_batch():
+                for event in events:
+                    try:
+                        message = "%s - received event" % (
+                            self._log_meta(event))
+                        LOG.debug(message)
+                        self._process_event(event)
+                    except Exception as e:
+                        message = "Exception - %s" % (e)
+                        LOG.error(message)
             # Yeild cpu
             time.sleep(0)
 
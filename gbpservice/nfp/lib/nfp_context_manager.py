@@ -11,6 +11,8 @@
 #    under the License.
 
 
+import contextlib
+import threading
 import time
 
 from gbpservice.nfp.core import log as nfp_logging
@@ -20,6 +22,10 @@ LOG = nfp_logging.getLogger(__name__)
 
 sql_lock_support = True
 
+GLOBAL_LOCK_KEY = 'db_lock'
+# MySQL limits the length of a named lock
+MAX_LOCK_NAME_LEN = 64
+
 
 class ContextManager(object):
 
@@ -64,19 +70,100 @@ class ContextManager(object):
         return method(*args, **kwargs)
 
 
+class LockTable(object):
+    """In process table of locks, one per key.
+
+    Locks are created on first use and dropped once no one holds
+    or waits for them, so the table only grows with the number of
+    keys locked concurrently.
+    """
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        # {key: [lock, refcount]}
+        self._locks = {}
+
+    def __len__(self):
+        return len(self._locks)
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+class DbLockManager(object):
+    """Serializes DB updates of the same NFP resource.
+
+    Updates are locked on the id of the resource being modified
+    (network function, instance or device), so that updates of
+    independent service chains run in parallel. With MySQL a named
+    lock per key is taken, which serializes the update across all
+    workers and controllers sharing the database. Other backends,
+    like SQLite in unit tests, lock in process only.
+    """
+
+    def __init__(self):
+        self._table = LockTable()
+
+    @staticmethod
+    def lock_name(key):
+        return ('nfp_%s' % key)[:MAX_LOCK_NAME_LEN]
+
+    @staticmethod
+    def _is_mysql(session):
+        bind = getattr(session, 'bind', None)
+        dialect = getattr(bind, 'dialect', None)
+        return getattr(dialect, 'name', None) == 'mysql'
+
+    @contextlib.contextmanager
+    def lock(self, session, key):
+        if not self._is_mysql(session):
+            with self._table.lock(key):
+                yield
+            return
+        name = self.lock_name(key)
+        session.execute("SELECT GET_LOCK(:name, -1)", {'name': name})
+        try:
+            yield
+        finally:
+            # Named locks are bound to the connection and outlive a
+            # rolled back transaction, always release them.
+            session.execute("SELECT RELEASE_LOCK(:name)", {'name': name})
+
+
 class NfpDbContextManager(ContextManager):
 
+    lock_manager = DbLockManager()
+
     def new(self, **kwargs):
         return NfpDbContextManager(**kwargs)
 
     def lock(self, session, method, *args, **kwargs):
+        """Call the db method holding the lock of the updated resource.
+
+        The lock is keyed on 'lock_key' when passed, otherwise on the
+        first argument of the method, which is the id of the resource
+        for the update_* methods of the NFP db. Without either, the
+        global lock is taken.
+        """
+        key = kwargs.pop('lock_key', None)
+        if key is None:
+            key = args[0] if args else GLOBAL_LOCK_KEY
         if not sql_lock_support:
             return method(session, *args, **kwargs)
         with session.begin(subtransactions=True):
-            session.execute("SELECT GET_LOCK('nfp_db_lock', -1)")
-            ret = method(session, *args, **kwargs)
-            session.execute("SELECT RELEASE_LOCK('nfp_db_lock')")
-            return ret
+            with self.lock_manager.lock(session, key):
+                return method(session, *args, **kwargs)
 
     def __enter__(self):
         super(NfpDbContextManager, self).__enter__()
@@ -10,6 +10,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import exceptions
 import httplib
 import httplib2
@@ -18,6 +19,7 @@ import zlib
 import six.moves.urllib.parse as urlparse
 import socket
 
+from oslo_config import cfg
 from oslo_serialization import jsonutils
 
 from gbpservice._i18n import _
@@ -25,6 +27,18 @@ from gbpservice.nfp.core import log as nfp_logging
 
 LOG = nfp_logging.getLogger(__name__)
 
+unix_rest_opts = [
+    cfg.IntOpt('unix_pool_maxsize',
+               default=4,
+               help='Max number of keep-alive connections kept open '
+                    'to the unix rest server'),
+]
+
+cfg.CONF.register_opts(unix_rest_opts, "REST")
+
+# Requests sent and connections opened to the unix rest server
+pool_stats = {'requests': 0, 'connections': 0}
+
 
 class RestClientException(exceptions.Exception):
 
@@ -35,14 +49,16 @@ class UnixHTTPConnection(httplib.HTTPConnection):
 
     """Connection class for HTTP over UNIX domain socket."""
 
+    socket_path = '/var/run/uds_socket'
+
     def __init__(self, host, port=None, strict=None, timeout=None,
                  proxy_info=None):
         httplib.HTTPConnection.__init__(self, host, port, strict)
         self.timeout = timeout
-        self.socket_path = '/var/run/uds_socket'
 
     def connect(self):
         """Method used to connect socket server."""
+        pool_stats['connections'] += 1
         self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
         if self.timeout:
             self.sock.settimeout(self.timeout)
@@ -53,17 +69,54 @@ class UnixHTTPConnection(httplib.HTTPConnection):
                 _("Caught exception socket.error : %s") % exc)
 
 
+class HttpPool(object):
+
+    """Pool of httplib2 clients, each keeping its connection alive.
+
+    A client serves one request at a time, it is taken out of the
+    pool for the request and given back once the response is read.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._free = collections.deque()
+
+    def get(self):
+        try:
+            return self._free.pop()
+        except IndexError:
+            return httplib2.Http()
+
+    def put(self, http):
+        if len(self._free) < self.max_size:
+            self._free.append(http)
+
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = HttpPool(cfg.CONF.REST.unix_pool_maxsize)
+    return _pool
+
+
 class UnixRestClient(object):
 
     def _http_request(self, url, method_type, headers=None, body=None):
         try:
-            h = httplib2.Http()
+            pool = _get_pool()
+            h = pool.get()
+            pool_stats['requests'] += 1
             resp, content = h.request(
                 url,
                 method=method_type,
                 headers=headers,
                 body=body,
                 connection_type=UnixHTTPConnection)
+            # Failed clients are dropped, with their connection
+            pool.put(h)
             return resp, content
 
         except httplib2.ServerNotFoundError:
@@ -140,11 +193,11 @@ class UnixRestClient(object):
                             {'st': resp.status, 'reason': resp.reason})
 
 
-def get(path):
+def get(path, headers=None):
     """Implements get method for unix restclient
     Return:Http Response
     """
-    return UnixRestClient().send_request(path, 'GET')
+    return UnixRestClient().send_request(path, 'GET', headers=headers)
 
 
 def put(path, body):
@@ -17,6 +17,7 @@ from gbpservice._i18n import _
 from gbpservice.nfp.common import constants as nfp_constants
 from gbpservice.nfp.core import log as nfp_logging
 from gbpservice.nfp.lib import rest_client_over_unix as unix_rc
+from gbpservice.nfp.pecan import constants as pecan_constants
 
 from neutron.common import rpc as n_rpc
 from neutron import context as n_context
@@ -27,6 +28,7 @@ import oslo_messaging as messaging
 from oslo_serialization import jsonutils
 
 import requests
+from requests import adapters
 import six
 
 LOG = nfp_logging.getLogger(__name__)
@@ -37,6 +39,10 @@ rest_opts = [
                default='', help='Rest connection IpAddr'),
     cfg.IntOpt('rest_server_port',
                default=8080, help='Rest connection Port'),
+    cfg.IntOpt('pool_maxsize',
+               default=10,
+               help='Max number of keep-alive connections kept open '
+                    'to the rest server'),
 ]
 
 rpc_opts = [
@@ -58,6 +64,35 @@ class RestClientException(exceptions.Exception):
 
     """ RestClient Exception """
 
+# {'<address>:<port>': requests.Session}
+_sessions = {}
+
+
+def _get_session(rest_server_address, rest_server_port):
+    """Returns the session of a rest server, with its connection pool. """
+    endpoint = '%s:%s' % (rest_server_address, rest_server_port)
+    session = _sessions.get(endpoint)
+    if session is None:
+        session = requests.Session()
+        session.mount('http://', adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=cfg.CONF.REST.pool_maxsize))
+        _sessions[endpoint] = session
+    return session
+
+
+def get_pool_stats():
+    """Returns requests sent and connections opened per rest server. """
+    stats = {}
+    for endpoint, session in six.iteritems(_sessions):
+        adapter = session.get_adapter('http://%s' % endpoint)
+        pools = adapter.poolmanager.pools
+        stats[endpoint] = {
+            'requests': sum(pools[key].num_requests for key in pools.keys()),
+            'connections': sum(pools[key].num_connections
+                               for key in pools.keys())}
+    return stats
+
 """ Common Class to handle restclient request"""
 
 
@@ -67,6 +102,7 @@ class RestApi(object):
         self.rest_server_address = rest_server_address
         self.rest_server_port = rest_server_port
         self.url = "http://%s:%s/v1/nfp/%s"
+        self._session = _get_session(rest_server_address, rest_server_port)
 
     def _response(self, resp, url):
         success_code = [200, 201, 202, 204]
@@ -122,8 +158,8 @@ class RestApi(object):
             # to send data to the rest-server.
             headers = {"content-type": "application/json",
                        "method-type": method_type}
-            resp = requests.post(url, data,
-                                 headers=headers)
+            resp = self._session.post(url, data,
+                                      headers=headers)
             message = "POST url %s %d" % (url, resp.status_code)
             LOG.info(message)
             return self._response(resp, url)
@@ -142,8 +178,8 @@ class RestApi(object):
         data = jsonutils.dumps(body)
         try:
             headers = {"content-type": "application/json"}
-            resp = requests.put(url, data,
-                                headers=headers)
+            resp = self._session.put(url, data,
+                                     headers=headers)
             message = "PUT url %s %d" % (url, resp.status_code)
             LOG.info(message)
             return self._response(resp, url)
@@ -152,7 +188,7 @@ class RestApi(object):
                 url, rce)
             LOG.error(message)
 
-    def get(self, path):
+    def get(self, path, headers=None):
         """Get restclient request handler
         Return:Http response
         """
@@ -160,9 +196,10 @@ class RestApi(object):
             self.rest_server_address,
             self.rest_server_port, path)
         try:
-            headers = {"content-type": "application/json"}
-            resp = requests.get(url,
-                                headers=headers)
+            headers = dict(headers or {})
+            headers.update({"content-type": "application/json"})
+            resp = self._session.get(url,
+                                     headers=headers)
             message = "GET url %s %d" % (url, resp.status_code)
             LOG.info(message)
             return self._response(resp, url)
@@ -263,9 +300,12 @@ def send_request_to_configurator(conf, context, body,
                              body=body)
 
 
-def get_response_from_configurator(conf):
+def get_response_from_configurator(conf, wait=0):
     """Common function to handle get request for configurator.
     Get notification http response from configurator rest server.
+    With wait, the rest server holds the request up to wait seconds
+    till a notification is available, instead of returning no
+    notifications right away.
     Return:Http Response
     response_data = [
             {'receiver': <neutron/device_orchestrator/service_orchestrator>,
@@ -277,11 +317,15 @@ def get_response_from_configurator(conf):
     """
     # This function reads configuration data and decides
     # method (tcp_rest/ unix_rest/ rpc) for get response from configurator.
+    kwargs = {}
+    if wait:
+        kwargs['headers'] = {
+            pecan_constants.NOTIFICATION_WAIT_HEADER: str(wait)}
     if conf.backend == TCP_REST:
         try:
             rc = RestApi(conf.REST.rest_server_address,
                          conf.REST.rest_server_port)
-            resp = rc.get('get_notifications')
+            resp = rc.get('get_notifications', **kwargs)
             rpc_cbs_data = jsonutils.loads(resp.content)
             return rpc_cbs_data
         except RestClientException as rce:
@@ -299,7 +343,7 @@ def get_response_from_configurator(conf):
 
     elif conf.backend == UNIX_REST:
         try:
-            resp, content = unix_rc.get('get_notifications')
+            resp, content = unix_rc.get('get_notifications', **kwargs)
             content = jsonutils.loads(content)
             if content:
                 message = ("get_notification ->"
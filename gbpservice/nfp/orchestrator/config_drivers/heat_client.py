@@ -9,13 +9,72 @@
 # WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 # License for the specific language governing permissions and limitations
 # under the License.
+import time
+
 from heatclient import client as heat_client
 from heatclient import exc as heat_exc
 
 from gbpservice._i18n import _LW
+from gbpservice.nfp.common import constants as nfp_constants
 from gbpservice.nfp.core import log as nfp_logging
+from gbpservice.nfp.lib import nfp_context_manager as nfp_ctx_mgr
+from gbpservice.nfp.orchestrator.openstack import openstack_driver
 LOG = nfp_logging.getLogger(__name__)
 
+
+class StackStatusTracker(object):
+    """Process wide view of heat stack status, shared by all waiters.
+
+    The stacks of a tenant are listed in one call at most once every
+    refresh interval, and the status checks of all stacks being waited
+    on in that tenant are answered from the listing. Heat load thus
+    grows with the number of tenants rather than with the number of
+    stacks in flight.
+    """
+
+    def __init__(self, refresh_interval=(
+            nfp_constants.STACK_STATUS_REFRESH_INTERVAL)):
+        self.refresh_interval = refresh_interval
+        # {tenant: (listed_at, {stack_id: stack})}
+        self._listings = {}
+        self._locks = nfp_ctx_mgr.LockTable()
+        self.list_calls = 0
+        self.get_calls = 0
+
+    def get(self, heatclient, stack_id):
+        """Returns the stack, as of the last listing of its tenant. """
+        stack = self._listing(heatclient).get(stack_id)
+        if stack is None:
+            # Stacks created since the listing, and deleted stacks,
+            # are not listed
+            self.get_calls += 1
+            stack = heatclient.get(stack_id)
+        return stack
+
+    def _listing(self, heatclient):
+        tenant = heatclient.tenant
+        # Waiters of a tenant share one listing call
+        with self._locks.lock(tenant):
+            entry = self._listings.get(tenant)
+            if entry and time.time() - entry[0] < self.refresh_interval:
+                return entry[1]
+            self.list_calls += 1
+            stacks = dict((stack.id, stack) for stack in heatclient.list())
+            self._listings[tenant] = (time.time(), stacks)
+            return stacks
+
+    def forget(self, tenant, stack_id):
+        """Drops a stack whose status is being changed from the listing. """
+        entry = self._listings.get(tenant)
+        if entry:
+            entry[1].pop(stack_id, None)
+
+    def clear(self):
+        self._listings.clear()
+
+
+stack_tracker = StackStatusTracker()
+
 # We are overriding create and update for now because the upstream
 # heat client class does not take timeout as argument
 
@@ -33,6 +92,8 @@ class HeatClient(object):
         }
         self.client = heat_client.Client(api_version, endpoint, **kwargs)
         self.stacks = self.client.stacks
+        self.tenant = tenant
+        self.auth_token = auth_token
 
         self.timeout_mins = timeout_mins
         # REVISIT(ashu): The base class is a old style class. We have to
@@ -49,7 +110,7 @@ class HeatClient(object):
         }
         fields['template'] = data
         fields['parameters'] = parameters
-        return self.stacks.create(**fields)
+        return self._request(self.stacks.create, **fields)
 
     def update(self, stack_id, data, parameters=None):
         fields = {
@@ -58,14 +119,27 @@ class HeatClient(object):
         }
         fields['template'] = data
         fields['parameters'] = parameters
-        return self.stacks.update(stack_id, **fields)
+        stack_tracker.forget(self.tenant, stack_id)
+        return self._request(self.stacks.update, stack_id, **fields)
 
     def delete(self, stack_id):
+        stack_tracker.forget(self.tenant, stack_id)
         try:
-            self.stacks.delete(stack_id)
+            self._request(self.stacks.delete, stack_id)
         except heat_exc.HTTPNotFound:
             LOG.warning(_LW("Stack %(stack)s created by service chain driver "
                             "is not found at cleanup"), {'stack': stack_id})
 
     def get(self, stack_id):
-        return self.stacks.get(stack_id)
+        return self._request(self.stacks.get, stack_id)
+
+    def list(self):
+        return self._request(self.stacks.list)
+
+    def _request(self, method, *args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except heat_exc.HTTPUnauthorized as ex:
+            # Don't hand out the rejected token again
+            openstack_driver.forget_rejected_token(self.auth_token, ex)
+            raise
@@ -33,6 +33,8 @@ from gbpservice.nfp.core import log as nfp_logging
 from gbpservice.nfp.lib import nfp_context_manager as nfp_ctx_mgr
 from gbpservice.nfp.lib import transport
 from gbpservice.nfp.orchestrator.config_drivers.heat_client import HeatClient
+from gbpservice.nfp.orchestrator.config_drivers.heat_client import (
+    stack_tracker)
 from gbpservice.nfp.orchestrator.db import nfp_db as nfp_db
 from gbpservice.nfp.orchestrator.openstack.openstack_driver import (
     KeystoneClient)
@@ -84,6 +86,7 @@ STACK_ACTION_WAIT_TIME = (
     cfg.CONF.heat_driver.stack_action_wait_time)
 STACK_ACTION_RETRY_WAIT = 5  # Retry after every 5 seconds
 APIC_OWNED_RES = 'apic_owned_res_'
+PORT_LOOKUP_CHUNK_SIZE = 100  # Port ids per bulk port list request
 INTERNET_OUT_EXT_NET_NAME = cfg.CONF.heat_driver.internet_out_network_name
 
 LOG = nfp_logging.getLogger(__name__)
@@ -408,15 +411,26 @@ class HeatDriver(object):
                     filters={'id': ptg.get("policy_targets")})
         else:
             return member_addresses
-        for policy_target in policy_targets:
-            if not self._is_service_target(policy_target):
-                port_id = policy_target.get("port_id")
-                if port_id:
-                    with nfp_ctx_mgr.NeutronContextManager as ncm:
-                        port = ncm.retry(self.neutron_client.get_port,
-                                         auth_token, port_id)['port']
-                    ip_address = port.get('fixed_ips')[0].get("ip_address")
-                    member_addresses.append(ip_address)
+        port_ids = [policy_target['port_id']
+                    for policy_target in policy_targets
+                    if (policy_target.get("port_id") and
+                        not self._is_service_target(policy_target))]
+        if not port_ids:
+            return member_addresses
+        ports = {}
+        # Chunked, to keep the request URI within server limits
+        for i in range(0, len(port_ids), PORT_LOOKUP_CHUNK_SIZE):
+            with nfp_ctx_mgr.NeutronContextManager as ncm:
+                chunk = ncm.retry(
+                    self.neutron_client.list_ports, auth_token,
+                    port_ids=port_ids[i:i + PORT_LOOKUP_CHUNK_SIZE])
+            ports.update((port['id'], port) for port in chunk)
+        # Keep the order of the policy targets, members are chained in it
+        for port_id in port_ids:
+            port = ports.get(port_id)
+            if port:
+                ip_address = port.get('fixed_ips')[0].get("ip_address")
+                member_addresses.append(ip_address)
         return member_addresses
 
     def _generate_lbv2_member_template(self, is_template_aws_version,
@@ -681,17 +695,29 @@ class HeatDriver(object):
                     self.gbp_client.get_policy_target_groups,
                     auth_token, filters)
 
+            consumer_ptgs_details = [
+                consumer for consumer in consumer_ptgs_details
+                if not consumer['proxied_group_id']]
+            subnet_ids = [subnet_id for consumer in consumer_ptgs_details
+                          for subnet_id in consumer['subnets']]
+            consumer_subnets = {}
+            if subnet_ids:
+                with nfp_ctx_mgr.NeutronContextManager as ncm:
+                    consumer_subnets = ncm.retry(
+                        self.neutron_client.get_subnets,
+                        auth_token,
+                        filters={'id': subnet_ids})
+                consumer_subnets = dict(
+                    (subnet['id'], subnet) for subnet in consumer_subnets)
+
             # Revisit(Magesh): What is the name updated below ?? FW or Rule?
             # This seems to have no effect in UTs
             for consumer in consumer_ptgs_details:
-                if consumer['proxied_group_id']:
-                    continue
                 fw_template_properties.update({'name': consumer['id'][:3]})
                 for subnet_id in consumer['subnets']:
-                    with nfp_ctx_mgr.NeutronContextManager as ncm:
-                        subnet = ncm.retry(self.neutron_client.get_subnet,
-                                           auth_token, subnet_id)['subnet']
-                    if subnet['name'].startswith(APIC_OWNED_RES):
+                    subnet = consumer_subnets.get(subnet_id)
+                    if not subnet or subnet['name'].startswith(
+                            APIC_OWNED_RES):
                         continue
 
                     consumer_cidr = subnet['cidr']
@@ -1370,13 +1396,11 @@ class HeatDriver(object):
                 if port_info['port_model'] == nfp_constants.GBP_PORT:
                     policy_target_id = port_info['id']
                     with nfp_ctx_mgr.GBPContextManager as gcm:
-                        port_id = gcm.retry(
+                        policy_target = gcm.retry(
                             self.gbp_client.get_policy_targets,
                             admin_token,
-                            filters={'id': policy_target_id})[0]['port_id']
-                        policy_target = gcm.retry(
-                            self.gbp_client.get_policy_target,
-                            admin_token, policy_target_id)
+                            filters={'id': policy_target_id})[0]
+                    port_id = policy_target['port_id']
                 else:
                     port_id = port_info['id']
 
@@ -1432,7 +1456,7 @@ class HeatDriver(object):
         wait_timeout = timeout_mins * 60 + 30
         while True:
             try:
-                stack = heatclient.get(stack_id)
+                stack = stack_tracker.get(heatclient, stack_id)
                 if stack.stack_status == 'DELETE_FAILED':
                     heatclient.delete(stack_id)
                 elif stack.stack_status == 'CREATE_COMPLETE':
@@ -1520,7 +1544,7 @@ class HeatDriver(object):
         if not heatclient:
             return failure_status
         with nfp_ctx_mgr.HeatContextManager as hcm:
-            stack = hcm.retry(heatclient.get, stack_id)
+            stack = hcm.retry(stack_tracker.get, heatclient, stack_id)
             if stack.stack_status == 'DELETE_FAILED':
                 return failure_status
             elif stack.stack_status == 'CREATE_COMPLETE':
@@ -1553,7 +1577,7 @@ class HeatDriver(object):
         if not heatclient:
             return failure_status
         with nfp_ctx_mgr.HeatContextManager as hcm:
-            stack = hcm.retry(heatclient.get, stack_id)
+            stack = hcm.retry(stack_tracker.get, heatclient, stack_id)
         if stack.stack_status == 'DELETE_FAILED':
             return failure_status
         elif stack.stack_status == 'CREATE_COMPLETE':
@@ -1583,7 +1607,7 @@ class HeatDriver(object):
         if not heatclient:
             return failure_status
         with nfp_ctx_mgr.HeatContextManager as hcm:
-            stack = hcm.retry(heatclient.get, stack_id)
+            stack = hcm.retry(stack_tracker.get, heatclient, stack_id)
             if stack.stack_status == 'DELETE_FAILED':
                 return failure_status
             elif stack.stack_status == 'CREATE_COMPLETE':
@@ -766,6 +766,15 @@ class NFPDbBase(common_db_mixin.CommonDbMixin):
         except exc.NoResultFound:
             return []
 
+    def get_instances_network_function_maps(self, session, sc_instance_ids):
+        with session.begin(subtransactions=True):
+            query = session.query(
+                nfp_db_model.ServiceNodeInstanceNetworkFunctionMapping)
+            query = query.filter(
+                nfp_db_model.ServiceNodeInstanceNetworkFunctionMapping.
+                sc_instance_id.in_(sc_instance_ids))
+            return query.all()
+
     def delete_node_instance_network_function_map(self, session,
                                                   network_function_id):
         try:
@@ -41,6 +41,10 @@ openstack_opts = [
                        default='v2.0', help='Auth protocol used.'),
     oslo_config.StrOpt('auth_uri',
                        default='', help='Auth URI.'),
+    oslo_config.IntOpt('token_refresh_margin',
+                       default=60,
+                       help='Seconds before its expiry a cached keystone '
+                            'token is renewed.'),
 ]
 
 oslo_config.CONF.register_opts(openstack_opts, "nfp_keystone_authtoken")
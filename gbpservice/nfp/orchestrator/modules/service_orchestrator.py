@@ -15,6 +15,7 @@ from neutron import context as n_context
 from neutron.db import api as db_api
 from oslo_log import helpers as log_helpers
 import oslo_messaging
+from sqlalchemy import event as sa_event
 
 from gbpservice._i18n import _
 from gbpservice._i18n import _LE
@@ -427,6 +428,44 @@ class RpcHandlerConfigurator(object):
                            event_data=event_data, serialize=serialize)
 
 
+class NodeDriverNotifierApi(object):
+
+    """Service Orchestrator side of the node driver notifications"""
+    API_VERSION = '1.0'
+    target = oslo_messaging.Target(version=API_VERSION)
+
+    def __init__(self):
+        super(NodeDriverNotifierApi, self).__init__()
+        self.client = n_rpc.get_client(self.target)
+        self.rpc_api = self.client.prepare(
+            version=self.API_VERSION, fanout=True,
+            topic=nfp_rpc_topics.NFP_NODE_DRIVER_CALLBACK_TOPIC)
+
+    def network_function_status_changed(self, network_function_id, status):
+        self.rpc_api.cast(n_context.get_admin_context(),
+                          'network_function_status_changed',
+                          network_function_id=network_function_id,
+                          status=status)
+
+    def network_function_deleted(self, network_function_id):
+        self.rpc_api.cast(n_context.get_admin_context(),
+                          'network_function_deleted',
+                          network_function_id=network_function_id)
+
+
+# session.info key of the node driver notifications sent after commit
+NODE_DRIVER_NOTIFICATIONS = 'nfp_node_driver_notifications'
+
+
+def _send_node_driver_notifications(session):
+    for notify, args in session.info.pop(NODE_DRIVER_NOTIFICATIONS, []):
+        notify(*args)
+
+
+def _discard_node_driver_notifications(session):
+    session.info.pop(NODE_DRIVER_NOTIFICATIONS, None)
+
+
 class NFPDbPatch(nfp_db.NFPDbBase):
 
     """Patch for Db class.
@@ -438,10 +477,13 @@ class NFPDbPatch(nfp_db.NFPDbBase):
     at multiple places, patched the Db class to override update &
     delete network_function methods. Here, the path is completed and
     then the base class methods are invoked to do the actual db operation.
+    The node driver waiting on the network function is notified as well,
+    once the change is committed.
     """
 
     def __init__(self, controller):
         self._controller = controller
+        self.node_driver_notifier = NodeDriverNotifierApi()
         super(NFPDbPatch, self).__init__()
 
     def update_network_function(self, session, network_function_id,
@@ -449,13 +491,38 @@ class NFPDbPatch(nfp_db.NFPDbBase):
         status = updated_network_function.get('status')
         if status == 'ACTIVE' or status == 'ERROR':
             self._controller.path_complete_event()
-        return super(NFPDbPatch, self).update_network_function(
+        network_function = super(NFPDbPatch, self).update_network_function(
             session, network_function_id, updated_network_function)
+        if status == 'ACTIVE' or status == 'ERROR':
+            self._notify_after_commit(
+                session,
+                self.node_driver_notifier.network_function_status_changed,
+                network_function_id, status)
+        return network_function
 
     def delete_network_function(self, session, network_function_id):
         self._controller.path_complete_event()
-        return super(NFPDbPatch, self).delete_network_function(
+        result = super(NFPDbPatch, self).delete_network_function(
             session, network_function_id)
+        self._notify_after_commit(
+            session, self.node_driver_notifier.network_function_deleted,
+            network_function_id)
+        return result
+
+    def _notify_after_commit(self, session, notify, *args):
+        # The node driver reads the network function once notified, so
+        # the notification must not be sent before the change commits.
+        if not session.is_active:
+            notify(*args)
+            return
+        session.info.setdefault(NODE_DRIVER_NOTIFICATIONS, []).append(
+            (notify, args))
+        if not sa_event.contains(session, 'after_commit',
+                                 _send_node_driver_notifications):
+            sa_event.listen(session, 'after_commit',
+                            _send_node_driver_notifications)
+            sa_event.listen(session, 'after_rollback',
+                            _discard_node_driver_notifications)
 
 
 class ServiceOrchestrator(nfp_api.NfpEventHandler):
@@ -10,6 +10,9 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+import time
+
 from gbpclient.v2_0 import client as gbp_client
 from keystoneauth1.identity import v2
 from keystoneauth1.identity import v3
@@ -19,11 +22,79 @@ from keystoneclient.v3 import client as keyclientv3
 from neutronclient.v2_0 import client as neutron_client
 from novaclient import client as nova_client
 from novaclient import exceptions as nova_exc
+from oslo_utils import timeutils
 
 from gbpservice._i18n import _
 from gbpservice.nfp.core import log as nfp_logging
 LOG = nfp_logging.getLogger(__name__)
 
+# Seconds before expiry a cached token is renewed, when not configured
+TOKEN_REFRESH_MARGIN = 60
+# Lifetime assumed for tokens keystone reports no expiry for
+TOKEN_DEFAULT_TTL = 300
+
+
+class TokenCache(object):
+    """Process wide cache of scoped keystone tokens.
+
+    Tokens are keyed by identity endpoint, credentials and project,
+    and are renewed once they are within the refresh margin of their
+    expiry, so that callers never get a token about to expire.
+    """
+
+    def __init__(self):
+        # {key: (token, expires_at)}
+        self._tokens = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, fetch, refresh_margin=TOKEN_REFRESH_MARGIN):
+        """Return the cached token for key, calling fetch if needed.
+
+        fetch returns the token and its expiry as a unix timestamp.
+        """
+        entry = self._tokens.get(key)
+        if entry and entry[1] - refresh_margin > time.time():
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        token, expires_at = fetch()
+        self._tokens[key] = (token, expires_at)
+        return token
+
+    def invalidate(self, key):
+        self._tokens.pop(key, None)
+
+    def invalidate_token(self, token):
+        """Drop the entries of a token, when only the token is known. """
+        for key, entry in list(self._tokens.items()):
+            if entry[0] == token:
+                del self._tokens[key]
+
+    def clear(self):
+        self._tokens.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._tokens)}
+
+
+token_cache = TokenCache()
+
+
+def forget_rejected_token(token, error):
+    """Drop a token from the cache once a service rejected it.
+
+    A revoked token would otherwise be handed out again till it expires,
+    the next lookup gets a new one from keystone.
+    """
+    status = (getattr(error, 'http_status', None) or
+              getattr(error, 'status_code', None) or
+              getattr(error, 'code', None))
+    if status == 401:
+        LOG.warning("Token rejected, dropping it from the token cache")
+        token_cache.invalidate_token(token)
+
 
 class OpenstackApi(object):
     """Initializes common attributes for openstack client drivers."""
@@ -82,13 +153,13 @@ class KeystoneClient(OpenstackApi):
             err = "Tenant Not specified for getting a scoped token"
             LOG.error(err)
             raise Exception(err)
+        key = (self.identity_service, user, password, tenant_name)
         try:
-            auth = v2.Password(username=user,
-                           password=password,
-                           tenant_name=tenant_name,
-                           auth_url=self.identity_service)
-            sess = session.Session(auth=auth)
-            scoped_token = sess.get_token(auth=auth)
+            scoped_token = token_cache.get(
+                key,
+                lambda: self._fetch_scoped_token(user, password,
+                                                 tenant_name),
+                refresh_margin=self._token_refresh_margin())
         except Exception as err:
             err = ("Failed to get token from"
                    " Openstack Keystone service"
@@ -99,6 +170,33 @@ class KeystoneClient(OpenstackApi):
         else:
             return scoped_token
 
+    def _fetch_scoped_token(self, user, password, tenant_name):
+        auth = v2.Password(username=user,
+                           password=password,
+                           tenant_name=tenant_name,
+                           auth_url=self.identity_service)
+        sess = session.Session(auth=auth)
+        scoped_token = sess.get_token(auth=auth)
+        LOG.debug("Fetched keystone token for user %(user)s, tenant "
+                  "%(tenant)s, token cache stats: %(stats)s",
+                  {'user': user, 'tenant': tenant_name,
+                   'stats': token_cache.stats()})
+        return scoped_token, self._token_expiry(auth)
+
+    @staticmethod
+    def _token_expiry(auth):
+        expires = getattr(getattr(auth, 'auth_ref', None), 'expires', None)
+        if not isinstance(expires, datetime.datetime):
+            return time.time() + TOKEN_DEFAULT_TTL
+        return time.time() + timeutils.delta_seconds(
+            timeutils.utcnow(with_timezone=True), expires)
+
+    def _token_refresh_margin(self):
+        try:
+            return self.config.nfp_keystone_authtoken.token_refresh_margin
+        except AttributeError:
+            return TOKEN_REFRESH_MARGIN
+
     def get_admin_tenant_id(self, token):
         if not self.admin_tenant_id:
             self.admin_tenant_id = self.get_tenant_id(
@@ -182,6 +280,7 @@ class NovaClient(OpenstackApi):
             image = nova.images.find(name=image_name)
             return image.id
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to get image id from image name %s: %s" % (
                 image_name, ex))
             LOG.error(err)
@@ -203,6 +302,7 @@ class NovaClient(OpenstackApi):
             image = nova.images.find(name=image_name)
             return image.metadata
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to get image metadata from image name %s: %s" % (
                 image_name, ex))
             LOG.error(err)
@@ -224,6 +324,7 @@ class NovaClient(OpenstackApi):
             flavor = nova.flavors.find(name=flavor_name)
             return flavor.id
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to get flavor id from flavor name %s: %s" % (
                 flavor_name, ex))
             LOG.error(err)
@@ -250,6 +351,7 @@ class NovaClient(OpenstackApi):
                               "found in db for tenant %(tenant)s")
                             % {'id': instance_id, 'tenant': tenant_id})
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read instance information from"
                    " Openstack Nova service's response"
                    " KeyError :: %s" % (ex))
@@ -274,6 +376,7 @@ class NovaClient(OpenstackApi):
             keypair = nova.keypairs.find(name=keypair_name)
             return keypair.to_dict()
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read keypair information from"
                    " Openstack Nova service's response."
                    " %s" % ex)
@@ -295,6 +398,7 @@ class NovaClient(OpenstackApi):
                                                      None, None)
             return instance
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to attach interface %s to instance"
                    " %s  %s" % (port_id, instance_id, ex))
             LOG.error(err)
@@ -314,6 +418,7 @@ class NovaClient(OpenstackApi):
             instance = nova.servers.interface_detach(instance_id, port_id)
             return instance
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to detach interface %s from instance"
                    " %s  %s" % (port_id, instance_id, ex))
             LOG.error(err)
@@ -333,6 +438,7 @@ class NovaClient(OpenstackApi):
                                       auth_url=self.identity_service)
             nova.servers.delete(instance_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to delete instance"
                    " %s  %s" % (instance_id, ex))
             LOG.error(err)
@@ -367,6 +473,7 @@ class NovaClient(OpenstackApi):
             data = [instance.to_dict() for instance in instances]
             return data
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list instances under tenant"
                    " %s  %s" % (tenant_id, ex))
             LOG.error(err)
@@ -398,6 +505,7 @@ class NovaClient(OpenstackApi):
         except nova_exc.NotFound:
             pass
         except Exception as err:
+            forget_rejected_token(token, err)
             msg = ("Failed to delete Nova Server Anti-Affinity Group "
                    "with name %s. Error: %s" % (nf_id, err))
             LOG.error(msg)
@@ -427,6 +535,7 @@ class NovaClient(OpenstackApi):
             LOG.info(msg)
             return affinity_group_id
         except Exception as err:
+            forget_rejected_token(token, err)
             msg = ("Failed to create Nova Server Anti-Affinity Group. "
                    "Error: %s" % err)
             LOG.error(msg)
@@ -471,6 +580,7 @@ class NovaClient(OpenstackApi):
                         file_dict.update({_file["dst"]: data})
                 files = file_dict
         except Exception as e:
+            forget_rejected_token(token, e)
             msg = (
                 "Failed while reading file: %r " % e)
             LOG.error(msg)
@@ -521,6 +631,7 @@ class NovaClient(OpenstackApi):
             data = instance.to_dict()
             return data['id']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to create instance under tenant"
                    " %s  %s" % (tenant_id, ex))
             LOG.error(err)
@@ -544,6 +655,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.show_floatingip(floatingip_id)['floatingip']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read floatingip from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -557,6 +669,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.list_floatingips(**filters)['floatingips']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read floatingips from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -571,6 +684,7 @@ class NeutronClient(OpenstackApi):
             filters = filters if filters is not None else {}
             return neutron.list_security_groups(**filters)['security_groups']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to get security groups from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -587,6 +701,7 @@ class NeutronClient(OpenstackApi):
             return neutron.create_security_group(body=sg_info)[
                 'security_group']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to get security groups from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -605,6 +720,7 @@ class NeutronClient(OpenstackApi):
             return neutron.create_security_group_rule(
                 body=sg_rule_info)['security_group_rule']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to get security groups from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -627,6 +743,7 @@ class NeutronClient(OpenstackApi):
             ports = neutron.list_ports(**filters).get('ports', [])
             return ports
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read port list from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -647,6 +764,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.show_port(port_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read port information"
                    " Exception :: %s" % (ex))
             LOG.error(err)
@@ -668,6 +786,7 @@ class NeutronClient(OpenstackApi):
             subnets = neutron.list_subnets(**filters).get('subnets', [])
             return subnets
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read subnet list from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -685,6 +804,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.show_subnet(subnet_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read subnet from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -702,6 +822,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.delete_floatingip(floatingip_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to delete floatingip from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -723,6 +844,7 @@ class NeutronClient(OpenstackApi):
             port_info['port'].update(kwargs)
             return neutron.update_port(port_id, body=port_info)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to update port info"
                    " Error :: %s" % (ex))
             LOG.error(err)
@@ -743,6 +865,7 @@ class NeutronClient(OpenstackApi):
                                                      for key in kwargs])
             return data
         except Exception as ex:
+            forget_rejected_token(token, ex)
             raise Exception(ex)
 
     def _update_floatingip(self, token, floatingip_id, data):
@@ -756,6 +879,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.update_floatingip(floatingip_id, body=data)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to update floatingip from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -811,6 +935,7 @@ class NeutronClient(OpenstackApi):
                 ports = neutron.list_ports(**kwargs)
             return ports
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list ports %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -829,6 +954,7 @@ class NeutronClient(OpenstackApi):
             subnets = neutron.list_subnets(id=subnet_ids).get('subnets', [])
             return subnets
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list subnets %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -850,6 +976,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.create_port(body=attr)['port']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             raise Exception(_("Port creation failed in network: %(net)r "
                               "of tenant: %(tenant)r Error: %(error)s") %
                             {'net': net_id,
@@ -867,6 +994,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.delete_port(port_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to delete port %s"
                    " Exception :: %s" % (port_id, ex))
             LOG.error(err)
@@ -888,6 +1016,7 @@ class NeutronClient(OpenstackApi):
             nets = neutron.list_networks(**filters).get('networks', [])
             return nets
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read network list from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -905,6 +1034,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.delete_network(net_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ('Failed to delete network %s . %s' % (net_id, str(ex)))
             LOG.error(err)
 
@@ -924,6 +1054,7 @@ class NeutronClient(OpenstackApi):
             pools = neutron.list_pools(**filters).get('pools', [])
             return pools
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read pool list from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -947,6 +1078,7 @@ class NeutronClient(OpenstackApi):
                 'loadbalancers', [])
             return loadbalancers
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read pool list from"
                    " Openstack Neutron service's response"
                    " KeyError :: %s" % (ex))
@@ -967,6 +1099,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.show_vip(vip_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read vip information"
                    " Exception :: %s" % (ex))
             LOG.error(err)
@@ -986,6 +1119,7 @@ class NeutronClient(OpenstackApi):
                                             endpoint_url=self.network_service)
             return neutron.list_agents(**filters).get('agents', [])
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read agents information"
                    " Exception :: %s" % (ex))
             LOG.error(err)
@@ -1011,6 +1145,7 @@ class GBPClient(OpenstackApi):
             return gbp.list_policy_target_groups(
                 **filters)['policy_target_groups']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read PTG list from"
                    " Openstack Neutron service's response."
                    " KeyError :: %s" % (ex))
@@ -1031,6 +1166,7 @@ class GBPClient(OpenstackApi):
             return gbp.show_policy_target_group(
                 ptg_id, **filters)['policy_target_group']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read PTG list from"
                    " Openstack Neutron service's response."
                    " KeyError :: %s" % (ex))
@@ -1053,6 +1189,7 @@ class GBPClient(OpenstackApi):
                 ptg_id,
                 body=policy_target_group_info)['policy_target_group']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to update policy target group. Error :: %s" % (ex))
             LOG.error(err)
             raise Exception(err)
@@ -1088,6 +1225,7 @@ class GBPClient(OpenstackApi):
                 body=policy_target_info)['policy_target']
 
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read policy target information from"
                    " Openstack Neutron service's response."
                    " KeyError :: %s" % (ex))
@@ -1105,6 +1243,7 @@ class GBPClient(OpenstackApi):
             return gbp.delete_policy_target(policy_target_id)
 
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to delete policy target information from"
                    " Openstack Neutron service's response."
                    " KeyError :: %s" % (ex))
@@ -1121,6 +1260,7 @@ class GBPClient(OpenstackApi):
                                     endpoint_url=self.network_service)
             return gbp.delete_policy_target_group(policy_target_group_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to delete policy target group from"
                    " Openstack."
                    " Error :: %s" % (ex))
@@ -1145,6 +1285,7 @@ class GBPClient(OpenstackApi):
             return gbp.update_policy_target(
                 policy_target_id, body=policy_target_info)['policy_target']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read updated PT information"
                    ". PT  %s."
                    " KeyError :: %s" % (policy_target_id, ex))
@@ -1180,6 +1321,7 @@ class GBPClient(OpenstackApi):
             return gbp.create_policy_target_group(
                 body=policy_target_group_info)['policy_target_group']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to create policy target group. %s"
                    " Error :: %s" % (policy_target_group_info, ex))
             LOG.error(err)
@@ -1204,6 +1346,7 @@ class GBPClient(OpenstackApi):
                                     endpoint_url=self.network_service)
             return gbp.create_l2_policy(body=l2_policy_info)['l2_policy']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to create l2 policy under tenant"
                    " %s. Error :: %s" % (tenant_id, ex))
             LOG.error(err)
@@ -1220,6 +1363,7 @@ class GBPClient(OpenstackApi):
                                     endpoint_url=self.network_service)
             return gbp.delete_l2_policy(l2policy_id)
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to delete l2 policy %s. Reason %s" %
                    (l2policy_id, ex))
             LOG.error(err)
@@ -1243,6 +1387,7 @@ class GBPClient(OpenstackApi):
             filters = filters if filters is not None else {}
             return gbp.list_l2_policies(**filters)['l2_policies']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list l2 policies. Reason %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -1265,6 +1410,7 @@ class GBPClient(OpenstackApi):
             return gbp.show_l2_policy(
                 policy_id, **filters)['l2_policy']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read l2 policy list from"
                    " Openstack Neutron service's response."
                    " KeyError :: %s" % (ex))
@@ -1280,6 +1426,7 @@ class GBPClient(OpenstackApi):
             return gbp.create_network_service_policy(
                 body=network_service_policy_info)['network_service_policy']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to create network service policy "
                    "Error :: %s" % (ex))
             LOG.error(err)
@@ -1302,6 +1449,7 @@ class GBPClient(OpenstackApi):
             return gbp.list_network_service_policies(**filters)[
                 'network_service_policies']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list network service policies. Reason %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -1322,6 +1470,7 @@ class GBPClient(OpenstackApi):
             filters = filters if filters is not None else {}
             return gbp.list_external_policies(**filters)['external_policies']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list external policies. Reason %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -1342,6 +1491,7 @@ class GBPClient(OpenstackApi):
             filters = filters if filters is not None else {}
             return gbp.list_policy_rule_sets(**filters)['policy_rule_sets']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list policy rule sets. Reason %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -1362,6 +1512,7 @@ class GBPClient(OpenstackApi):
             filters = filters if filters is not None else {}
             return gbp.list_policy_actions(**filters)['policy_actions']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list policy actions. Reason %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -1382,6 +1533,7 @@ class GBPClient(OpenstackApi):
             filters = filters if filters is not None else {}
             return gbp.list_policy_rules(**filters)['policy_rules']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list policy rules. Reason %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -1393,6 +1545,7 @@ class GBPClient(OpenstackApi):
                                     endpoint_url=self.network_service)
             return gbp.create_l3_policy(body=l3_policy_info)['l3_policy']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to create l3 policy under tenant"
                    " %s. Error :: %s"
                    % (l3_policy_info['l3_policy']['tenant_id'], ex))
@@ -1416,6 +1569,7 @@ class GBPClient(OpenstackApi):
             return gbp.show_l3_policy(
                 policy_id, **filters)['l3_policy']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read l3 policy list from"
                    " Openstack Neutron service's response."
                    " KeyError :: %s" % (ex))
@@ -1438,6 +1592,7 @@ class GBPClient(OpenstackApi):
             filters = filters if filters is not None else {}
             return gbp.list_l3_policies(**filters)['l3_policies']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to list l3 policies. Reason %s" % ex)
             LOG.error(err)
             raise Exception(err)
@@ -1458,6 +1613,7 @@ class GBPClient(OpenstackApi):
             filters = filters if filters is not None else {}
             return gbp.list_policy_targets(**filters)['policy_targets']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read PT list."
                    " Error :: %s" % (ex))
             LOG.error(err)
@@ -1475,6 +1631,7 @@ class GBPClient(OpenstackApi):
             return gbp.show_policy_target(pt_id,
                                           **filters)['policy_target']
         except Exception as ex:
+            forget_rejected_token(token, ex)
             err = ("Failed to read PT information"
                    ". PT  %s."
                    " Error :: %s" % (pt_id, ex))
@@ -11,10 +11,82 @@
 #    under the License.
 
 import pecan
+from pecan.commands import serve
+import six
+from six.moves import socketserver
+import socket
+from wsgiref import simple_server
 
 from gbpservice.nfp.pecan import constants
 
 
+class ThreadingWSGIServer(socketserver.ThreadingMixIn,
+                          simple_server.WSGIServer):
+    # get_notifications requests are held till a notification is
+    # available, serve them aside of the config requests
+    daemon_threads = True
+
+
+class KeepAliveServerHandler(simple_server.ServerHandler):
+    http_version = '1.1'
+
+    def cleanup_headers(self):
+        simple_server.ServerHandler.cleanup_headers(self)
+        # Without a length, the response ends when the connection does
+        if 'Content-Length' not in self.headers:
+            self.request_handler.close_connection = 1
+        if self.request_handler.close_connection:
+            self.headers['Connection'] = 'close'
+
+
+class KeepAliveWSGIRequestHandler(serve.PecanWSGIRequestHandler):
+    """Serves the requests of a connection till the client closes it.
+
+    wsgiref answers a single HTTP/1.0 request per connection, so the
+    pooled connections of the config agents were never reused.
+    """
+    protocol_version = 'HTTP/1.1'
+    # Secs an idle connection is kept open, holding its thread
+    timeout = 60
+
+    def handle(self):
+        self.close_connection = 1
+        self.handle_one_request()
+        while not self.close_connection:
+            self.handle_one_request()
+
+    def handle_one_request(self):
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+        except socket.timeout:
+            self.close_connection = 1
+            return
+        if not self.raw_requestline:
+            self.close_connection = 1
+            return
+        if len(self.raw_requestline) > 65536:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            return
+        if not self.parse_request():
+            return
+        if self.headers.get('Transfer-Encoding'):
+            # Chunked bodies are not decoded, the body ends the connection
+            self.close_connection = 1
+            stdin = self.rfile
+        else:
+            # The body is read up front, so that the next request starts
+            # where expected even if the application does not read it
+            stdin = six.BytesIO(self.rfile.read(
+                int(self.headers.get('Content-Length') or 0)))
+        handler = KeepAliveServerHandler(
+            stdin, self.wfile, self.get_stderr(), self.get_environ())
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+
+
 class DecideConfigurator(pecan.commands.serve.ServeCommand):
     ''' decides the type of configurtor to be used
         like base_configurator or reference_configurator
@@ -28,3 +100,14 @@ class DecideConfigurator(pecan.commands.serve.ServeCommand):
     def run(self, args):
         setattr(pecan, 'mode', args.mode)
         super(DecideConfigurator, self).run(args)
+
+    def serve(self, app, conf):
+        host, port = conf.server.host, int(conf.server.port)
+        srv = simple_server.make_server(
+            host, port, app,
+            server_class=ThreadingWSGIServer,
+            handler_class=KeepAliveWSGIRequestHandler)
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
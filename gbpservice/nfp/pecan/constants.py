@@ -33,3 +33,10 @@ controllers = {
     controller_mode_map[advanced]: ('gbpservice.contrib.nfp.configurator'
                           '.advanced_controller.controller_loader')
 }
+
+# Header of get_notifications requests, holding the request up to
+# this many secs till a notification is available
+NOTIFICATION_WAIT_HEADER = 'notification-wait'
+MAX_NOTIFICATION_WAIT = 30
+# Secs between checks of the notification queue while holding a request
+NOTIFICATION_POLL_INTERVAL = 0.1
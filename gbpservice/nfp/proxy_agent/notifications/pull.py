@@ -19,6 +19,7 @@ from gbpservice.nfp.proxy_agent.lib import topics as a_topics
 from neutron import context as n_context
 
 import sys
+import time
 import traceback
 
 LOG = nfp_logging.getLogger(__name__)
@@ -38,10 +39,23 @@ class PullNotification(nfp_api.NfpEventHandler):
     def __init__(self, sc, conf):
         self._sc = sc
         self._conf = conf
+        # {topic: RPCClient}, notifications are cast on few topics
+        self._rpc_clients = {}
+        # Polls before this time are skipped, it is set when the
+        # configurator does not hold the request
+        self._next_pull = 0
 
     def handle_event(self, ev):
         self._sc.poll_event(ev)
 
+    def _get_rpc_client(self, topic):
+        try:
+            return self._rpc_clients[topic]
+        except KeyError:
+            rpc_client = self._rpc_clients[topic] = (
+                transport.RPCClient(topic))
+            return rpc_client
+
     def _method_handler(self, notification):
         # Method handles notification as per resource, resource_type and method
         try:
@@ -53,7 +67,7 @@ class PullNotification(nfp_api.NfpEventHandler):
             else:
                 topic = requester.lower() + '_notifications'
                 rpc_ctx = n_context.get_admin_context()
-            rpcClient = transport.RPCClient(topic)
+            rpcClient = self._get_rpc_client(topic)
             rpcClient.cctxt.cast(rpc_ctx,
                                  'network_function_notification',
                                  notification_data=notification)
@@ -63,11 +77,25 @@ class PullNotification(nfp_api.NfpEventHandler):
             raise Exception(e)
 
     @nfp_api.poll_event_desc(event='PULL_NOTIFICATIONS',
-            spacing=nfp_constants.PULL_NOTIFICATIONS_SPACING)
+            spacing=nfp_constants.PULL_NOTIFICATIONS_LONG_POLL_SPACING)
     def pull_notifications(self, ev):
         """Pull and handle notification from configurator."""
-        notifications = transport.get_response_from_configurator(self._conf)
-
+        start_time = time.time()
+        if start_time < self._next_pull:
+            return
+        wait = nfp_constants.PULL_NOTIFICATIONS_WAIT
+        notifications = transport.get_response_from_configurator(
+            self._conf, wait=wait)
+        self._handle_notifications(notifications)
+
+        if not notifications or not isinstance(notifications, list):
+            if time.time() - start_time < wait:
+                # Configurator did not hold the request, failed or does
+                # not support long polling, back off to the poll interval
+                self._next_pull = (
+                    start_time + nfp_constants.PULL_NOTIFICATIONS_SPACING)
+
+    def _handle_notifications(self, notifications):
         if not isinstance(notifications, list):
             message = "Notfications not list, %s" % (notifications)
             LOG.error(message)
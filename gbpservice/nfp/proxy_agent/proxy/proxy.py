@@ -13,11 +13,14 @@
 import eventlet
 eventlet.monkey_patch()
 
+import errno
+from eventlet import semaphore
 from gbpservice._i18n import _
 from gbpservice.nfp.core import log as nfp_logging
 import os
 from oslo_config import cfg as oslo_config
 from oslo_log import log as oslo_logging
+import select
 import socket
 import sys
 import time
@@ -49,6 +52,14 @@ class ConnectionIdleTimeOut(Exception):
     pass
 
 
+class ConnectionClosed(Exception):
+
+    '''
+    Exception raised when both ends of a proxy connection are closed
+    '''
+    pass
+
+
 """
 parsing the proxy configuration file
 """
@@ -63,6 +74,7 @@ class Configuration(object):
         self.connect_max_wait_timeout = conf.proxy.connect_max_wait_timeout
         self.idle_max_wait_timeout = conf.proxy.idle_max_wait_timeout
         self.idle_min_wait_timeout = conf.proxy.idle_min_wait_timeout
+        self.buffer_size = conf.proxy.buffer_size
         self.rest_server_address = conf.proxy.nfp_controller_ip
         self.rest_server_port = conf.proxy.nfp_controller_port
 
@@ -146,6 +158,8 @@ class Connection(object):
         self._end_time = time.time()
         self.type = type
         self.socket_id = self._socket.fileno()
+        # Reads are driven by select, never block on them
+        self._socket.setblocking(0)
 
     def _tick(self):
         self._idle_count += 1
@@ -171,31 +185,38 @@ class Connection(object):
         self._idle_count = 0
         self._start_time = time.time()
 
-    def _wait(self, timeout):
-        if self.type == 'unix':
-            eventlet.sleep(timeout)
-            self._socket.setblocking(0)
-        else:
-            self._socket.settimeout(timeout)
+    def fileno(self):
+        return self.socket_id
 
-    def recv(self):
-        self._wait(self._idle_wait)
+    def recv_into(self, buf):
+        """Read whatever is available into buf.
+
+        Returns the number of bytes read, 0 when the peer closed its
+        end, or None if nothing was available.
+        """
         try:
-            data = self._socket.recv(1024)
-            if data and len(data):
-                self.idle_reset()
-                return data
-            self.idle()
-        except socket.timeout:
-            self.idle()
-        except socket.error:
-            self.idle()
-        return None
+            size = self._socket.recv_into(buf)
+        except socket.error as exc:
+            if exc.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EINTR):
+                return None
+            raise
+        if size:
+            self.idle_reset()
+        return size
 
     def send(self, data):
         self._socket.setblocking(1)
-        self._socket.sendall(data)
-        self._socket.setblocking(0)
+        try:
+            self._socket.sendall(data)
+        finally:
+            self._socket.setblocking(0)
+        self.idle_reset()
+
+    def shutdown_write(self):
+        try:
+            self._socket.shutdown(socket.SHUT_WR)
+        except socket.error:
+            pass
 
     def close(self):
         message = "Closing Socket - %d" % (self.identify())
@@ -212,6 +233,40 @@ class Connection(object):
         return self.socket_id
 
 
+"""
+Per proxy connection counters.
+Latency is the time from the first byte received from the unix
+client to the first byte of the response from the TCP server.
+"""
+
+
+class ConnectionStats(object):
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.bytes = {'unix': 0, 'tcp': 0}
+        self.request_time = None
+        self.latency = None
+
+    def record(self, direction, size):
+        now = time.time()
+        self.bytes[direction] += size
+        if direction == 'unix':
+            if self.request_time is None:
+                self.request_time = now
+        elif self.latency is None and self.request_time is not None:
+            self.latency = now - self.request_time
+
+    def report(self):
+        duration = max(time.time() - self.start_time, 1e-6)
+        total = self.bytes['unix'] + self.bytes['tcp']
+        return {'unix_bytes': self.bytes['unix'],
+                'tcp_bytes': self.bytes['tcp'],
+                'duration': duration,
+                'bytes_per_sec': total / duration,
+                'latency': self.latency}
+
+
 """
 ADT for Proxy Connection Object
 Each Connection Object is pair of Unix Socket and
@@ -221,32 +276,73 @@ TCP Client Socket
 
 class ProxyConnection(object):
 
-    def __init__(self, conf, unix_socket, tcp_socket):
+    def __init__(self, conf, unix_socket, tcp_socket, on_close=None):
         self._unix_conn = Connection(conf, unix_socket, type='unix')
         self._tcp_conn = Connection(conf, tcp_socket, type='tcp')
+        self._peers = {self._unix_conn: self._tcp_conn,
+                       self._tcp_conn: self._unix_conn}
+        # Directions still open, a closed read side stops the relay
+        # in that direction only
+        self._readers = [self._unix_conn, self._tcp_conn]
+        self._idle_wait = conf.idle_min_wait_timeout
+        # Single buffer reused for every read of the connection
+        self._buffer = bytearray(conf.buffer_size)
+        self._view = memoryview(self._buffer)
+        self._on_close = on_close
+        self._closed = False
+        self.stats = ConnectionStats()
         message = "New Proxy - Unix - %d, TCP - %d" % (
             self._unix_conn.identify(), self._tcp_conn.identify())
         LOG.debug(message)
 
     def close(self):
+        if self._closed:
+            return
+        self._closed = True
         self._unix_conn.close()
         self._tcp_conn.close()
+        stats = self.stats.report()
+        stats['conn'] = self.identify()
+        message = ("Proxy %(conn)s closed - unix %(unix_bytes)d bytes, "
+                   "tcp %(tcp_bytes)d bytes in %(duration).3fs "
+                   "(%(bytes_per_sec).0f bytes/s), latency %(latency)s" %
+                   stats)
+        LOG.info(message)
+        if self._on_close:
+            self._on_close(self)
 
     def _proxy(self, rxconn, txconn):
-        data = rxconn.recv()
-        if data:
-            txconn.send(data)
+        size = rxconn.recv_into(self._buffer)
+        if size is None:
+            return
+        if not size:
+            self._readers.remove(rxconn)
+            txconn.shutdown_write()
+            return
+        txconn.send(self._view[:size])
+        self.stats.record(rxconn.type, size)
 
     def run(self):
+        """Relay whatever is ready, in both directions.
+
+        Waits up to idle_min_wait_timeout for either socket to be
+        readable, returns False once the connection is closed.
+        """
         try:
-            self._proxy(self._unix_conn, self._tcp_conn)
-            self._proxy(self._tcp_conn, self._unix_conn)
+            if not self._readers:
+                raise ConnectionClosed()
+            readable, _w, _x = select.select(
+                self._readers, [], [], self._idle_wait)
+            if not readable:
+                self._unix_conn.idle()
+                self._tcp_conn.idle()
+            for rxconn in readable:
+                self._proxy(rxconn, self._peers[rxconn])
             return True
         except Exception as exc:
             message = "%s" % (exc)
             LOG.debug(message)
-            self._unix_conn.close()
-            self._tcp_conn.close()
+            self.close()
             return False
 
     def identify(self):
@@ -298,6 +394,9 @@ class Proxy(object):
         # Be a server and wait for connections from the client
         self.server = UnixServer(conf, self)
         self.client = TcpClient(conf, self)
+        # Slots for open proxy connections, taken before accepting
+        # a client and given back when its connection closes
+        self._slots = semaphore.Semaphore(conf.max_connections)
 
     def start(self):
         """Run each worker in new thread"""
@@ -305,7 +404,15 @@ class Proxy(object):
         for i in range(self.conf.worker_threads):
             eventlet.spawn_n(Worker().run)
         while True:
-            self.server.listen()
+            self._slots.acquire()
+            try:
+                self.server.listen()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _connection_closed(self, pc):
+        self._slots.release()
 
     def new_client(self, unixsocket, address):
         """Establish connection with the tcp server"""
@@ -316,8 +423,10 @@ class Proxy(object):
             LOG.error(message)
             unixsocket.close()
             tcpsocket.close()
+            self._slots.release()
         else:
-            pc = ProxyConnection(self.conf, unixsocket, tcpsocket)
+            pc = ProxyConnection(self.conf, unixsocket, tcpsocket,
+                                 on_close=self._connection_closed)
             ConnQ.put(pc)
 
 PROXY_OPTS = [
@@ -346,6 +455,11 @@ PROXY_OPTS = [
         default=10,
         help='Minimum time to wait on idle channel.'
     ),
+    oslo_config.IntOpt(
+        'buffer_size',
+        default=65536,
+        help='Size of the buffer used to relay data of a connection.'
+    ),
     oslo_config.StrOpt(
         'unix_bind_path',
         default='/var/run/uds_socket',